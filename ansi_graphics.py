@@ -89,11 +89,8 @@ class ANSIArt:
         return logo
     
     @staticmethod
-    def room_border(room_name, short_desc=""):
-        """Create a bordered room header."""
-        # Use fixed width for consistency
-        width = 78
-        
+    def room_border(room_name, short_desc="", width=78):
+        """Create a bordered room header (a fixed width keeps headers consistent)."""
         border = f"""{ANSIColors.BRIGHT_BLUE}
 ┌{'─' * (width - 2)}┐
 │ {ANSIColors.BRIGHT_WHITE}{ANSIColors.BOLD}{room_name.center(width - 4)}{ANSIColors.RESET}{ANSIColors.BRIGHT_BLUE} │"""
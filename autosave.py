@@ -0,0 +1,199 @@
+"""
+Autosave for ZorkMUD: Sentinel Realm
+Periodically saves every active game without slowing down its commands.
+
+The game's thread only captures a game's delta (see GameEngine.capture_state),
+which is small and cheap, and hands it to a worker thread. The worker writes
+queued saves to the save store in batches. A newer capture for the same player
+and slot replaces an older one that hasn't been written yet, so only the
+newest state of each player is ever persisted.
+
+A game is captured after every_moves changing commands, and a sweep on the
+world clock captures every game that changed since its last capture, so an
+idle player's last move is saved within one interval too.
+
+The autosaver can also stand in for the save store of the games it runs:
+save() queues the write for the worker instead of committing on the caller's
+thread and returns a future that tells when it is stored, and load() sees
+saves that are still queued.
+"""
+
+import logging
+import math
+import threading
+from concurrent.futures import Future
+
+from save_store import SaveError
+
+AUTOSAVE_SLOT = 'autosave'
+
+logger = logging.getLogger(__name__)
+
+class Autosaver:
+    """Captures dirty games on the command path and saves them on a worker thread."""
+    
+    def __init__(self, store, interval=30.0, every_moves=20, slot=AUTOSAVE_SLOT):
+        """
+        Initialize the autosaver and start its worker thread.
+        
+        Args:
+            store: Save store to write to (see save_store.py)
+            interval (float): Seconds between sweeps saving every changed game (see start())
+            every_moves (int): Changing commands after which a game is saved
+            slot (str): Save slot used for autosaves
+        """
+        self.store = store
+        self.interval = interval
+        self.every_moves = every_moves
+        self.slot = slot
+        
+        self.games = {}  # engine -> changing commands since its last capture
+        self.pending = {}  # (player, slot) -> newest save data to write (None to delete)
+        self.writing = {}  # the batch the worker is writing right now, same shape
+        self.waiting = {}  # (player, slot) -> Futures of save() calls waiting for the pending write
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.timer = None  # next sweep on the world clock
+        self.clock = None
+        
+        # Counters for monitoring
+        self.captured = 0
+        self.coalesced = 0
+        self.written = 0
+        
+        self.thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self.thread.start()
+    
+    def start(self, clock):
+        """
+        Sweep for changed games every interval on a world clock.
+        
+        Args:
+            clock (TickScheduler): The clock to run sweeps on (see scheduler.py)
+        """
+        self.clock = clock
+        self._schedule_sweep()
+    
+    def _schedule_sweep(self):
+        """Arm the timer for the next sweep."""
+        ticks = max(1, math.ceil(self.interval / self.clock.tick_seconds))
+        self.timer = self.clock.schedule(ticks, self.sweep)
+    
+    def sweep(self):
+        """Capture every game that changed since its last capture (run by the clock's timer)."""
+        for engine, dirty in self.games.items():
+            if dirty:
+                self.capture(engine)
+        if self.clock is not None and not self.stopping:
+            self._schedule_sweep()
+    
+    def attach(self, engine):
+        """Start autosaving a game."""
+        self.games[engine] = 0
+        engine.recorders.append(self)
+    
+    def detach(self, engine):
+        """Stop autosaving a game, saving it one last time if it changed (or dropping a finished game)."""
+        engine.recorders.remove(self)
+        dirty = self.games.pop(engine)
+        if engine.game_won or not engine.player.is_alive():
+            self._queue(engine.player.name, self.slot, None)
+        elif dirty:
+            self.capture(engine)
+    
+    def record(self, engine, command, input_text):
+        """Count a processed command and capture the game after every_moves of them."""
+        if command in engine.READ_ONLY_COMMANDS:
+            return
+        
+        self.games[engine] += 1
+        if self.games[engine] >= self.every_moves:
+            self.capture(engine)
+    
+    def capture(self, engine):
+        """Capture a game now and queue it for the worker."""
+        if engine in self.games:
+            self.games[engine] = 0
+        self.captured += 1
+        self._queue(engine.player.name, self.slot, engine.capture_state())
+    
+    def save(self, player, slot, save_data):
+        """
+        Queue a save for the worker, like a save store's save() but without waiting for the write.
+        
+        Args:
+            player (str): Player name
+            slot (str): Save slot
+            save_data (dict): The game's captured state
+        
+        Returns:
+            Future: Resolved (from the worker thread) once the save is stored,
+            or with the write's exception if it failed
+        """
+        future = Future()
+        self._queue(player, slot, save_data, future)
+        return future
+    
+    def load(self, player, slot):
+        """Get the save data in a player's slot, including a save still queued (raises SaveError if empty)."""
+        with self.condition:
+            for queued in (self.pending, self.writing):
+                if (player, slot) in queued:
+                    if queued[(player, slot)] is None:
+                        raise SaveError(f"No saved game for {player!r} in slot {slot!r}")
+                    return queued[(player, slot)]
+        return self.store.load(player, slot)
+    
+    def _queue(self, player, slot, save_data, future=None):
+        """Queue a save, replacing any unwritten one for the same player and slot."""
+        with self.condition:
+            if (player, slot) in self.pending:
+                self.coalesced += 1
+            self.pending[(player, slot)] = save_data
+            if future is not None:
+                self.waiting.setdefault((player, slot), []).append(future)
+            self.condition.notify()
+    
+    def _run(self):
+        """Write queued saves until closed."""
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                pending, self.pending = self.pending, {}
+                waiting, self.waiting = self.waiting, {}
+                self.writing = pending
+            
+            saves = [(player, slot, save_data) for (player, slot), save_data in pending.items()
+                     if save_data is not None]
+            try:
+                if saves:
+                    self.store.save_many(saves)
+                for (player, slot), save_data in pending.items():
+                    if save_data is None:
+                        self.store.delete(player, slot)
+                self.written += len(pending)
+                error = None
+            except Exception as e:
+                logger.exception("Error autosaving %d game(s)", len(pending))
+                error = e
+            with self.condition:
+                self.writing = {}
+            for futures in waiting.values():
+                for future in futures:
+                    if error is None:
+                        future.set_result(None)
+                    else:
+                        future.set_exception(error)
+    
+    def close(self):
+        """Stop sweeping, write everything still queued and stop the worker."""
+        if self.timer is not None:
+            self.clock.cancel(self.timer)
+            self.timer = None
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        self.thread.join()
@@ -0,0 +1,767 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for ZorkMUD: Sentinel Realm
+
+Usage: python benchmark.py [suite ...]
+Runs every suite when none is named.
+"""
+
+import asyncio
+import contextlib
+import gc
+import heapq
+import io
+import itertools
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import tracemalloc
+
+from parser import Parser
+from room import Room
+from item import Item
+from world import World, WorldState, room_location, compile_world, load_world
+from snapshot import SnapshotReader, snapshot_path
+from room_store import RoomStore
+from game_engine import GameEngine
+from save_store import FileSaveStore, SQLiteSaveStore
+from autosave import Autosaver
+from render import PROFILES
+from output import OutputSink, SocketSink
+from headless import run_scripts
+from replay import SessionRecorder, play_logs
+from solver import solve
+from routes import RouteTable
+from worldgen import generate_world, write_world
+from presence import Presence
+from scheduler import TimingWheel
+from player import Player
+from player_stats import PlayerStats, MAX_HEALTH
+from save_store import MemorySaveStore
+from server import MUDServer
+from ansi_graphics import ANSIArt
+
+SUITES = {}
+
+def suite(name):
+    """Register a benchmark suite under a name."""
+    def register(function):
+        SUITES[name] = function
+        return function
+    return register
+
+def per_call(function, *args, repeat=5, number=20000):
+    """Return the best observed time for one call of function(*args), in seconds."""
+    timer = timeit.Timer(lambda: function(*args))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def print_header(title):
+    """Print a suite heading."""
+    print(f"\n{title}")
+    print("=" * len(title))
+
+def best_time(function, repeat=5):
+    """Return the best wall-clock time of several calls to function(), in seconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def write_grid_world(directory, room_count, items_per_room=1, item_kinds=None):
+    """
+    Write a square grid world of JSON data files for scale benchmarks.
+    
+    Args:
+        directory (str): Directory to write rooms.json, items.json and messages.json into
+        room_count (int): Number of rooms
+        items_per_room (int): Items placed in every room
+        item_kinds (int): Number of distinct item types to repeat (every item is unique if None)
+    """
+    side = max(1, int(room_count ** 0.5))
+    rooms = {}
+    for n in range(room_count):
+        exits = {}
+        if n % side:
+            exits['west'] = f"room{n - 1}"
+        if n % side < side - 1 and n + 1 < room_count:
+            exits['east'] = f"room{n + 1}"
+        if n >= side:
+            exits['north'] = f"room{n - side}"
+        if n + side < room_count:
+            exits['south'] = f"room{n + side}"
+        rooms[f"room{n}"] = {
+            'name': f"Chamber {n}",
+            'description': f"You are in chamber {n}. Rough stone walls surround you and dust hangs in the air.",
+            'short_description': f"chamber {n}",
+            'exits': exits
+        }
+    
+    items = {}
+    for n in range(room_count * items_per_room):
+        kind = n if item_kinds is None else n % item_kinds
+        items[f"item{n}"] = {
+            'name': f"trinket {kind}",
+            'description': "A small, worthless trinket.",
+            'synonyms': [f"bauble {kind}"],
+            'takeable': True,
+            'room': f"room{n % room_count}"
+        }
+    
+    with open(os.path.join(directory, 'rooms.json'), 'w') as f:
+        json.dump(rooms, f, indent=2)
+    with open(os.path.join(directory, 'items.json'), 'w') as f:
+        json.dump(items, f, indent=2)
+    shutil.copy(os.path.join('data', 'messages.json'), os.path.join(directory, 'messages.json'))
+
+def linear_parse(parser, input_text):
+    """The original Parser.parse: try every pattern of every command in order."""
+    if not input_text:
+        return None, None
+    
+    input_text = input_text.strip().lower()
+    
+    for pattern in parser.commands['movement']['patterns']:
+        match = re.match(pattern, input_text)
+        if match:
+            return 'move', parser.commands['movement']['directions'].get(match.group(2))
+    
+    for command, patterns in parser.commands.items():
+        if command == 'movement':
+            continue
+        for pattern in patterns:
+            match = re.match(pattern, input_text)
+            if match:
+                if len(match.groups()) > 0:
+                    return command, match.groups()[-1]
+                return command, None
+    
+    return 'unknown', input_text
+
+@suite('parser')
+def bench_parser():
+    """Per-line parse cost of the verb table against the linear pattern scan."""
+    parser = Parser()
+    samples = {
+        'known': ['look', 'n', 'inventory', 'score', 'quit'],
+        'argument': ['take lamp', 'pick up the brass key', 'look at mailbox', 'put down leaflet', 'x scroll'],
+        'unknown': ['dance wildly', 'frobnicate', 'sing a song', 'xyzzy', 'climb tree']
+    }
+    
+    print_header("Parser: microseconds per line")
+    print(f"{'kind':<10} {'input':<24} {'linear':>9} {'table':>9} {'speedup':>8}")
+    for kind, lines in samples.items():
+        for line in lines:
+            assert parser.parse(line) == linear_parse(parser, line), line
+            linear = per_call(linear_parse, parser, line)
+            table = per_call(parser.parse, line)
+            print(f"{kind:<10} {line:<24} {linear * 1e6:9.2f} {table * 1e6:9.2f} {linear / table:7.1f}x")
+
+@suite('resolve')
+def bench_resolve():
+    """Noun resolution in crowded rooms: name index against a linear scan."""
+    print_header("Object resolution: microseconds per lookup")
+    print(f"{'items in room':>14} {'linear':>9} {'indexed':>9}")
+    for count in (10, 100, 1000, 10000):
+        room = Room("Crowded Room", "A room full of dropped items.")
+        items = {f"pebble{n}": Item(f"pebble {n}", "A pebble.", [f"stone{n}"]) for n in range(count)}
+        items['lamp'] = Item("lamp", "A lamp.", ["lantern"])
+        placements = {item_id: room_location('crowded') for item_id in items}
+        world = World({'crowded': room}, items, {}, placements)
+        view = WorldState(world).rooms['crowded']
+        
+        linear = per_call(Room.get_item, view, 'lantern', number=200)
+        indexed = per_call(view.get_item, 'lantern')
+        print(f"{count:14d} {linear * 1e6:9.2f} {indexed * 1e6:9.2f}")
+
+@suite('startup')
+def bench_startup():
+    """World load time from JSON files against the compiled snapshot."""
+    print_header("World startup: milliseconds per load")
+    print(f"{'rooms':>8} {'json':>10} {'snapshot':>10} {'speedup':>8} {'json KB':>9} {'snap KB':>9}")
+    for room_count in (1000, 10000):
+        with tempfile.TemporaryDirectory() as directory:
+            write_grid_world(directory, room_count)
+            path = compile_world(directory)
+            
+            def load_json():
+                # Same collector pause load_world uses, without rewriting the snapshot
+                gc.disable()
+                try:
+                    World.from_json(directory)
+                finally:
+                    gc.enable()
+            
+            json_time = best_time(load_json)
+            snapshot_time = best_time(lambda: load_world(directory, reload=True))
+            json_size = sum(os.path.getsize(os.path.join(directory, name))
+                            for name in ('rooms.json', 'items.json', 'messages.json'))
+            print(f"{room_count:8d} {json_time * 1e3:10.1f} {snapshot_time * 1e3:10.1f} "
+                  f"{json_time / snapshot_time:7.1f}x {json_size / 1024:9.0f} {os.path.getsize(path) / 1024:9.0f}")
+
+@suite('rooms')
+def bench_rooms():
+    """Memory held by eagerly decoded rooms against the memory-mapped room store."""
+    print_header("Room store: memory and access cost")
+    print(f"{'rooms':>8} {'eager MB':>9} {'lazy MB':>9} {'hit us':>8} {'miss us':>8}")
+    for room_count in (10000, 100000):
+        with tempfile.TemporaryDirectory() as directory:
+            write_grid_world(directory, room_count, items_per_room=0)
+            path = compile_world(directory)
+            
+            tracemalloc.start()
+            reader = SnapshotReader.open(path)
+            eager = RoomStore(reader, capacity=room_count)
+            for room_id in eager:
+                eager[room_id]
+            eager_size = tracemalloc.get_traced_memory()[0]
+            del eager, reader
+            tracemalloc.stop()
+            
+            tracemalloc.start()
+            lazy = World.from_snapshot(SnapshotReader.map(path)).rooms
+            lazy_size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            
+            # A small working set stays cached; random rooms across the world keep missing
+            room_ids = list(lazy)
+            hit = per_call(lazy.__getitem__, room_ids[0])
+            misses = [random.choice(room_ids) for _ in range(20000)]
+            lazy.capacity = 1
+            miss = best_time(lambda: [lazy[room_id] for room_id in misses]) / len(misses)
+            print(f"{room_count:8d} {eager_size / 2**20:9.1f} {lazy_size / 2**20:9.1f} "
+                  f"{hit * 1e6:8.2f} {miss * 1e6:8.2f}")
+
+def traced_size(function):
+    """Return the Python heap memory still held after calling function(), in bytes."""
+    tracemalloc.start()
+    try:
+        result = function()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+@suite('memory')
+def bench_memory():
+    """Bytes of world template held per room and per item after loading from JSON."""
+    print_header("World template memory: bytes per object")
+    print(f"{'count':>8} {'per room':>9} {'per item':>9} {'per repeated item':>18}")
+    for count in (10000, 100000):
+        sizes = {}
+        for kinds in (None, 10):
+            with tempfile.TemporaryDirectory() as directory:
+                write_grid_world(directory, count, item_kinds=kinds)
+                sizes[kinds] = traced_size(lambda: World.from_json(directory))
+                if kinds is None:
+                    with open(os.path.join(directory, 'items.json'), 'w') as f:
+                        f.write('{}')
+                    sizes['rooms'] = traced_size(lambda: World.from_json(directory))
+        
+        print(f"{count:8d} {sizes['rooms'] / count:9.0f} {(sizes[None] - sizes['rooms']) / count:9.0f} "
+              f"{(sizes[10] - sizes['rooms']) / count:18.0f}")
+
+@suite('saves')
+def bench_saves():
+    """Save and load throughput of the file and SQLite save stores."""
+    engine = GameEngine()
+    engine.new_game()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for command in ('open mailbox', 'take leaflet', 'n', 'take lamp', 'turn on lamp'):
+            engine.process_command(command)
+    save_data = engine.capture_state()
+    count = 5000
+    players = [f"player{n}" for n in range(count)]
+    
+    print_header(f"Save stores: operations per second ({count} players)")
+    print(f"{'store':<28} {'saves/s':>10} {'loads/s':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        def run(name, store, save):
+            start = time.perf_counter()
+            save(store)
+            saved = count / (time.perf_counter() - start)
+            start = time.perf_counter()
+            for player in players:
+                store.load(player, 'default')
+            loaded = count / (time.perf_counter() - start)
+            store.close()
+            print(f"{name:<28} {saved:10.0f} {loaded:10.0f}")
+        
+        def one_by_one(store):
+            for player in players:
+                store.save(player, 'default', save_data)
+        
+        def batched(store):
+            for start in range(0, count, 100):
+                store.save_many([(player, 'default', save_data) for player in players[start:start + 100]])
+        
+        def threaded(store, thread_count=4):
+            threads = [threading.Thread(target=lambda part=players[n::thread_count]:
+                                        [store.save(player, 'default', save_data) for player in part])
+                       for n in range(thread_count)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        run("files", FileSaveStore(os.path.join(directory, 'files')), one_by_one)
+        run("sqlite, one per commit", SQLiteSaveStore(os.path.join(directory, 'single.db')), one_by_one)
+        run("sqlite, 100 per commit", SQLiteSaveStore(os.path.join(directory, 'batched.db')), batched)
+        run("sqlite, 4 threads", SQLiteSaveStore(os.path.join(directory, 'threads.db')), threaded)
+
+@suite('autosave')
+def bench_autosave():
+    """Command latency while saving every 20 moves: inline saves against the autosaver."""
+    player_count = 200
+    commands = ['open mailbox', 'take leaflet', 'drop leaflet', 'n', 's'] * 20
+    
+    print_header(f"Autosave: command latency in microseconds ({player_count} players)")
+    print(f"{'mode':<10} {'p50':>8} {'p99':>8} {'p99.9':>8} {'max':>9} {'saves':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ('inline', 'autosave'):
+            store = SQLiteSaveStore(os.path.join(directory, f'{mode}.db'))
+            autosaver = Autosaver(store, every_moves=20) if mode == 'autosave' else None
+            engines = []
+            for n in range(player_count):
+                engine = GameEngine(store)
+                engine.new_game(f"player{n}")
+                if autosaver:
+                    autosaver.attach(engine)
+                engines.append(engine)
+            
+            latencies = []
+            with contextlib.redirect_stdout(io.StringIO()):
+                for step, command in enumerate(commands):
+                    for engine in engines:
+                        start = time.perf_counter()
+                        engine.process_command(command)
+                        if not autosaver and step % 20 == 19:
+                            engine.save_game('autosave')
+                        latencies.append(time.perf_counter() - start)
+            
+            if autosaver:
+                autosaver.close()
+            saves = len(store.list())
+            store.close()
+            latencies.sort()
+            p50, p99, p999 = (latencies[int(len(latencies) * q)] for q in (0.5, 0.99, 0.999))
+            print(f"{mode:<10} {p50 * 1e6:8.1f} {p99 * 1e6:8.1f} {p999 * 1e6:8.1f} "
+                  f"{latencies[-1] * 1e6:9.1f} {saves:7d}")
+
+@suite('render')
+def bench_render():
+    """Cost and size of a room description per terminal profile, with the render cache cold and warm."""
+    print_header("Rendering: microseconds and bytes per look")
+    print(f"{'profile':<8} {'cold':>8} {'warm':>8} {'bytes':>7}")
+    for profile in PROFILES.values():
+        engine = GameEngine(output=OutputSink())
+        engine.profile = profile
+        engine.new_game()
+        render = engine.render
+        
+        def warm():
+            engine.look_around()
+            engine.output.flush()
+        
+        def cold():
+            render.headers.clear()
+            render.exit_lines.clear()
+            render.colored.clear()
+            warm()
+        
+        cold_time = per_call(cold, number=2000)
+        warm_time = per_call(warm, number=2000)
+        engine.look_around()
+        size = len(engine.output.flush().encode('utf-8'))
+        print(f"{profile.name:<8} {cold_time * 1e6:8.1f} {warm_time * 1e6:8.1f} {size:7d}")
+
+@suite('headless')
+def bench_headless():
+    """Scripted games per second in one process against a process pool."""
+    script_count = 2000
+    commands = ['open mailbox', 'take leaflet', 'read leaflet', 's', 'take key', 'n', 'n', 'e',
+                'take lamp', 'use lamp', 'e', 'open chest', 'look', 'score', 'i']
+    
+    print_header(f"Headless scripts: games per second ({script_count} scripts of {len(commands)} commands)")
+    print(f"{'workers':>8} {'games/s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for n in range(script_count):
+            path = os.path.join(directory, f"script{n}.txt")
+            with open(path, 'w') as f:
+                f.write('\n'.join(commands))
+            paths.append(path)
+        
+        for jobs in (1, os.cpu_count() or 1):
+            start = time.perf_counter()
+            finished = sum(1 for result in run_scripts(paths, jobs) if 'error' not in result)
+            elapsed = time.perf_counter() - start
+            print(f"{jobs:8d} {finished / elapsed:9.0f}")
+
+@suite('replay')
+def bench_replay():
+    """Recorded sessions played back together as load, as fast as possible."""
+    session_count = 1000
+    commands = ['look', 'n', 's', 'e', 'w', 'open mailbox', 'take leaflet', 'read leaflet',
+                'drop leaflet', 'i', 'score', 'take lamp', 'use lamp', 'examine mailbox']
+    
+    print_header(f"Replay: {session_count} recorded sessions played at once")
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for n in range(session_count):
+            rng = random.Random(n)
+            engine = GameEngine(MemorySaveStore(), OutputSink())
+            engine.new_game(f"player{n}")
+            path = os.path.join(directory, f"session{n}.log.gz")
+            recorder = SessionRecorder(path, engine)
+            engine.recorders.append(recorder)
+            for _ in range(50):
+                engine.process_command(rng.choice(commands))
+            recorder.close()
+            paths.append(path)
+        
+        result = play_logs(paths, speed=0)
+        latency = result['latency']
+        print(f"{result['commands']} commands in {result['elapsed']:.2f}s "
+              f"({result['commands_per_second']:.0f} commands/s)")
+        print(f"latency us: p50 {latency['p50'] * 1e6:.1f}  p99 {latency['p99'] * 1e6:.1f}  "
+              f"max {latency['max'] * 1e6:.1f}")
+
+@suite('solver')
+def bench_solver():
+    """Full state-space search of the shipped world."""
+    print_header("Solver: exhaustive search of data/")
+    start = time.perf_counter()
+    result = solve()
+    elapsed = time.perf_counter() - start
+    print(f"{result['states']} states in {elapsed * 1e3:.0f} ms ({result['states'] / elapsed:.0f} states/s), "
+          f"solution of {len(result['solution'] or ())} commands")
+
+@suite('routes')
+def bench_routes():
+    """Route lookups on large grid worlds, with cold and warm next-hop tables."""
+    print_header("Routes: travel lookups on grid worlds")
+    print(f"{'rooms':>8} {'build ms':>9} {'lookup us':>10} {'hops':>6}")
+    for room_count in (10000, 100000):
+        with tempfile.TemporaryDirectory() as directory:
+            write_grid_world(directory, room_count, items_per_room=0)
+            world = World.from_json(directory)
+            rng = random.Random(7)
+            starts = [f"room{rng.randrange(room_count)}" for _ in range(1000)]
+            destination = f"room{room_count - 1}"
+            
+            routes = RouteTable(world)
+            start = time.perf_counter()
+            routes.next_hops(destination)
+            build = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            hops = sum(len(routes.route(room_id, destination)) for room_id in starts)
+            lookup = (time.perf_counter() - start) / len(starts)
+            print(f"{room_count:8d} {build * 1e3:9.1f} {lookup * 1e6:10.1f} {hops / len(starts):6.0f}")
+
+@suite('worldgen')
+def bench_worldgen():
+    """Generating, compiling and winning large generated worlds."""
+    print_header("World generator: large winnable worlds")
+    print(f"{'rooms':>8} {'items':>8} {'gen s':>7} {'write s':>8} {'compile s':>10} {'play s':>7} {'won':>4}")
+    for room_count in (10000, 100000):
+        item_count = room_count * 4
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            data, commands = generate_world(room_count, item_count, seed=1)
+            generated = time.perf_counter()
+            write_world(directory, data, commands, indent=None)
+            written = time.perf_counter()
+            compile_world(directory)
+            compiled = time.perf_counter()
+            result = run_scripts([os.path.join(directory, 'walkthrough.txt')], jobs=1, data_dir=directory)
+            won = next(result)['won']
+            played = time.perf_counter()
+            print(f"{room_count:8d} {item_count:8d} {generated - start:7.1f} {written - generated:8.1f} "
+                  f"{compiled - written:10.1f} {played - compiled:7.1f} {'yes' if won else 'no':>4}")
+
+def scan_broadcast(engines, room_id, text, exclude=None):
+    """Broadcast by checking every connected player's room, as without a presence index."""
+    for engine in engines:
+        if engine is not exclude and engine.player.current_room == room_id:
+            engine.output.write(engine.render.colorize_dynamic(text, None) + '\n')
+
+@suite('presence')
+def bench_presence():
+    """1,000 players converging on the start room, with room-indexed broadcasts."""
+    print_header("Presence: 1,000 players converging on the field")
+    players = 1000
+    rng = random.Random(7)
+    presence = Presence()
+    engines = []
+    for n in range(players):
+        engine = GameEngine(MemorySaveStore(), OutputSink())
+        engine.new_game(f"Player{n}")
+        engine.lamp_on = True  # so nobody is stopped by the dark hallway
+        engine.player.move_to(rng.choice(list(engine.rooms)))
+        engine.presence = presence
+        presence.enter(engine)
+        engines.append(engine)
+    presence.deliver()
+    
+    told = 0
+    start = time.perf_counter()
+    for engine in engines:
+        engine.process_command("travel field")
+        told += len(presence.pending)
+        presence.deliver()
+    converge = time.perf_counter() - start
+    print(f"{players} players travel to the field: {converge * 1e3:.0f} ms, {told} player writes, "
+          f"{converge / players * 1e6:.0f} us per command")
+    
+    # An event in a quiet room while everyone else crowds the field
+    loner = engines[0]
+    loner.process_command("north")
+    presence.deliver()
+    events = 10000
+    indexed = best_time(lambda: [presence.broadcast(loner.player.current_room, "Player0 waves.", loner)
+                                 for _ in range(events)]) / events
+    scanned = best_time(lambda: [scan_broadcast(engines, loner.player.current_room, "Player0 waves.", loner)
+                                 for _ in range(events)]) / events
+    print(f"Event in a room of 1 with {players - 1} elsewhere: indexed {indexed * 1e6:.2f} us, "
+          f"scanning every session {scanned * 1e6:.2f} us")
+    
+    # An event in the crowded field costs one line per occupant either way
+    actor = engines[1]
+    events = 100
+    crowded = best_time(lambda: [presence.broadcast('field', "Player1 waves.", actor) for _ in range(events)]) / events
+    presence.pending.clear()
+    for engine in engines:
+        engine.output.parts.clear()
+    print(f"Event in the field with {len(presence.occupants('field'))} players: {crowded * 1e6:.0f} us "
+          f"({crowded / (len(presence.occupants('field')) - 1) * 1e9:.0f} ns per listener)")
+
+class HeapTimers:
+    """Binary heap of timers with lazy cancellation, to compare with the timing wheel."""
+    
+    def __init__(self):
+        """Initialize an empty heap at tick 0."""
+        self.now = 0
+        self.heap = []
+        self.order = itertools.count()
+    
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) after delay ticks; returns the heap entry."""
+        entry = [self.now + delay, next(self.order), callback, args]
+        heapq.heappush(self.heap, entry)
+        return entry
+    
+    def cancel(self, entry):
+        """Mark an entry cancelled; it is dropped when it reaches the top."""
+        entry[2] = None
+    
+    def advance(self, ticks):
+        """Advance several ticks, firing the due timers in order."""
+        end = self.now + ticks
+        heap = self.heap
+        while heap and heap[0][0] <= end:
+            due, _, callback, args = heapq.heappop(heap)
+            self.now = due
+            if callback is not None:
+                callback(*args)
+        self.now = end
+
+@suite('scheduler')
+def bench_scheduler():
+    """Scheduling, cancelling and firing many timers, timing wheel vs a heap."""
+    print_header("Scheduler: timers due within an hour of ticks")
+    print(f"{'timers':>8} {'queue':>6} {'schedule us':>12} {'cancel us':>10} {'fire us':>8}")
+    for count in (10000, 100000, 1000000):
+        rng = random.Random(7)
+        delays = [rng.randrange(1, 3600) for _ in range(count)]
+        for name, factory in (('wheel', TimingWheel), ('heap', HeapTimers)):
+            queue = factory()
+            fired = []
+            callback = fired.append
+            
+            start = time.perf_counter()
+            timers = [queue.schedule(delay, callback, None) for delay in delays]
+            scheduled = time.perf_counter()
+            for timer in timers[::2]:  # half are cancelled, like a lamp turned off early
+                queue.cancel(timer)
+            cancelled = time.perf_counter()
+            queue.advance(3600)
+            done = time.perf_counter()
+            
+            assert len(fired) == count - len(timers[::2])
+            print(f"{count:8d} {name:>6} {(scheduled - start) / count * 1e6:12.2f} "
+                  f"{(cancelled - scheduled) / (count - len(fired)) * 1e6:10.2f} "
+                  f"{(done - cancelled) / len(fired) * 1e6:8.2f}")
+            del timers, queue, fired
+
+@suite('stats')
+def bench_stats():
+    """Per-tick health regeneration, player loop vs the stats store."""
+    print_header(f"Player stats: one tick over every player ({PlayerStats().backend} backend)")
+    print(f"{'players':>8} {'loop heal ms':>13} {'batch heal ms':>14}")
+    for count in (10000, 100000):
+        stats = PlayerStats(capacity=count)
+        rng = random.Random(7)
+        players = [Player(f"Player{n}", 'field', stats) for n in range(count)]
+        for player in players:
+            player.health = rng.randrange(0, 101)
+        
+        def loop_heal():
+            for player in players:
+                player.heal(1)
+        
+        def batch_heal():
+            stats.add('health', 1, high=MAX_HEALTH)
+        
+        print(f"{count:8d} {best_time(loop_heal) * 1e3:13.2f} {best_time(batch_heal) * 1e3:14.2f}")
+
+async def flood_server(bots, players, commands, **options):
+    """
+    Measure well-behaved players' response times while bots flood the server.
+    
+    Returns:
+        tuple: (sorted player latencies in seconds, the server's CommandQueue)
+    """
+    server = MUDServer('127.0.0.1', 0, save_store=MemorySaveStore(), autosave_interval=3600, **options)
+    await server.start()
+    port = server.server.sockets[0].getsockname()[1]
+    prompt = ANSIArt.command_prompt().replace('\n', '\r\n').encode()
+    latencies = []
+    
+    async def connect(name):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"{name}\n".encode())
+        await reader.readuntil(prompt)
+        return reader, writer
+    
+    async def bot(n):
+        reader, writer = await connect(f"Bot{n}")
+        try:
+            writer.write(b"look\n" * commands)
+            while await reader.read(65536):
+                pass
+        finally:
+            writer.close()
+    
+    async def player(n):
+        reader, writer = await connect(f"Player{n}")
+        for _ in range(20):
+            await asyncio.sleep(0.25)
+            start = time.perf_counter()
+            writer.write(b"score\n")
+            # Other players' arrivals come with prompts of their own, so find the score first
+            await reader.readuntil(b"Moves: ")
+            await reader.readuntil(prompt)
+            latencies.append(time.perf_counter() - start)
+        writer.close()
+    
+    flooding = [asyncio.create_task(bot(n)) for n in range(bots)]
+    await asyncio.sleep(0.2)  # let the flood build up first
+    await asyncio.gather(*(player(n) for n in range(players)))
+    for task in flooding:
+        task.cancel()
+    await asyncio.gather(*flooding, return_exceptions=True)
+    while server.sessions:
+        await asyncio.sleep(0.01)  # let the bots' sessions see them go
+    server.server.close()
+    await server.commands.stop()
+    await server.clock.stop()
+    return sorted(latencies), server.commands
+
+@suite('flood')
+def bench_flood():
+    """Response times of normal players while bots paste thousands of commands."""
+    bots, players = 20, 5
+    print_header(f"Flood: {players} players every 250 ms, {bots} bots pasting 2,000 'look' each")
+    print(f"{'limits':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'run':>7} {'delayed':>8} {'dropped':>8} {'paused':>7}")
+    for label, options in (('off', {'command_rate': None, 'input_queue': 1000000}), ('on', {})):
+        latencies, commands = asyncio.run(flood_server(bots, players, 2000, **options))
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+        print(f"{label:>8} {p50 * 1e3:8.2f} {p99 * 1e3:8.2f} {latencies[-1] * 1e3:8.2f} {commands.processed:7d} "
+              f"{commands.delayed:8d} {commands.dropped:8d} {commands.throttled:7d}")
+
+class WireSink(SocketSink):
+    """Socket sink that counts the bytes it would send instead of sending them."""
+    
+    def __init__(self):
+        """Initialize the sink with nothing sent."""
+        super().__init__(None)
+        self.wire_bytes = 0
+        self.responses = 0
+    
+    def send_bytes(self, data):
+        """Count bytes instead of sending them."""
+        self.wire_bytes += len(data)
+        self.responses += 1
+
+def play_walkthrough(profile, commands, compression):
+    """
+    Play a walkthrough into a WireSink.
+    
+    Args:
+        profile (TerminalProfile): Terminal the output is rendered for
+        commands (list): Commands to play after the welcome screen
+        compression (str): None, 'stream' (one zlib stream, as MCCP2) or
+            'response' (each response compressed on its own)
+    
+    Returns:
+        WireSink: The sink, holding the byte count
+    """
+    sink = WireSink()
+    engine = GameEngine(MemorySaveStore(), sink)
+    engine.set_profile(profile)
+    engine.new_game()
+    if compression == 'stream':
+        sink.start_compression()
+    
+    def respond(run):
+        if compression == 'response':
+            sink.start_compression()
+        run()
+        sink.flush()
+        if compression == 'response':
+            sink.end_compression()
+    
+    respond(engine.show_welcome)
+    for command in commands:
+        respond(lambda: engine.process_command(command))
+    sink.end_compression()
+    return sink
+
+@suite('compression')
+def bench_compression():
+    """Bytes on the wire for the shipped world's walkthrough, with and without MCCP2-style compression."""
+    solution = solve()['solution']
+    commands = [command for move in solution for command in (move, 'look')]
+    print_header(f"Compression: welcome screen and {len(commands)} commands (walkthrough with a look after each)")
+    print(f"{'profile':>8} {'plain B':>9} {'stream B':>9} {'ratio':>6} {'per-reply B':>12} {'ratio':>6} {'stream us':>10}")
+    for profile in PROFILES.values():
+        plain = play_walkthrough(profile, commands, None).wire_bytes
+        stream = play_walkthrough(profile, commands, 'stream').wire_bytes
+        per_response = play_walkthrough(profile, commands, 'response').wire_bytes
+        added = (best_time(lambda: play_walkthrough(profile, commands, 'stream')) -
+                 best_time(lambda: play_walkthrough(profile, commands, None))) / (len(commands) + 1)
+        print(f"{profile.name:>8} {plain:9d} {stream:9d} {plain / stream:6.1f} {per_response:12d} "
+              f"{plain / per_response:6.1f} {added * 1e6:10.1f}")
+
+def main():
+    """Run the requested benchmark suites."""
+    names = sys.argv[1:] or list(SUITES)
+    for name in names:
+        if name not in SUITES:
+            print(f"Unknown suite: {name} (available: {', '.join(SUITES)})")
+            sys.exit(1)
+        SUITES[name]()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+pytest configuration for ZorkMUD: Sentinel Realm
+"""
+
+import pytest
+
+from game_engine import GameEngine
+from output import OutputSink
+from save_store import MemorySaveStore
+
+# test_ansi.py is an interactive demo that waits for ENTER, not an automated test
+collect_ignore = ['test_ansi.py']
+
+@pytest.fixture
+def new_engine():
+    """
+    Factory of started, quiet games.
+    
+    Call it as new_engine(save_store=None, name="Adventurer", output=None):
+    the game saves to a private MemorySaveStore and discards its output
+    unless given others.
+    """
+    def start(save_store=None, name="Adventurer", output=None):
+        engine = GameEngine(save_store or MemorySaveStore(), output or OutputSink())
+        engine.new_game(name)
+        return engine
+    return start
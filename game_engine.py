@@ -4,180 +4,247 @@ Handles game state, command processing, and core game logic.
 """
 
 import json
-import pickle
-import os
 from player import Player
-from room import Room
-from item import Item
 from parser import Parser
-from ansi_graphics import ANSIArt, ANSIColors, colorize_text, box_text
+from world import WorldState, PLAYER, load_world
+from save_store import FileSaveStore, DEFAULT_SLOT
+from render import render_cache, ANSI_PROFILE, PROFILES
+from routes import route_table
+from ansi_graphics import ANSIColors
+from output import StdoutSink
 
 class GameEngine:
     """Main game engine that manages the game state and processes commands."""
     
-    def __init__(self):
-        """Initialize the game engine."""
+    def __init__(self, save_store=None, output=None, data_dir='data', stats=None):
+        """
+        Initialize the game engine.
+        
+        Args:
+            save_store: Where save/load keep games (files under saves/ if None)
+            output (OutputSink): Where responses are sent (standard output if None)
+            data_dir (str): Directory holding the world's data files
+            stats (PlayerStats): Store the player's numeric fields share with
+                other players, see player_stats.py (a private one if None)
+        """
         self.player = None
+        self.stats = stats
+        self.world = None
+        self.data_dir = data_dir
+        self.state = None
         self.rooms = {}
         self.items = {}
         self.messages = {}
         self.parser = Parser()
+        self.profile = ANSI_PROFILE  # terminal the output is rendered for
+        self.render = None  # RenderCache for the world and profile, set by load_data
         self.running = False
         self.lamp_on = False
         self.game_won = False
         
-        # Score values for different actions
-        self.score_values = {
-            'take_leaflet': 5,
-            'open_mailbox': 5,
-            'take_lamp': 10,
-            'take_key': 15,
-            'read_scroll': 10,
-            'open_chest': 20,
-            'take_treasure': 50
-        }
+        # Score values for different actions, filled from the world's scoring rules
+        self.score_values = {}
         
         self.scored_actions = set()  # Track which actions have been scored
-        
+        self.recorders = []  # Told about every accepted command, e.g. a Journal
+        self.presence = None  # Presence index shared with other players, see presence.py
+        self.scheduler = None  # world clock running timed events, see attach_scheduler()
+        self.timers = {}  # timer name -> pending Timer of this game
+        self.lamp_fuel = self.LAMP_FUEL  # ticks of light left when the lamp was last lit
+        self.lamp_lit_at = 0  # scheduler tick the lamp was last lit on
+        self.save_store = save_store or FileSaveStore()
+        # If set, save_later(engine, slot) writes the `save` command's save in the
+        # background and reports it afterwards as a 'saved' or 'save_failed' event
+        self.save_later = None
+        self.output = output or StdoutSink()  # buffers each response, see output.py
+    
     def load_data(self):
-        """Load game data from JSON files."""
+        """Bind the shared world template and start from an unchanged world state."""
         try:
-            # Load rooms
-            with open('data/rooms.json', 'r') as f:
-                rooms_data = json.load(f)
-            
-            for room_id, data in rooms_data.items():
-                room = Room(data['name'], data['description'], data.get('short_description'))
-                room.exits = data.get('exits', {})
-                self.rooms[room_id] = room
-            
-            # Load items
-            with open('data/items.json', 'r') as f:
-                items_data = json.load(f)
-            
-            for item_id, data in items_data.items():
-                item = Item(
-                    data['name'],
-                    data['description'],
-                    data.get('synonyms', []),
-                    data.get('takeable', True),
-                    data.get('readable', False),
-                    data.get('useable', False),
-                    data.get('openable', False),
-                    data.get('key_required')
-                )
-                
-                item.read_text = data.get('read_text', '')
-                self.items[item_id] = item
-            
-            # Load messages
-            with open('data/messages.json', 'r') as f:
-                self.messages = json.load(f)
-            
-            # Place items in rooms and containers
-            self._setup_items()
-            
+            self.world = load_world(self.data_dir)
         except FileNotFoundError as e:
-            print(f"Error loading data files: {e}")
+            self.output.print(f"Error loading data files: {e}")
             return False
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON data: {e}")
+            self.output.print(f"Error parsing JSON data: {e}")
             return False
         
+        self.messages = self.world.messages
+        self.score_values = {rule['key']: rule['points'] for rule in self.world.scoring.values()}
+        self.state = WorldState(self.world)
+        self.rooms = self.state.rooms
+        self.items = self.state.items
+        self.render = render_cache(self.world, self.profile)
         return True
     
-    def _setup_items(self):
-        """Place items in their initial locations."""
-        items_data = {}
-        with open('data/items.json', 'r') as f:
-            items_data = json.load(f)
-        
-        for item_id, data in items_data.items():
-            item = self.items[item_id]
-            
-            if 'room' in data:
-                # Item starts in a room
-                room_id = data['room']
-                if room_id in self.rooms:
-                    self.rooms[room_id].add_item(item)
-            
-            elif 'container' in data:
-                # Item starts inside another item
-                container_id = data['container']
-                if container_id in self.items:
-                    self.items[container_id].add_content(item)
-    
-    def start_game(self):
-        """Start a new game."""
+    def new_game(self, player_name="Adventurer"):
+        """Load the world and reset all state for a fresh game without any I/O."""
         if not self.load_data():
+            self.output.flush()
             return False
         
-        self.player = Player("Adventurer", "field")
+        self._replace_player(player_name, "field")
         self.running = True
         self.lamp_on = False
+        self.lamp_fuel = self.LAMP_FUEL
         self.game_won = False
         self.scored_actions = set()
+        self._sync_timers(restart=True)
+        return True
+    
+    def show_welcome(self):
+        """Show the game logo, welcome message and the starting room."""
+        self.show_art('game_logo')
+        
+        self.output.print(self.render.colorize(self.messages['welcome'], ANSIColors.BRIGHT_GREEN))
+        self.show_art('bbs_footer')
+        self.look_around()
+        self.output.flush()
+    
+    def show_art(self, name):
+        """Show a piece of static art, if the terminal profile has it."""
+        art = self.render.art[name]
+        if art:
+            self.output.print(art)
+    
+    def set_profile(self, profile):
+        """
+        Render all further output for a terminal profile.
+        
+        Args:
+            profile (TerminalProfile): The profile to switch to (see render.py)
+        """
+        self.profile = profile
+        if self.world is not None:
+            self.render = render_cache(self.world, profile)
+    
+    def start_game(self):
+        """Start a new game."""
+        if not self.new_game():
+            return False
         
         # Show the BBS-style title card
-        print(ANSIArt.title_card())
+        self.show_art('title_card')
+        self.output.flush()
         input()  # Wait for user to press enter
-        print(ANSIColors.CLEAR_SCREEN)
+        self.output.print(self.render.clear_screen)
         
         # Show main game logo
-        print(ANSIArt.game_logo())
-        
-        print(colorize_text(self.messages['welcome'], ANSIColors.BRIGHT_GREEN))
-        print(ANSIArt.bbs_footer())
-        self.look_around()
+        self.show_welcome()
         return True
     
-    def save_game(self, filename='savegame.pkl'):
-        """Save the current game state."""
+    def capture_state(self):
+        """
+        Capture how the current game differs from the world template.
+        
+        Returns:
+            dict: Plain, JSON-compatible save data for restore_state()
+        """
+        return {
+            'player': {
+                'name': self.player.name,
+                'current_room': self.player.current_room,
+                'health': self.player.health,
+                'score': self.player.score,
+                'moves': self.player.moves
+            },
+            'world': self.state.snapshot(),
+            'lamp_on': self.lamp_on,
+            'lamp_fuel': self._lamp_fuel_left(),
+            'scored_actions': sorted(self.scored_actions),
+            'game_won': self.game_won
+        }
+    
+    def _replace_player(self, name, room_id):
+        """Start a new player, giving the previous one's stats row back."""
+        if self.player:
+            self.player.release()
+        self.player = Player(name, room_id, self.stats)
+    
+    def restore_state(self, save_data):
+        """Rebuild the game from capture_state() data over a fresh world state."""
+        self.state = WorldState(self.world)
+        self.rooms = self.state.rooms
+        self.items = self.state.items
+        
+        player_data = save_data['player']
+        self._replace_player(player_data['name'], player_data['current_room'])
+        self.player.health = player_data['health']
+        self.player.score = player_data['score']
+        self.player.moves = player_data['moves']
+        
+        self.state.restore(save_data['world'])
+        for item_id in self.state.contents_of(PLAYER):
+            self.player.add_item(self.items[item_id])
+        
+        self.lamp_on = save_data.get('lamp_on', False)
+        self.lamp_fuel = save_data.get('lamp_fuel', self.LAMP_FUEL)
+        self.scored_actions = set(save_data.get('scored_actions', []))
+        self.game_won = save_data.get('game_won', False)
+        self.running = True
+        self._sync_timers(restart=True)
+    
+    def save_game(self, slot=DEFAULT_SLOT):
+        """Save how the current game differs from the world template in a save slot."""
         try:
-            if not os.path.exists('saves'):
-                os.makedirs('saves')
-            
-            save_data = {
-                'player': self.player,
-                'rooms': self.rooms,
-                'items': self.items,
-                'lamp_on': self.lamp_on,
-                'scored_actions': self.scored_actions,
-                'game_won': self.game_won
-            }
-            
-            with open(f'saves/{filename}', 'wb') as f:
-                pickle.dump(save_data, f)
-            
+            self.save_store.save(self.player.name, slot, self.capture_state())
             return True
         except Exception as e:
-            print(f"Error saving game: {e}")
+            self.output.print(f"Error saving game: {e}")
             return False
     
-    def load_game(self, filename='savegame.pkl'):
-        """Load a saved game state."""
+    def load_game(self, player_name=None, slot=DEFAULT_SLOT):
+        """
+        Load a saved game on top of the world template.
+        
+        Args:
+            player_name (str): Whose save to load (the current player's if None)
+            slot (str): Save slot to load
+        """
         try:
-            if not self.load_data():  # Load base data first
+            if player_name is None:
+                player_name = self.player.name if self.player else "Adventurer"
+            # Read the save first so a missing or bad save leaves the game untouched
+            save_data = self.save_store.load(player_name, slot)
+            if not self.load_data():
                 return False
             
-            with open(f'saves/{filename}', 'rb') as f:
-                save_data = pickle.load(f)
-            
-            self.player = save_data['player']
-            self.rooms = save_data['rooms']
-            self.items = save_data['items']
-            self.lamp_on = save_data.get('lamp_on', False)
-            self.scored_actions = save_data.get('scored_actions', set())
-            self.game_won = save_data.get('game_won', False)
-            self.running = True
+            self.restore_state(save_data)
             
             return True
         except Exception as e:
-            print(f"Error loading game: {e}")
+            self.output.print(f"Error loading game: {e}")
             return False
     
+    # Timed world rules, in ticks of the world clock (see scheduler.py)
+    LAMP_FUEL = 600  # ticks a lamp burns in all
+    LAMP_LOW_FUEL = 60  # fuel left when the player is warned
+    GRUE_DELAY = 10  # ticks in the dark without light before a grue attacks, and between attacks
+    GRUE_DAMAGE = 25
+    HEAL_INTERVAL = 30  # ticks between recovering health while hurt
+    HEAL_AMOUNT = 5
+    
+    # Inputs answered straight from the easter egg messages
+    EASTER_EGGS = frozenset(['xyzzy', 'plugh', 'hello', 'zork', 'author'])
+    
+    # Commands that never change the game, so recorders can skip them
+    READ_ONLY_COMMANDS = frozenset([
+        'look', 'examine', 'inventory', 'help', 'score', 'health', 'status', 'unknown', 'save', 'quit',
+        'terminal', 'easter_egg', 'dead'
+    ])
+    
+    # Commands a dead player can still use; anything else is refused until they load or quit
+    DEAD_COMMANDS = frozenset(['load', 'quit', 'help', 'score', 'health', 'status', 'terminal'])
+    
     def process_command(self, input_text):
-        """Process a user command."""
+        """Process a user command, sending its whole response in one write."""
+        try:
+            self._dispatch(input_text)
+        finally:
+            self.output.flush()
+    
+    def _dispatch(self, input_text):
+        """Parse a command and run its handler, writing the response into the output sink."""
         command, args = self.parser.parse(input_text)
         
         if command is None:
@@ -185,132 +252,168 @@ class GameEngine:
         
         # Handle special cases and Easter eggs
         input_lower = input_text.lower().strip()
-        if input_lower in ['xyzzy', 'plugh', 'hello', 'zork', 'author']:
-            print(self.messages['easter_eggs'].get(input_lower, ''))
+        if self.player is not None and not self.player.is_alive() and command not in self.DEAD_COMMANDS:
+            self.output.print(self.render.colorize(self.messages['game']['death_message'], ANSIColors.BRIGHT_RED))
+            command = 'dead'
+        elif input_lower in self.EASTER_EGGS:
+            self.output.print(self.messages['easter_eggs'].get(input_lower, ''))
+            command = 'easter_egg'
+        else:
+            # Dispatch to appropriate command handler
+            handler = self.command_handlers.get(command)
+            if not handler:
+                return
+            handler(self, args)
+            if self.presence:
+                self.presence.update(self)
+            self._sync_timers()
+        
+        # The response is still buffered here, so recorders can see it in self.output
+        for recorder in self.recorders:
+            recorder.record(self, command, input_text)
+    
+    def save_command(self):
+        """Save the game and report the result."""
+        if self.save_later is not None:
+            self.save_later(self, DEFAULT_SLOT)
             return
-        
-        # Dispatch to appropriate command handler
-        if command == 'move':
-            self.move_player(args)
-        elif command == 'look':
+        if self.save_game():
+            self.output.print(self.messages['game']['save_success'])
+        else:
+            self.output.print(self.messages['game']['save_error'])
+    
+    def load_command(self):
+        """Load the saved game and report the result."""
+        if self.load_game():
+            self.output.print(self.messages['game']['load_success'])
             self.look_around()
-        elif command == 'examine':
-            self.examine_object(args)
-        elif command == 'inventory':
-            self.show_inventory()
-        elif command == 'take':
-            self.take_object(args)
-        elif command == 'drop':
-            self.drop_object(args)
-        elif command == 'use':
-            self.use_object(args)
-        elif command == 'open':
-            self.open_object(args)
-        elif command == 'read':
-            self.read_object(args)
-        elif command == 'help':
-            print(self.parser.get_help_text())
-        elif command == 'quit':
-            self.quit_game()
-        elif command == 'save':
-            if self.save_game():
-                print(self.messages['game']['save_success'])
-            else:
-                print(self.messages['game']['save_error'])
-        elif command == 'load':
-            if self.load_game():
-                print(self.messages['game']['load_success'])
-                self.look_around()
-            else:
-                print(self.messages['game']['load_error'])
-        elif command == 'score':
-            self.show_score()
-        elif command == 'health':
-            self.show_health()
-        elif command == 'status':
-            print(self.player.show_status())
-        elif command == 'unknown':
-            print(self.messages['game']['unknown_command'])
+        else:
+            self.output.print(self.messages['game']['load_error'])
     
     def move_player(self, direction):
         """Move the player in the specified direction."""
         if not direction:
-            print(self.messages['movement']['no_exit'])
+            self.output.print(self.messages['movement']['no_exit'])
             return
         
         current_room = self.rooms[self.player.current_room]
         next_room_id = current_room.get_exit(direction)
         
         if not next_room_id:
-            print(self.messages['movement']['no_exit'])
+            self.output.print(self.messages['movement']['no_exit'])
             return
         
         # Check if moving into dark room without light
-        if next_room_id == 'hallway' and not self.lamp_on:
-            print(self.messages['dark_room']['movement_blocked'])
+        if next_room_id in self.world.dark_rooms and not self.lamp_on:
+            self.output.print(self.messages['dark_room']['movement_blocked'])
             return
         
         self.player.move_to(next_room_id)
         self.look_around()
     
+    def travel(self, destination_name):
+        """Walk the shortest route to a named room, only describing the room at the end."""
+        if not destination_name:
+            self.output.print("Travel where?")
+            return
+        
+        name = destination_name.strip()
+        if name.lower().startswith('to '):
+            name = name[3:].strip()
+        routes = route_table(self.world)
+        matches = routes.find_rooms(name)
+        if not matches:
+            self.output.print(f"You don't know of any place called '{name}'.")
+            return
+        if len(matches) > 1:
+            places = ', '.join(self.rooms[room_id].name for room_id in matches)
+            self.output.print(f"Which place do you mean: {places}?")
+            return
+        destination = matches[0]
+        if destination == self.player.current_room:
+            self.output.print("You're already there.")
+            return
+        
+        blocked = frozenset() if self.lamp_on else self.world.dark_rooms
+        steps = routes.route(self.player.current_room, destination, blocked)
+        if steps is None:
+            if blocked and routes.route(self.player.current_room, destination) is not None:
+                self.output.print(self.messages['dark_room']['movement_blocked'])
+            else:
+                self.output.print(f"You can't find a way to {self.rooms[destination].name} from here.")
+            return
+        
+        # Summarize the rooms on the way instead of describing each one
+        for _, room_id in steps:
+            self.player.move_to(room_id)
+        directions = ', '.join(direction for direction, _ in steps)
+        if len(steps) > 1:
+            passed = ', '.join(self.rooms[room_id].name for _, room_id in steps[:-1])
+            self.output.print(f"You travel {directions}, passing through {passed}.")
+        else:
+            self.output.print(f"You travel {directions}.")
+        self.look_around()
+    
     def look_around(self):
         """Show the current room description."""
-        current_room = self.rooms[self.player.current_room]
+        room_id = self.player.current_room
+        current_room = self.rooms[room_id]
+        render = self.render
         
         # Handle dark room with special ANSI graphics
-        if self.player.current_room == 'hallway' and not self.lamp_on:
-            print(ANSIArt.dark_room_warning())
-            print(colorize_text(self.messages['dark_room']['description'], ANSIColors.BRIGHT_RED))
+        if room_id in self.world.dark_rooms and not self.lamp_on:
+            self.show_art('dark_room_warning')
+            self.output.print(render.colorize(self.messages['dark_room']['description'], ANSIColors.BRIGHT_RED))
             return
         
         # Show room with ANSI border
-        print(ANSIArt.room_border(current_room.name, current_room.short_description))
+        self.output.print(render.room_header(room_id))
         
         # Add special ASCII art for certain rooms
-        if self.player.current_room == 'house':
-            print(ANSIArt.ascii_house())
-        elif self.player.current_room == 'cave':
-            print(ANSIArt.ascii_cave())
-        elif self.player.current_room == 'living_room':
+        if room_id == 'house':
+            self.show_art('ascii_house')
+        elif room_id == 'cave':
+            self.show_art('ascii_cave')
+        elif room_id == 'living_room':
             # Check if treasure chest is still there
             chest = current_room.get_item('treasure chest')
             if chest:
-                print(ANSIArt.ascii_treasure())
+                self.show_art('ascii_treasure')
         
         # Show room description with color
         description = current_room.description
-        if self.lamp_on and self.player.current_room == 'hallway':
-            description += f" {ANSIArt.lamp_glow()} Your lamp illuminates the darkness."
+        if self.lamp_on and room_id in self.world.dark_rooms:
+            description += f" {render.art['lamp_glow']} Your lamp illuminates the darkness."
         
-        print(colorize_text(description, ANSIColors.BRIGHT_WHITE))
+        self.output.print(render.colorize(description, ANSIColors.BRIGHT_WHITE))
         
         # Show items in room with color
-        if current_room.items:
-            print(colorize_text("\nYou can see:", ANSIColors.BRIGHT_CYAN))
-            for item in current_room.items:
+        items = current_room.items
+        if items:
+            self.output.print(render.colorize("\nYou can see:", ANSIColors.BRIGHT_CYAN))
+            for item in items:
                 if item.name == 'lamp' and self.lamp_on:
-                    print(f"  {ANSIArt.lamp_glow()} {colorize_text(item.name, ANSIColors.BRIGHT_YELLOW)} (glowing)")
+                    self.output.print(f"  {render.art['lamp_glow']} {render.colorize(item.name, ANSIColors.BRIGHT_YELLOW)} (glowing)")
                 else:
-                    print(f"  {colorize_text(item.name, ANSIColors.BRIGHT_GREEN)}")
+                    self.output.print(f"  {render.colorize(item.name, ANSIColors.BRIGHT_GREEN)}")
         
         # Show exits with color
-        exits = current_room.exits
-        if exits:
-            exit_text = "Exits: " + ", ".join([colorize_text(direction, ANSIColors.BRIGHT_MAGENTA) for direction in exits.keys()])
-            print(f"\n{exit_text}")
+        exits_line = render.exits_line(room_id)
+        if exits_line:
+            self.output.print(exits_line)
         
         # Show status bar
-        print(ANSIArt.status_bar(self.player.health, self.player.score, self.player.moves, len(self.player.inventory)))
+        self.output.print(render.status_bar(self.player.health, self.player.score, self.player.moves, len(self.player.inventory)))
     
     def examine_object(self, object_name):
         """Examine an object in detail."""
         if not object_name:
-            print("Examine what?")
+            self.output.print("Examine what?")
             return
         
         # Check if in dark room
-        if self.player.current_room == 'hallway' and not self.lamp_on:
-            print(self.messages['dark_room']['action_blocked'])
+        if self.player.current_room in self.world.dark_rooms and not self.lamp_on:
+            self.output.print(self.messages['dark_room']['action_blocked'])
             return
         
         object_name = self.parser.normalize_object_name(object_name)
@@ -318,40 +421,38 @@ class GameEngine:
         # Check inventory first
         item = self.player.get_item(object_name)
         if item:
-            print(item.examine())
+            self.output.print(item.examine())
             return
         
         # Check current room
         current_room = self.rooms[self.player.current_room]
         item = current_room.get_item(object_name)
         if item:
-            print(item.examine())
+            self.output.print(item.examine())
             return
         
         # Check inside open containers in the room
-        for room_item in current_room.items:
-            if room_item.is_open:
-                for content_item in room_item.contents:
-                    if content_item.matches_name(object_name):
-                        print(content_item.examine())
-                        return
+        content_item = current_room.get_contained_item(object_name)
+        if content_item:
+            self.output.print(content_item.examine())
+            return
         
-        print(self.messages['interaction']['nothing_special'])
+        self.output.print(self.messages['interaction']['nothing_special'])
     
     def show_inventory(self):
         """Show the player's inventory."""
         inventory_text = self.player.show_inventory()
-        print(box_text(inventory_text, ANSIColors.BRIGHT_CYAN))
+        self.output.print(self.render.box(inventory_text, ANSIColors.BRIGHT_CYAN))
     
     def take_object(self, object_name):
         """Take an object from the current room."""
         if not object_name:
-            print("Take what?")
+            self.output.print("Take what?")
             return
         
         # Check if in dark room
-        if self.player.current_room == 'hallway' and not self.lamp_on:
-            print(colorize_text(self.messages['dark_room']['action_blocked'], ANSIColors.BRIGHT_RED))
+        if self.player.current_room in self.world.dark_rooms and not self.lamp_on:
+            self.output.print(self.render.colorize(self.messages['dark_room']['action_blocked'], ANSIColors.BRIGHT_RED))
             return
         
         object_name = self.parser.normalize_object_name(object_name)
@@ -360,33 +461,41 @@ class GameEngine:
         # Check if item is in room
         item = current_room.get_item(object_name)
         if item and item.takeable:
-            current_room.remove_item(object_name)
-            self.player.add_item(item)
-            print(colorize_text(self.messages['inventory']['taken'], ANSIColors.BRIGHT_GREEN))
+            self._give_to_player(item)
+            self.output.print(self.render.colorize(self.messages['inventory']['taken'], ANSIColors.BRIGHT_GREEN))
+            self._announce(f"{self.player.name} takes the {item.name}.")
             
             # Award points for specific items
-            self._check_scoring('take', item.name)
+            self._check_scoring('take', item)
             return
         
         # Check inside open containers
-        for room_item in current_room.items:
-            if room_item.is_open:
-                for content_item in room_item.contents:
-                    if content_item.matches_name(object_name) and content_item.takeable:
-                        room_item.contents.remove(content_item)
-                        self.player.add_item(content_item)
-                        print(colorize_text(self.messages['inventory']['taken'], ANSIColors.BRIGHT_GREEN))
-                        
-                        # Award points 
-                        self._check_scoring('take', content_item.name)
-                        return
-        
-        print(colorize_text(self.messages['inventory']['not_here'], ANSIColors.BRIGHT_RED))
+        content_item = current_room.get_contained_item(object_name)
+        if content_item and content_item.takeable:
+            self._give_to_player(content_item)
+            self.output.print(self.render.colorize(self.messages['inventory']['taken'], ANSIColors.BRIGHT_GREEN))
+            self._announce(f"{self.player.name} takes the {content_item.name}.")
+            
+            # Award points 
+            self._check_scoring('take', content_item)
+            return
+        
+        self.output.print(self.render.colorize(self.messages['inventory']['not_here'], ANSIColors.BRIGHT_RED))
+    
+    def _announce(self, text):
+        """Tell the other players in this player's room what just happened."""
+        if self.presence:
+            self.presence.broadcast(self.player.current_room, text, self)
+    
+    def _give_to_player(self, item):
+        """Move an item from wherever it is into the player's inventory."""
+        self.state.move(item.item_id, PLAYER)
+        self.player.add_item(item)
     
     def drop_object(self, object_name):
         """Drop an object in the current room."""
         if not object_name:
-            print("Drop what?")
+            self.output.print("Drop what?")
             return
         
         object_name = self.parser.normalize_object_name(object_name)
@@ -395,52 +504,56 @@ class GameEngine:
         if item:
             current_room = self.rooms[self.player.current_room]
             current_room.add_item(item)
-            print(self.messages['inventory']['dropped'])
+            self.output.print(self.messages['inventory']['dropped'])
+            self._announce(f"{self.player.name} drops the {item.name}.")
         else:
-            print(self.messages['inventory']['not_carrying'])
+            self.output.print(self.messages['inventory']['not_carrying'])
     
     def use_object(self, object_name):
         """Use an object."""
         if not object_name:
-            print("Use what?")
+            self.output.print("Use what?")
             return
         
         object_name = self.parser.normalize_object_name(object_name)
         item = self.player.get_item(object_name)
         
         if not item:
-            print(self.messages['inventory']['not_carrying'])
+            self.output.print(self.messages['inventory']['not_carrying'])
             return
         
         # Special case for lamp with ANSI effects
         if item.matches_name('lamp') or item.matches_name('lantern'):
             if not self.lamp_on:
+                if self.lamp_fuel <= 0:
+                    self.output.print(self.render.colorize(self.messages['lamp']['no_fuel'], ANSIColors.BRIGHT_RED))
+                    return
                 self.lamp_on = True
-                print(f"{ANSIArt.lamp_glow()} {colorize_text(self.messages['lamp']['turn_on'], ANSIColors.BRIGHT_YELLOW)}")
+                self.output.print(f"{self.render.art['lamp_glow']} {self.render.colorize(self.messages['lamp']['turn_on'], ANSIColors.BRIGHT_YELLOW)}")
                 # If in dark hallway, show the room description
-                if self.player.current_room == 'hallway':
+                if self.player.current_room in self.world.dark_rooms:
                     self.look_around()
             else:
                 self.lamp_on = False
-                print(colorize_text(self.messages['lamp']['turn_off'], ANSIColors.DIM))
+                self.output.print(self.render.colorize(self.messages['lamp']['turn_off'], ANSIColors.DIM))
             return
         
         # Generic use
         if item.useable:
             success, message = item.use()
-            print(colorize_text(message, ANSIColors.BRIGHT_GREEN if success else ANSIColors.BRIGHT_RED))
+            self.output.print(self.render.colorize_dynamic(message, ANSIColors.BRIGHT_GREEN if success else ANSIColors.BRIGHT_RED))
         else:
-            print(colorize_text(self.messages['interaction']['cant_use'], ANSIColors.BRIGHT_RED))
+            self.output.print(self.render.colorize(self.messages['interaction']['cant_use'], ANSIColors.BRIGHT_RED))
     
     def open_object(self, object_name):
         """Open an object."""
         if not object_name:
-            print("Open what?")
+            self.output.print("Open what?")
             return
         
         # Check if in dark room
-        if self.player.current_room == 'hallway' and not self.lamp_on:
-            print(self.messages['dark_room']['action_blocked'])
+        if self.player.current_room in self.world.dark_rooms and not self.lamp_on:
+            self.output.print(self.messages['dark_room']['action_blocked'])
             return
         
         object_name = self.parser.normalize_object_name(object_name)
@@ -454,36 +567,39 @@ class GameEngine:
             item = self.player.get_item(object_name)
         
         if not item:
-            print(self.messages['inventory']['not_here'])
+            # Check inside open containers, e.g. a casket in an open chest
+            item = current_room.get_contained_item(object_name)
+        
+        if not item:
+            self.output.print(self.messages['inventory']['not_here'])
             return
         
         if not item.openable:
-            print(self.messages['interaction']['cant_open'])
+            self.output.print(self.messages['interaction']['cant_open'])
             return
         
         # Try to open with player's items as keys
         success, message = item.open(self.player.inventory)
-        print(message)
+        self.output.print(message)
         
         if success:
-            self._check_scoring('open', item.name)
+            self._check_scoring('open', item)
             
             # Special case: if treasure chest is opened, add treasure to room
             if item.name == 'treasure chest' and item.contents:
                 current_room = self.rooms[self.player.current_room]
                 for content_item in item.contents:
-                    current_room.add_item(content_item)
-                item.contents = []  # Remove from chest since they're now in room
+                    current_room.add_item(content_item)  # Moves it out of the chest
     
     def read_object(self, object_name):
         """Read an object."""
         if not object_name:
-            print("Read what?")
+            self.output.print("Read what?")
             return
         
         # Check if in dark room
-        if self.player.current_room == 'hallway' and not self.lamp_on:
-            print(self.messages['dark_room']['action_blocked'])
+        if self.player.current_room in self.world.dark_rooms and not self.lamp_on:
+            self.output.print(self.messages['dark_room']['action_blocked'])
             return
         
         object_name = self.parser.normalize_object_name(object_name)
@@ -491,84 +607,261 @@ class GameEngine:
         # Check inventory first
         item = self.player.get_item(object_name)
         if item:
-            print(item.read())
+            self.output.print(item.read())
             if item.readable:
-                self._check_scoring('read', item.name)
+                self._check_scoring('read', item)
             return
         
         # Check current room
         current_room = self.rooms[self.player.current_room]
         item = current_room.get_item(object_name)
         if item:
-            print(item.read())
+            self.output.print(item.read())
             if item.readable:
-                self._check_scoring('read', item.name)
+                self._check_scoring('read', item)
             return
         
-        print(self.messages['inventory']['not_here'])
+        self.output.print(self.messages['inventory']['not_here'])
     
-    def _check_scoring(self, action, item_name):
-        """Check if an action should award points."""
-        action_key = f"{action}_{item_name.lower().replace(' ', '_')}"
+    def _check_scoring(self, action, item):
+        """Check if an action should award points or end the game."""
+        rule = self.world.scoring.get((action, item.item_id))
+        if rule is None or rule['key'] in self.scored_actions:
+            return
         
-        if action_key not in self.scored_actions:
-            points = 0
-            
-            if action_key == 'take_leaflet':
-                points = self.score_values['take_leaflet']
-            elif action_key == 'open_mailbox':
-                points = self.score_values['open_mailbox']
-            elif action_key == 'take_lamp':
-                points = self.score_values['take_lamp']
-            elif action_key == 'take_brass_key':
-                points = self.score_values['take_key']
-            elif action_key == 'read_ancient_scroll':
-                points = self.score_values['read_scroll']
-            elif action_key == 'open_treasure_chest':
-                points = self.score_values['open_chest']
-            elif action_key == 'take_golden_treasure':
-                points = self.score_values['take_treasure']
-                # Win condition - taking the treasure wins the game!
-                self._win_game()
-            
-            if points > 0:
-                self.player.add_score(points)
-                self.scored_actions.add(action_key)
-                score_msg = f"[+{points} points] Total Score: {self.player.score}"
-                print(colorize_text(score_msg, ANSIColors.BRIGHT_YELLOW))
+        if rule['wins']:
+            # Win condition - e.g. taking the treasure wins the game!
+            self._win_game()
+        
+        points = rule['points']
+        if points > 0:
+            self.player.add_score(points)
+            self.scored_actions.add(rule['key'])
+            score_msg = f"[+{points} points] Total Score: {self.player.score}"
+            self.output.print(self.render.colorize_dynamic(score_msg, ANSIColors.BRIGHT_YELLOW))
     
     def _win_game(self):
         """Handle winning the game."""
         self.game_won = True
-        print(ANSIArt.victory_banner())
-        print(colorize_text(self.messages['game']['win_message'].format(
+        self.show_art('victory_banner')
+        self.output.print(self.render.colorize_dynamic(self.messages['game']['win_message'].format(
             score=self.player.score,
             moves=self.player.moves
         ), ANSIColors.BRIGHT_YELLOW))
     
+    def attach_scheduler(self, scheduler):
+        """
+        Run this game's timed events (lamp fuel, grues, healing) on a world clock.
+        
+        Without a scheduler nothing happens between commands, which keeps
+        scripted, replayed and solved games deterministic.
+        
+        Args:
+            scheduler (TickScheduler): The world clock, or None to stop timed events
+        """
+        self.lamp_fuel = self._lamp_fuel_left()
+        self._stop_timers()
+        self.scheduler = scheduler
+        if self.player:
+            self._sync_timers()
+    
+    def _lamp_fuel_left(self):
+        """Ticks of light left in the lamp right now."""
+        if 'lamp' in self.timers:
+            return max(0, self.lamp_fuel - (self.scheduler.now - self.lamp_lit_at))
+        return self.lamp_fuel
+    
+    def _start_timer(self, name, delay, event):
+        """Schedule a timed event under a timer name."""
+        self.timers[name] = self.scheduler.schedule(delay, self.run_event, event)
+    
+    def _stop_timers(self):
+        """Cancel all of this game's timers."""
+        for timer in self.timers.values():
+            self.scheduler.cancel(timer)
+        self.timers.clear()
+    
+    def _sync_timers(self, restart=False):
+        """
+        Start and stop this game's timers to match its state (only on a world clock).
+        
+        Args:
+            restart (bool): Drop every timer first, e.g. after a game was replaced
+        """
+        if restart:
+            self._stop_timers()
+        if self.scheduler is None:
+            return
+        
+        playing = self.running and not self.game_won
+        alive = playing and self.player.health > 0
+        
+        # The lamp burns fuel while it is lit, with a warning when it runs low
+        if self.lamp_on and playing:
+            if 'lamp' not in self.timers:
+                self.lamp_lit_at = self.scheduler.now
+                until_low = self.lamp_fuel - self.LAMP_LOW_FUEL
+                if until_low > 0:
+                    self._start_timer('lamp', until_low, 'lamp_low')
+                else:
+                    self._start_timer('lamp', self.lamp_fuel, 'lamp_out')
+        elif 'lamp' in self.timers:
+            self.lamp_fuel = self._lamp_fuel_left()
+            self.scheduler.cancel(self.timers.pop('lamp'))
+        
+        in_dark = self.player.current_room in self.world.dark_rooms and not self.lamp_on
+        for name, wanted, delay in (('grue', alive and in_dark, self.GRUE_DELAY),
+                                    ('heal', alive and self.player.health < 100, self.HEAL_INTERVAL)):
+            if wanted and name not in self.timers:
+                self._start_timer(name, delay, name)
+            elif not wanted and name in self.timers:
+                self.scheduler.cancel(self.timers.pop(name))
+    
+    def run_event(self, event):
+        """
+        Apply a timed world event, sending its whole response in one write.
+        
+        Recorders see the event as the command 'event' with the event's name
+        as its input, so a recording can replay it.
+        
+        Args:
+            event (str): Name of the event, a key of event_handlers
+        """
+        try:
+            self.timers.pop(self.EVENT_TIMERS.get(event), None)
+            self.event_handlers[event](self)
+            self._sync_timers()
+            for recorder in self.recorders:
+                recorder.record(self, 'event', event)
+            # Players wait at a prompt between commands, so show it again after unprompted output
+            if self.scheduler and self.output.getvalue():
+                self.output.print(self.render.art['command_prompt'], end="")
+        finally:
+            self.output.flush()
+    
+    def _lamp_low(self):
+        """Warn that the lamp is running out of fuel."""
+        self.lamp_fuel = self.LAMP_LOW_FUEL
+        self.output.print(self.render.colorize(self.messages['lamp']['low_fuel'], ANSIColors.YELLOW))
+    
+    def _lamp_out(self):
+        """Put the lamp out for good."""
+        self.lamp_fuel = 0
+        self.lamp_on = False
+        self.output.print(self.render.colorize(self.messages['lamp']['burned_out'], ANSIColors.BRIGHT_RED))
+        if self.player.current_room in self.world.dark_rooms:
+            self.output.print(self.render.colorize(self.messages['dark_room']['description'], ANSIColors.BRIGHT_RED))
+    
+    def _grue_attack(self):
+        """Let a grue bite a player lingering in the dark."""
+        self.output.print(self.render.colorize(self.messages['dark_room']['grue_attack'], ANSIColors.BRIGHT_RED))
+        if self.player.take_damage(self.GRUE_DAMAGE):
+            self.output.print(self.render.colorize(self.messages['game']['death_message'], ANSIColors.BRIGHT_RED))
+        else:
+            self.output.print(f"Health: {self.player.health}/100")
+    
+    def _saved(self):
+        """Report that a save written in the background is safely stored."""
+        self.output.print(self.messages['game']['save_success'])
+    
+    def _save_failed(self):
+        """Report that a save written in the background could not be stored."""
+        self.output.print(self.messages['game']['save_error'])
+    
+    def _heal(self):
+        """Recover a little health over time."""
+        self.player.heal(self.HEAL_AMOUNT)
+        if self.player.health >= 100:
+            self.output.print(self.render.colorize(self.messages['game']['recovered'], ANSIColors.BRIGHT_GREEN))
+    
+    # Event name -> handler(engine), run by run_event
+    event_handlers = {
+        'lamp_low': _lamp_low,
+        'lamp_out': _lamp_out,
+        'grue': _grue_attack,
+        'heal': _heal,
+        'saved': _saved,
+        'save_failed': _save_failed,
+    }
+    
+    # Event name -> name of the timer it is scheduled under (save reports have none)
+    EVENT_TIMERS = {'lamp_low': 'lamp', 'lamp_out': 'lamp', 'grue': 'grue', 'heal': 'heal'}
+    
     def show_score(self):
         """Show the player's current score."""
-        max_score = sum(self.score_values.values())
-        print(f"Score: {self.player.score}/{max_score}")
-        print(f"Moves: {self.player.moves}")
+        max_score = self.world.max_score
+        self.output.print(f"Score: {self.player.score}/{max_score}")
+        self.output.print(f"Moves: {self.player.moves}")
     
     def show_health(self):
         """Show the player's health."""
-        print(f"Health: {self.player.health}/100")
+        self.output.print(f"Health: {self.player.health}/100")
+    
+    def set_terminal(self, profile_name):
+        """Switch the terminal profile, or list the profiles when none is named."""
+        names = ', '.join(PROFILES)
+        if not profile_name:
+            self.output.print(f"Terminal: {self.profile.name} (available: {names})")
+            return
+        
+        profile = PROFILES.get(profile_name.strip())
+        if profile is None:
+            self.output.print(f"Unknown terminal '{profile_name}'. Choose one of: {names}")
+            return
+        
+        self.set_profile(profile)
+        self.output.print(f"Terminal set to {profile.name}.")
     
     def quit_game(self):
         """Quit the game."""
-        print(self.messages['game']['quit_confirm'])
+        self.output.print(self.messages['game']['quit_confirm'])
         self.running = False
     
     def run(self):
         """Main game loop."""
         while self.running and not self.game_won:
             try:
-                print(ANSIArt.command_prompt(), end="")
+                self.output.print(self.render.art['command_prompt'], end="")
+                self.output.flush()
                 user_input = input().strip()
                 if user_input:
                     self.process_command(user_input)
             except (EOFError, KeyboardInterrupt):
-                print(f"\n{colorize_text(self.messages['game']['quit_confirm'], ANSIColors.BRIGHT_YELLOW)}")
-                break
\ No newline at end of file
+                self.output.print(f"\n{self.render.colorize(self.messages['game']['quit_confirm'], ANSIColors.BRIGHT_YELLOW)}")
+                self.output.flush()
+                break
+    
+    # Command name -> handler(engine, args), consulted once per command by
+    # process_command. Add new commands here or with register_command().
+    command_handlers = {
+        'move': move_player,
+        'look': lambda engine, args: engine.look_around(),
+        'examine': examine_object,
+        'inventory': lambda engine, args: engine.show_inventory(),
+        'take': take_object,
+        'drop': drop_object,
+        'use': use_object,
+        'open': open_object,
+        'read': read_object,
+        'help': lambda engine, args: engine.output.print(engine.parser.get_help_text()),
+        'quit': lambda engine, args: engine.quit_game(),
+        'save': lambda engine, args: engine.save_command(),
+        'load': lambda engine, args: engine.load_command(),
+        'score': lambda engine, args: engine.show_score(),
+        'health': lambda engine, args: engine.show_health(),
+        'status': lambda engine, args: engine.output.print(engine.player.show_status()),
+        'unknown': lambda engine, args: engine.output.print(engine.messages['game']['unknown_command']),
+        'terminal': set_terminal,
+        'travel': travel,
+    }
+    
+    @classmethod
+    def register_command(cls, command, handler):
+        """
+        Register the handler for a parsed command.
+        
+        Args:
+            command (str): Command name produced by the parser
+            handler (callable): Called as handler(engine, args)
+        """
+        cls.command_handlers[command] = handler
\ No newline at end of file
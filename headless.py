@@ -0,0 +1,237 @@
+"""
+Headless play for ZorkMUD: Sentinel Realm
+Runs scripted command files through the engine without a terminal.
+
+A script is a text file with one command per line; blank lines and lines
+starting with '#' are ignored. Each script gets a fresh game that never
+waits for input, shows no title card or art (the machine terminal profile
+by default) and keeps its saves in memory, so any number of scripts can
+run side by side. Results are plain dicts that serialize straight to JSON.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import GameEngine
+from output import CaptureSink
+from render import PROFILES, MACHINE_PROFILE
+from save_store import MemorySaveStore
+from world import load_world
+
+def read_script(stream):
+    """
+    Read the commands of a script.
+    
+    Args:
+        stream: Text file or iterable of lines
+    
+    Returns:
+        list: The commands, stripped, without blank and comment lines
+    """
+    commands = []
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            commands.append(line)
+    return commands
+
+def run_script(commands, player_name="Adventurer", profile=MACHINE_PROFILE, save_store=None, data_dir='data'):
+    """
+    Play a list of commands in a fresh game.
+    
+    Commands after the player quits or wins are not run.
+    
+    Args:
+        commands (list): Commands to process, in order
+        player_name (str): Name of the scripted player
+        profile (TerminalProfile): How output is rendered (see render.py)
+        save_store: Store for the script's saves (a private MemorySaveStore if None)
+        data_dir (str): Directory holding the world's data files
+    
+    Returns:
+        dict: 'opening' (the first room description), 'transcript' (a list of
+        {'command', 'output'}), 'commands_run', 'finished', 'won', 'score',
+        'max_score', 'moves', 'health', 'room', 'inventory', and 'error' when
+        the game could not start
+    """
+    output = CaptureSink()
+    engine = GameEngine(save_store or MemorySaveStore(), output, data_dir)
+    engine.set_profile(profile)
+    if not engine.new_game(player_name):
+        return {'error': output.take().strip() or "Could not start game", 'transcript': []}
+    
+    engine.look_around()
+    output.flush()
+    opening = output.take()
+    
+    transcript = []
+    for command in commands:
+        if not engine.running or engine.game_won:
+            break
+        engine.process_command(command)
+        transcript.append({'command': command, 'output': output.take()})
+    
+    player = engine.player
+    return {
+        'opening': opening,
+        'transcript': transcript,
+        'commands_run': len(transcript),
+        'finished': not engine.running or engine.game_won,
+        'won': engine.game_won,
+        'score': player.score,
+        'max_score': engine.world.max_score,
+        'moves': player.moves,
+        'health': player.health,
+        'room': player.current_room,
+        'inventory': [item.name for item in player.inventory],
+    }
+
+def run_script_file(path, **options):
+    """
+    Play a script file ('-' for standard input) in a fresh game.
+    
+    Args:
+        path (str): The script file
+        options: Passed on to run_script()
+    
+    Returns:
+        dict: run_script()'s result, plus 'script' (the path)
+    """
+    if path == '-':
+        commands = read_script(sys.stdin)
+    else:
+        with open(path, encoding='utf-8') as f:
+            commands = read_script(f)
+    result = run_script(commands, **options)
+    result['script'] = path
+    return result
+
+def _run_job(job):
+    """Run one script in a pool worker; errors are returned, not raised."""
+    path, commands, options = job
+    try:
+        if commands is None:
+            return run_script_file(path, **options)
+        result = run_script(commands, **options)
+        result['script'] = path
+        return result
+    except (OSError, UnicodeDecodeError) as e:
+        return {'script': path, 'error': f"Could not read script: {e}", 'transcript': []}
+
+def run_scripts(paths, jobs=None, **options):
+    """
+    Play many scripts, each in its own fresh game, across a process pool.
+    
+    Every worker process loads the world once and then runs script after
+    script with it.
+    
+    Args:
+        paths (list): Script files
+        jobs (int): Worker processes (one per CPU if None; 1 runs in this process)
+        options: Passed on to run_script()
+    
+    Yields:
+        dict: Each script's result, in the order of paths
+    """
+    # Workers can't share this process's standard input, so it is read up front
+    work = [(path, read_script(sys.stdin) if path == '-' else None, options) for path in paths]
+    if jobs == 1 or len(work) <= 1:
+        for job in work:
+            yield _run_job(job)
+        return
+    
+    workers = jobs or os.cpu_count() or 1
+    chunksize = max(1, min(64, len(work) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=load_world,
+                             initargs=(options.get('data_dir', 'data'),)) as pool:
+        yield from pool.map(_run_job, work, chunksize=chunksize)
+
+def format_transcript(result):
+    """
+    Format a script's result as a readable transcript.
+    
+    Args:
+        result (dict): A run_script() result
+    
+    Returns:
+        str: The opening, each command with its output, and a summary line
+    """
+    if 'error' in result:
+        return f"Error: {result['error']}\n"
+    
+    lines = [result['opening'].rstrip('\n')]
+    for step in result['transcript']:
+        lines.append(f"> {step['command']}")
+        lines.append(step['output'].rstrip('\n'))
+    lines.append(f"-- Score: {result['score']}/{result['max_score']}  Moves: {result['moves']}"
+                 f"  Won: {'yes' if result['won'] else 'no'}")
+    return '\n'.join(lines) + '\n'
+
+def _result_names(paths):
+    """
+    Name the --out result file of each script after the script, keeping names apart.
+    
+    Scripts whose base names collide (walk.txt in two directories, or one
+    script given twice) get their position on the command line as a prefix,
+    so no result overwrites another.
+    
+    Args:
+        paths (list): Script files ('-' for stdin)
+    
+    Returns:
+        list: A file name stem per script, in the order of paths
+    """
+    stems = ['stdin' if path == '-' else os.path.splitext(os.path.basename(path))[0] for path in paths]
+    counts = Counter(stems)
+    width = len(str(len(paths)))
+    return [f"{index:0{width}d}-{stem}" if counts[stem] > 1 else stem
+            for index, stem in enumerate(stems, 1)]
+
+def run_cli(args):
+    """
+    Command line entry point: python main.py run-script SCRIPT... [options]
+    
+    Args:
+        args (list): Arguments after 'run-script'
+    
+    Returns:
+        int: Exit status (1 if any script could not be run)
+    """
+    parser = argparse.ArgumentParser(
+        prog='python main.py run-script',
+        description="Run command scripts headlessly and write transcripts or JSON results."
+    )
+    parser.add_argument('scripts', nargs='+', help="script files, one command per line ('-' for stdin)")
+    parser.add_argument('--json', action='store_true', help="write JSON results instead of transcripts")
+    parser.add_argument('--jobs', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--terminal', choices=list(PROFILES), default=MACHINE_PROFILE.name,
+                        help="terminal profile the output is rendered for")
+    parser.add_argument('--name', default="Adventurer", help="player name")
+    parser.add_argument('--data', default='data', help="world data directory")
+    parser.add_argument('--out', help="directory for one result file per script instead of stdout")
+    options = parser.parse_args(args)
+    
+    if options.out:
+        os.makedirs(options.out, exist_ok=True)
+    
+    status = 0
+    results = run_scripts(options.scripts, options.jobs,
+                          player_name=options.name, profile=PROFILES[options.terminal], data_dir=options.data)
+    names = _result_names(options.scripts)
+    for name, result in zip(names, results):
+        if 'error' in result:
+            status = 1
+        if not options.out and not options.json and len(options.scripts) > 1:
+            sys.stdout.write(f"== {result['script']} ==\n")
+        text = json.dumps(result) + '\n' if options.json else format_transcript(result)
+        if options.out:
+            path = os.path.join(options.out, name + ('.json' if options.json else '.txt'))
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            sys.stdout.write(text)
+    return status
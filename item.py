@@ -6,6 +6,9 @@ Represents interactive objects in the game world.
 class Item:
     """Represents an interactive item in the game world."""
     
+    __slots__ = ('name', 'description', 'synonyms', 'takeable', 'readable', 'useable',
+                 'openable', 'key_required', 'is_open', 'contents', 'read_text', 'match_names')
+    
     def __init__(self, name, description, synonyms=None, takeable=True, 
                  readable=False, useable=False, openable=False, key_required=None):
         """
@@ -33,11 +36,12 @@ class Item:
         self.contents = []  # Items inside this item (if openable)
         self.read_text = ""  # Text shown when read
         
+        # Lowercased name and synonyms, used for matching and name indexes
+        self.match_names = frozenset([name.lower()] + [syn.lower() for syn in self.synonyms])
+        
     def matches_name(self, name):
         """Check if the given name matches this item."""
-        name_lower = name.lower()
-        return (name_lower == self.name.lower() or 
-                name_lower in [syn.lower() for syn in self.synonyms])
+        return name.lower() in self.match_names
     
     def take(self):
         """Attempt to take the item."""
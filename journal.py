@@ -0,0 +1,256 @@
+"""
+Command journal for ZorkMUD: Sentinel Realm
+Records every accepted command so a game survives a crash, not only an explicit save.
+
+Each session appends one JSON line per command, [sequence, input], to
+<session>.journal and periodically writes a compact checkpoint of the whole
+game (see savegame.py) to <session>.checkpoint. Recovery restores the
+checkpoint and replays the journal lines written after it through
+GameEngine.process_command.
+
+Commands are only queued on the game's hot path. A shared background thread
+writes the queued lines and checkpoints, so each fsync covers a whole batch.
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+
+from savegame import SaveError, read_save, write_save
+from output import OutputSink
+
+# How hard each journal tries to survive a crash:
+#   'none'  - lines reach the OS in batches but are never fsynced
+#   'batch' - lines are written and fsynced in batches by the flusher thread
+#   'sync'  - every line is written and fsynced before the command returns
+DURABILITY_MODES = ('none', 'batch', 'sync')
+
+# Journals are written from a background thread, so problems are logged rather than printed
+logger = logging.getLogger(__name__)
+
+class JournalFlusher:
+    """Background thread that flushes every registered journal at a fixed interval."""
+    
+    def __init__(self, interval=0.05):
+        """
+        Initialize the flusher.
+        
+        Args:
+            interval (float): Seconds between flushes
+        """
+        self.interval = interval
+        self.journals = set()
+        self.lock = threading.Lock()
+        self.thread = None
+    
+    def add(self, journal):
+        """Start flushing a journal, starting the thread on first use."""
+        with self.lock:
+            self.journals.add(journal)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='journal-flusher', daemon=True)
+                self.thread.start()
+    
+    def remove(self, journal):
+        """Stop flushing a journal."""
+        with self.lock:
+            self.journals.discard(journal)
+    
+    def _run(self):
+        """Flush all journals forever."""
+        while True:
+            time.sleep(self.interval)
+            with self.lock:
+                journals = list(self.journals)
+            for journal in journals:
+                try:
+                    journal.flush()
+                except OSError:
+                    logger.exception("Error writing journal %s", journal.path)
+
+# Flusher shared by every journal in the process
+_flusher = JournalFlusher()
+
+class Journal:
+    """Append-only command journal and checkpoint for one game session."""
+    
+    def __init__(self, directory, session_id, durability='batch', checkpoint_every=100, flusher=None):
+        """
+        Initialize the journal, creating its directory if needed.
+        
+        Args:
+            directory (str): Directory holding journal and checkpoint files
+            session_id (str): Name of the session the files belong to
+            durability (str): One of DURABILITY_MODES
+            checkpoint_every (int): Journaled commands between checkpoints
+            flusher (JournalFlusher): Background flusher (the shared one if None)
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability {durability!r} (expected one of {', '.join(DURABILITY_MODES)})")
+        
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{session_id}.journal")
+        self.checkpoint_path = os.path.join(directory, f"{session_id}.checkpoint")
+        self.durability = durability
+        self.checkpoint_every = checkpoint_every
+        self.flusher = flusher or _flusher
+        
+        self.seq = 0  # sequence number of the last journaled command
+        self.since_checkpoint = 0
+        self.pending = []  # (seq, encoded line) not yet written
+        self.checkpoint = None  # newest checkpoint not yet written
+        self.lock = threading.Lock()  # guards pending and checkpoint
+        self.write_lock = threading.Lock()  # one writer at a time
+        self.file = open(self.path, 'ab')
+        self.flusher.add(self)
+    
+    def record(self, engine, command, input_text):
+        """
+        Journal a command the engine has just processed.
+        
+        Args:
+            engine (GameEngine): The engine that processed the command
+            command (str): Command name produced by the parser
+            input_text (str): The player's input
+        """
+        if command in ('load', 'event'):
+            # The save file may change later and timed events depend on the world
+            # clock, so don't replay them: checkpoint the result
+            self.request_checkpoint(engine)
+            return
+        if command in engine.READ_ONLY_COMMANDS:
+            return
+        
+        self.seq += 1
+        line = (json.dumps([self.seq, input_text]) + '\n').encode('utf-8')
+        with self.lock:
+            self.pending.append((self.seq, line))
+        
+        self.since_checkpoint += 1
+        if self.since_checkpoint >= self.checkpoint_every:
+            self.request_checkpoint(engine)
+        elif self.durability == 'sync':
+            self.flush()
+    
+    def request_checkpoint(self, engine):
+        """Capture the engine's state now and queue it to be written as a checkpoint."""
+        save_data = engine.capture_state()
+        save_data['journal_seq'] = self.seq
+        with self.lock:
+            self.checkpoint = save_data
+        self.since_checkpoint = 0
+        if self.durability == 'sync':
+            self.flush()
+    
+    def flush(self):
+        """Write queued commands and any queued checkpoint."""
+        with self.write_lock:
+            with self.lock:
+                pending, self.pending = self.pending, []
+                checkpoint, self.checkpoint = self.checkpoint, None
+            if self.file.closed:
+                return
+            
+            durable = self.durability != 'none'
+            if checkpoint is not None:
+                write_save(self.checkpoint_path, checkpoint, durable)
+                # Everything up to the checkpoint is now redundant
+                self.file.truncate(0)
+                pending = [(seq, line) for seq, line in pending if seq > checkpoint['journal_seq']]
+            
+            if pending or checkpoint is not None:
+                self.file.write(b''.join(line for _, line in pending))
+                self.file.flush()
+                if durable:
+                    os.fsync(self.file.fileno())
+    
+    def recover(self, engine):
+        """
+        Rebuild a crashed session: restore the checkpoint and replay the journal after it.
+        
+        The engine starts a new game first, so with nothing to recover it is
+        left ready to play. Output produced while replaying is discarded.
+        
+        Args:
+            engine (GameEngine): Engine to recover into
+        
+        Returns:
+            bool: True if any progress was recovered
+        """
+        output, engine.output = engine.output, OutputSink()  # discards replayed output
+        try:
+            return self._replay(engine)
+        finally:
+            engine.output = output
+    
+    def _replay(self, engine):
+        """Restore the checkpoint and replay the journal into an engine with muted output."""
+        if not engine.new_game():
+            return False
+        
+        recovered = False
+        base_seq = 0
+        try:
+            save_data = read_save(self.checkpoint_path)
+            engine.restore_state(save_data)
+            base_seq = save_data.get('journal_seq', 0)
+            recovered = True
+        except (SaveError, KeyError) as e:
+            if os.path.exists(self.checkpoint_path):
+                logger.warning("Error reading checkpoint %s: %s", self.checkpoint_path, e)
+        
+        recorders, engine.recorders = engine.recorders, []
+        try:
+            for seq, input_text in self._read_records():
+                if seq > base_seq:
+                    engine.process_command(input_text)
+                    recovered = True
+                base_seq = max(base_seq, seq)
+        finally:
+            engine.recorders = recorders
+        
+        self.seq = base_seq
+        return recovered
+    
+    def _read_records(self):
+        """Read journaled commands, dropping a line torn by a crash mid-write."""
+        with self.write_lock:
+            self.file.flush()
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            
+            records = []
+            good_length = 0
+            for line in data.splitlines(keepends=True):
+                try:
+                    seq, input_text = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                records.append((seq, input_text))
+                good_length += len(line)
+            
+            if good_length < len(data):
+                # New lines must not be appended onto the torn one
+                self.file.truncate(good_length)
+            return records
+    
+    def close(self, discard=False):
+        """
+        Flush and close the journal.
+        
+        Args:
+            discard (bool): Delete the journal and checkpoint, e.g. after a clean exit
+        """
+        self.flusher.remove(self)
+        self.flush()
+        with self.write_lock:
+            self.file.close()
+        if discard:
+            for path in (self.path, self.checkpoint_path):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
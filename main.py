@@ -9,11 +9,34 @@ Main entry point for the game.
 import sys
 import os
 import subprocess
+import time
 from game_engine import GameEngine
+from journal import Journal
+from server import run_server
+from headless import run_cli as run_script_cli
+from replay import run_cli as replay_cli
+from solver import run_cli as solve_cli
+from worldgen import run_cli as generate_world_cli
+from save_store import FileSaveStore, SQLiteSaveStore
+from world import compile_world, WorldDataError
 from ansi_graphics import ANSIArt, ANSIColors, colorize_text
 
+# Crash-recovery journal of the local game
+JOURNAL_DIR = os.path.join('saves', 'journal')
+JOURNAL_SESSION = 'local'
+
 def main():
     """Main function to start the game."""
+    # Scripted runs, replays, the solver and the world generator write results to stdout, so they skip the banner
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'run-script':
+        sys.exit(run_script_cli(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'replay':
+        sys.exit(replay_cli(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'solve':
+        sys.exit(solve_cli(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1].lower() == 'generate-world':
+        sys.exit(generate_world_cli(sys.argv[2:]))
+    
     # Enable ANSI colors
     ANSIArt.enable_ansi_on_windows()
     
@@ -42,13 +65,31 @@ def main():
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
         if command == 'load':
-            if game.load_game():
+            loaded = game.load_game()
+            game.output.flush()
+            if loaded:
                 print(colorize_text("Game loaded successfully!", ANSIColors.BRIGHT_GREEN))
-                game.run()
+                play(game)
             else:
                 print(colorize_text("Could not load saved game. Starting new game...", ANSIColors.BRIGHT_YELLOW))
                 if game.start_game():
-                    game.run()
+                    play(game)
+        elif command == 'serve':
+            port = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+            host = sys.argv[3] if len(sys.argv) > 3 else '0.0.0.0'
+            run_server(host, port)
+        elif command == 'saves':
+            list_saves(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif command == 'compile-world':
+            data_dir = sys.argv[2] if len(sys.argv) > 2 else 'data'
+            try:
+                path = compile_world(data_dir)
+                print(colorize_text(f"World compiled to {path}", ANSIColors.BRIGHT_GREEN))
+            except WorldDataError as e:
+                print(colorize_text("World data has problems:", ANSIColors.BRIGHT_RED))
+                for problem in e.problems:
+                    print(f"  • {problem}")
+                sys.exit(1)
         elif command == 'sync' or command == 'update':
             sync_with_repository()
         elif command == 'help' or command == '--help':
@@ -57,13 +98,53 @@ def main():
             print(colorize_text(f"Unknown command: {command}", ANSIColors.BRIGHT_RED))
             print_help()
     else:
-        # Start new game
-        if game.start_game():
-            game.run()
+        # Resume a game cut short by a crash, otherwise start a new one
+        journal = Journal(JOURNAL_DIR, JOURNAL_SESSION)
+        if journal.recover(game) and not game.game_won:
+            print(colorize_text("Recovered your unfinished game.", ANSIColors.BRIGHT_GREEN))
+            game.look_around()
+            game.output.flush()
+            play(game, journal, fresh=False)
+        elif game.start_game():
+            play(game, journal)
         else:
+            journal.close()
             print(colorize_text("Error: Could not start game. Check that data files exist.", ANSIColors.BRIGHT_RED))
             sys.exit(1)
 
+def play(game, journal=None, fresh=True):
+    """
+    Run the game loop with a crash-recovery journal attached.
+    
+    Args:
+        game (GameEngine): A started or loaded game
+        journal (Journal): Journal to record into (the local one if None)
+        fresh (bool): Checkpoint the game first, replacing anything already journaled
+    """
+    journal = journal or Journal(JOURNAL_DIR, JOURNAL_SESSION)
+    if fresh:
+        journal.request_checkpoint(game)
+    game.recorders.append(journal)
+    try:
+        game.run()
+    except BaseException:
+        journal.close()
+        raise
+    
+    # A finished game has nothing left to recover
+    journal.close(discard=True)
+
+def list_saves(player=None):
+    """List the saved games of the local game and of the server."""
+    stores = [("Local games", FileSaveStore()), ("Server games", SQLiteSaveStore())]
+    for title, store in stores:
+        saves = store.list(player)
+        store.close()
+        print(colorize_text(f"{title} ({len(saves)}):", ANSIColors.BRIGHT_CYAN))
+        for owner, slot, saved_at in saves:
+            saved = time.strftime('%Y-%m-%d %H:%M', time.localtime(saved_at))
+            print(f"  {colorize_text(owner, ANSIColors.BRIGHT_WHITE)} [{slot}] saved {saved}")
+
 def sync_with_repository():
     """Sync with the GitHub repository to get the latest updates."""
     print(ANSIColors.CLEAR_SCREEN)
@@ -149,14 +230,15 @@ def sync_with_repository():
 def print_manual_update_instructions():
     """Print manual update instructions."""
     print()
+    repo_path = "C:\\Stuff\\VSCode\\ZorkMUD-SentinelRealm"
     instructions = f"""
 {colorize_text("🔧 Manual Update Instructions:", ANSIColors.BRIGHT_CYAN)}
 
-{colorize_text("Since you cloned to C:\\Stuff\\VSCode\\ZorkMUD-SentinelRealm:", ANSIColors.BRIGHT_WHITE)}
+{colorize_text("Since you cloned to " + repo_path + ":", ANSIColors.BRIGHT_WHITE)}
 
 {colorize_text("1. Open PowerShell/Command Prompt", ANSIColors.BRIGHT_GREEN)}
 {colorize_text("2. Navigate to your repository:", ANSIColors.BRIGHT_GREEN)}
-   {colorize_text("cd C:\\Stuff\\VSCode\\ZorkMUD-SentinelRealm", ANSIColors.BRIGHT_YELLOW)}
+   {colorize_text("cd " + repo_path, ANSIColors.BRIGHT_YELLOW)}
 
 {colorize_text("3. Pull the latest changes:", ANSIColors.BRIGHT_GREEN)}
    {colorize_text("git pull origin main", ANSIColors.BRIGHT_YELLOW)}
@@ -180,6 +262,13 @@ def print_help():
 {colorize_text("Commands:", ANSIColors.BRIGHT_GREEN)}
   {colorize_text("(no command)", ANSIColors.BRIGHT_WHITE)}  Start a new game
   {colorize_text("load", ANSIColors.BRIGHT_WHITE)}         Load a saved game
+  {colorize_text("serve", ANSIColors.BRIGHT_WHITE)}        Host a multi-player telnet server: serve [port] [host]
+  {colorize_text("saves", ANSIColors.BRIGHT_WHITE)}        List saved games: saves [player]
+  {colorize_text("compile-world", ANSIColors.BRIGHT_WHITE)} Validate data/*.json and build the fast-start world snapshot
+  {colorize_text("run-script", ANSIColors.BRIGHT_WHITE)}   Play command scripts headlessly: run-script SCRIPT... [--json] [--jobs N]
+  {colorize_text("replay", ANSIColors.BRIGHT_WHITE)}       Check recorded session logs, or play them as load: replay LOG... [--load] [--speed X]
+  {colorize_text("solve", ANSIColors.BRIGHT_WHITE)}        Find the shortest walkthrough and unreachable rooms/items: solve [--data DIR]
+  {colorize_text("generate-world", ANSIColors.BRIGHT_WHITE)} Write a random winnable world: generate-world DIR [--rooms N] [--items M] [--seed S]
   {colorize_text("sync", ANSIColors.BRIGHT_WHITE)}         Sync with GitHub repository (download updates)
   {colorize_text("update", ANSIColors.BRIGHT_WHITE)}       Same as sync
   {colorize_text("help", ANSIColors.BRIGHT_WHITE)}         Show this help message
@@ -190,6 +279,8 @@ def print_help():
 {colorize_text("Examples:", ANSIColors.BRIGHT_YELLOW)}
   {colorize_text("python main.py", ANSIColors.BRIGHT_WHITE)}          # Start new game
   {colorize_text("python main.py load", ANSIColors.BRIGHT_WHITE)}     # Load saved game
+  {colorize_text("python main.py serve 4000", ANSIColors.BRIGHT_WHITE)} # Host players on port 4000
+  {colorize_text("python main.py run-script walkthrough.txt", ANSIColors.BRIGHT_WHITE)} # Play a script and print its transcript
   {colorize_text("python main.py sync", ANSIColors.BRIGHT_WHITE)}     # Check for and download updates
   {colorize_text("python main.py help", ANSIColors.BRIGHT_WHITE)}     # Show this help
 """
@@ -0,0 +1,170 @@
+"""
+Output sinks for ZorkMUD: Sentinel Realm
+Collects everything the engine says in response to a command and sends it in one write.
+
+The engine never prints directly. Handlers write into the engine's sink
+with print(), which only appends to a buffer, and the engine calls flush()
+once a response is complete. Each sink decides where a flushed response
+goes: the terminal, a socket, an asyncio stream, or memory.
+
+Socket sinks can also compress what they send as one zlib stream per
+connection, as MCCP2 telnet clients expect. Each response is sync-flushed,
+so the client can show it at once, while the stream keeps its history: the
+room boxes, status bars and art repeated from response to response cost a
+few bytes each after the first time.
+"""
+
+import sys
+import zlib
+
+# zlib compression level of compressed connections (1 fastest to 9 smallest)
+COMPRESSION_LEVEL = 6
+
+class OutputSink:
+    """Buffers a response; the base sink discards what it is flushed."""
+    
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.parts = []
+    
+    def write(self, text):
+        """Append text to the current response (file-like, so print(file=sink) works too)."""
+        self.parts.append(text)
+    
+    def print(self, *values, sep=' ', end='\n'):
+        """Append values to the current response the way print() would write them."""
+        self.parts.append(sep.join(map(str, values)) + end)
+    
+    def getvalue(self):
+        """Get the response collected so far without flushing it."""
+        return ''.join(self.parts)
+    
+    def flush(self):
+        """
+        Send the collected response in one piece and start a new one.
+        
+        Returns:
+            str: The response that was sent (empty if there was none)
+        """
+        if not self.parts:
+            return ''
+        text = ''.join(self.parts)
+        self.parts.clear()
+        self.send(text)
+        return text
+    
+    def send(self, text):
+        """Deliver a complete response (overridden by subclasses)."""
+
+class StdoutSink(OutputSink):
+    """Writes responses to standard output."""
+    
+    def send(self, text):
+        """Write a response to whatever sys.stdout currently is."""
+        stream = sys.stdout
+        stream.write(text)
+        stream.flush()
+
+class CaptureSink(OutputSink):
+    """Keeps responses in memory, e.g. for tests or headless play."""
+    
+    def __init__(self):
+        """Initialize the sink with nothing captured."""
+        super().__init__()
+        self.captured = []
+    
+    def send(self, text):
+        """Keep a response."""
+        self.captured.append(text)
+    
+    def take(self):
+        """
+        Get everything captured since the last call and forget it.
+        
+        Returns:
+            str: The captured responses joined together
+        """
+        text = ''.join(self.captured)
+        self.captured.clear()
+        return text
+
+class SocketSink(OutputSink):
+    """Sends responses over a connected socket as encoded bytes."""
+    
+    def __init__(self, sock, encoding='utf-8', newline='\r\n'):
+        """
+        Initialize the sink.
+        
+        Args:
+            sock (socket.socket): Connected socket to send to
+            encoding (str): Encoding of the bytes sent
+            newline (str): Line ending sent for each newline ('\\r\\n' for telnet)
+        """
+        super().__init__()
+        self.sock = sock
+        self.encoding = encoding
+        self.newline = newline
+        self.compressor = None  # zlib stream everything is sent through, see start_compression()
+    
+    def encode(self, text):
+        """Convert a response to the bytes sent to the client, compressed if compression is on."""
+        if self.newline != '\n':
+            text = text.replace('\r\n', '\n').replace('\n', self.newline)
+        data = text.encode(self.encoding, 'replace')
+        if self.compressor:
+            # A sync flush ends every response on a byte boundary the client can decode up to
+            data = self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data
+    
+    def send(self, text):
+        """Send a response in one piece."""
+        self.send_bytes(self.encode(text))
+    
+    def send_bytes(self, data):
+        """Send bytes as they are with a single sendall()."""
+        self.sock.sendall(data)
+    
+    def start_compression(self, header=b'', level=COMPRESSION_LEVEL, zdict=None):
+        """
+        Compress everything sent from now on as a single zlib stream.
+        
+        Args:
+            header (bytes): Sent uncompressed just before the stream starts,
+                such as the telnet sequence announcing MCCP2
+            level (int): zlib compression level
+            zdict (bytes): Preset dictionary, for clients that have the same
+                one (MCCP2 clients don't, but still share the stream's history)
+        """
+        self.flush()
+        if header:
+            self.send_bytes(header)
+        options = {'zdict': zdict} if zdict else {}
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, zlib.Z_DEFAULT_STRATEGY, **options)
+    
+    def end_compression(self):
+        """Finish the compressed stream, so whatever is sent next is plain again."""
+        if self.compressor is None:
+            return
+        self.flush()
+        self.send_bytes(self.compressor.flush())
+        self.compressor = None
+
+class StreamSink(SocketSink):
+    """Sends responses to an asyncio stream; the caller awaits writer.drain()."""
+    
+    def __init__(self, writer, encoding='utf-8', newline='\r\n'):
+        """
+        Initialize the sink.
+        
+        Args:
+            writer (asyncio.StreamWriter): Client output stream
+            encoding (str): Encoding of the bytes sent
+            newline (str): Line ending sent for each newline ('\\r\\n' for telnet)
+        """
+        super().__init__(None, encoding, newline)
+        self.writer = writer
+    
+    def send_bytes(self, data):
+        """Queue bytes on the stream with a single write(), unless the client is gone."""
+        if not self.writer.is_closing():
+            self.writer.write(data)
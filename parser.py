@@ -53,7 +53,98 @@ class Parser:
             'score': [r'^score$'],
             'health': [r'^health$', r'^hp$'],
             'status': [r'^status$', r'^stat$'],
+            'terminal': [r'^terminal$', r'^terminal\s+(.+)$'],
+            'travel': [r'^(travel|goto)\s+(.+)$', r'^go\s+to\s+(.+)$'],
         }
+        
+        self._build_verb_table()
+    
+    def _build_verb_table(self):
+        """
+        Compile the command patterns into a first-word lookup table.
+        
+        Every pattern is filed under the words it can start with, and the
+        patterns sharing a first word are joined into one compiled regex whose
+        alternatives keep the order parse() has always tried them in. Multi-word
+        verbs such as "pick up" or "look at" live under their first word. A
+        pattern whose leading word can't be worked out is tried for every input.
+        """
+        candidates = [('move', pattern) for pattern in self.commands['movement']['patterns']]
+        for command, patterns in self.commands.items():
+            if command != 'movement':
+                candidates.extend((command, pattern) for pattern in patterns)
+        
+        by_word = {}
+        fallback = []
+        for order, (command, pattern) in enumerate(candidates):
+            words = self._leading_words(pattern)
+            if words is None:
+                fallback.append(order)
+                continue
+            for word in words:
+                by_word.setdefault(word, []).append(order)
+        
+        self.verb_table = {
+            word: self._compile_alternatives(candidates, sorted(orders + fallback))
+            for word, orders in by_word.items()
+        }
+        self.fallback_patterns = self._compile_alternatives(candidates, fallback) if fallback else None
+    
+    # Pieces of a pattern's opening that _leading_words understands
+    _OPTIONAL_WORD = re.compile(r'\((\w+)\\s\+\)\?')
+    _WORD_CHOICE = re.compile(r'\(((?:\w+\|)*\w+)\)(?=\\s\+|\$)')
+    _LITERAL_WORD = re.compile(r'((?:\w|\\\W)+)(?=\\s\+|\$)')
+    
+    def _leading_words(self, pattern):
+        """Return the set of first words a pattern can match, or None if unknown."""
+        body = pattern[1:] if pattern.startswith('^') else pattern
+        words = set()
+        
+        optional = self._OPTIONAL_WORD.match(body)
+        if optional:
+            words.add(optional.group(1))
+            body = body[optional.end():]
+        
+        choice = self._WORD_CHOICE.match(body)
+        if choice:
+            words.update(choice.group(1).split('|'))
+            return words
+        
+        literal = self._LITERAL_WORD.match(body)
+        if literal:
+            words.add(re.sub(r'\\(.)', r'\1', literal.group(1)))
+            return words
+        
+        return None
+    
+    def _compile_alternatives(self, candidates, orders):
+        """
+        Join several command patterns into a single compiled regex.
+        
+        Returns:
+            tuple: (compiled regex, {alternative name: (command, argument group)})
+        """
+        parts = []
+        for order in orders:
+            pattern = candidates[order][1]
+            parts.append(f"(?P<_{order}>{pattern[1:] if pattern.startswith('^') else pattern})")
+        regex = re.compile('|'.join(parts))
+        
+        alternatives = {}
+        for order in orders:
+            command, pattern = candidates[order]
+            name = f"_{order}"
+            group = regex.groupindex[name]
+            inner_groups = re.compile(pattern).groups
+            if command == 'move':
+                argument_group = group + 2  # The direction part
+            elif inner_groups:
+                argument_group = group + inner_groups  # The last group (the object)
+            else:
+                argument_group = None
+            alternatives[name] = (command, argument_group)
+        
+        return regex, alternatives
     
     def parse(self, input_text):
         """
@@ -70,32 +161,28 @@ class Parser:
         
         input_text = input_text.strip().lower()
         
-        # Handle movement commands specially
-        for pattern in self.commands['movement']['patterns']:
-            match = re.match(pattern, input_text)
-            if match:
-                direction_word = match.group(2)  # The direction part
-                direction = self.commands['movement']['directions'].get(direction_word)
-                return 'move', direction
+        # Only the patterns that can start with the first word are tried
+        words = input_text.split(None, 1)
+        entry = self.verb_table.get(words[0]) if words else None
+        if entry is None:
+            entry = self.fallback_patterns
         
-        # Handle other commands
-        for command, patterns in self.commands.items():
-            if command == 'movement':
-                continue  # Already handled above
-                
-            for pattern in patterns:
-                match = re.match(pattern, input_text)
-                if match:
-                    if len(match.groups()) > 0:
-                        # Command with arguments
-                        args = match.groups()[-1]  # Get the last group (the object)
-                        return command, args
-                    else:
-                        # Command without arguments
-                        return command, None
-        
-        # No command matched
-        return 'unknown', input_text
+        match = entry[0].match(input_text) if entry else None
+        if not match:
+            # No command matched
+            return 'unknown', input_text
+        
+        command, argument_group = entry[1][match.lastgroup]
+        if command == 'move':
+            direction_word = match.group(argument_group)
+            return 'move', self.commands['movement']['directions'].get(direction_word)
+        
+        if argument_group is None:
+            # Command without arguments
+            return command, None
+        
+        # Command with arguments
+        return command, match.group(argument_group)
     
     def get_help_text(self):
         """Return help text showing available commands."""
@@ -105,6 +192,7 @@ Available Commands:
 MOVEMENT:
   north, south, east, west (or n, s, e, w)
   go <direction>
+  travel <room> (or goto <room>) - Walk the shortest way to a room
 
 OBSERVATION:
   look (or l) - Look around the current room
@@ -127,6 +215,7 @@ SYSTEM:
   quit (or q) - Exit the game
   save - Save your game
   load - Load a saved game
+  terminal <type> - Set output style (ansi, ansi16, mono, ascii, machine)
 
 Examples:
   > north
@@ -3,24 +3,48 @@ Player class for the ZorkMUD game engine.
 Manages player state including location, inventory, and health.
 """
 
+from player_stats import PlayerStats, MAX_HEALTH
+
+def _stat(name):
+    """Property reading and writing one field of the player's row in their stats store."""
+    def get(self):
+        return self.stats.get(name, self.row)
+    
+    def set(self, value):
+        self.stats.set(name, self.row, value)
+    
+    return property(get, set, doc=f"The player's {name}, kept in their stats store.")
+
 class Player:
     """Represents the player character."""
     
-    def __init__(self, name="Adventurer", starting_room="field"):
+    __slots__ = ('name', 'current_room', 'inventory', 'inventory_index', 'stats', 'row')
+    
+    def __init__(self, name="Adventurer", starting_room="field", stats=None):
         """
         Initialize the player.
         
         Args:
             name (str): Player's name
             starting_room (str): ID of the starting room
+            stats (PlayerStats): Store shared with other players for their
+                numeric fields (a private one-row store if None)
         """
         self.name = name
         self.current_room = starting_room
         self.inventory = []
-        self.health = 100
-        self.score = 0
-        self.moves = 0
-        
+        self.inventory_index = {}  # lowercased name/synonym -> items carrying it
+        self.stats = PlayerStats(capacity=1, backend='array') if stats is None else stats
+        self.row = self.stats.allocate()  # health, score and moves live in this row
+    
+    health = _stat('health')
+    score = _stat('score')
+    moves = _stat('moves')
+    
+    def release(self):
+        """Give the player's row back to their stats store once the player is gone."""
+        self.stats.release(self.row)
+    
     def move_to(self, room_id):
         """Move the player to a new room."""
         self.current_room = room_id
@@ -29,27 +53,31 @@ class Player:
     def add_item(self, item):
         """Add an item to the player's inventory."""
         self.inventory.append(item)
+        for name in item.match_names:
+            self.inventory_index.setdefault(name, []).append(item)
     
     def remove_item(self, item_name):
         """Remove an item from inventory by name."""
-        for i, item in enumerate(self.inventory):
-            if item.matches_name(item_name):
-                return self.inventory.pop(i)
-        return None
+        item = self.get_item(item_name)
+        if item is None:
+            return None
+        
+        self.inventory.remove(item)
+        for name in item.match_names:
+            matches = self.inventory_index[name]
+            matches.remove(item)
+            if not matches:
+                del self.inventory_index[name]
+        return item
     
     def has_item(self, item_name):
         """Check if player has an item."""
-        for item in self.inventory:
-            if item.matches_name(item_name):
-                return True
-        return False
+        return item_name.lower() in self.inventory_index
     
     def get_item(self, item_name):
         """Get an item from inventory by name."""
-        for item in self.inventory:
-            if item.matches_name(item_name):
-                return item
-        return None
+        matches = self.inventory_index.get(item_name.lower())
+        return matches[0] if matches else None
     
     def show_inventory(self):
         """Display the player's inventory."""
@@ -65,7 +93,7 @@ class Player:
     def show_status(self):
         """Display player status."""
         return f"""Player: {self.name}
-Health: {self.health}/100
+Health: {self.health}/{MAX_HEALTH}
 Score: {self.score}
 Moves: {self.moves}
 Location: {self.current_room}"""
@@ -81,7 +109,7 @@ Location: {self.current_room}"""
     
     def heal(self, amount):
         """Restore player health."""
-        self.health = min(100, self.health + amount)
+        self.health = min(MAX_HEALTH, self.health + amount)
     
     def is_alive(self):
         """Check if player is alive."""
@@ -0,0 +1,139 @@
+"""
+Player stats store for ZorkMUD: Sentinel Realm
+Keeps the numeric state of many players in columns for batched per-tick updates.
+
+Each numeric field (health, score, moves, and any counters added later) is
+one column, and each player is one row, so a rule that touches every player
+on a tick, such as regeneration, is a single operation over a column rather
+than a Python loop over Player objects. Columns are NumPy arrays when NumPy
+is installed and array.array otherwise; the array backend still updates a
+whole column per call, just without NumPy's speed.
+
+The game's own timed rules (see GameEngine.run_event) stay per game, since
+each one tells its player what happened and is recorded for replay.
+
+Player objects are views over one row each (see player.py). Rows freed by
+players who leave are reused by the next player to arrive.
+"""
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Highest health a player can have
+MAX_HEALTH = 100
+
+# Range of the 64-bit columns, the bounds of an unclamped add()
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+# Field name -> value of a new player's row
+FIELDS = {'health': MAX_HEALTH, 'score': 0, 'moves': 0}
+
+class PlayerStats:
+    """Structure-of-arrays store of the numeric fields of many players."""
+    
+    def __init__(self, fields=None, capacity=64, backend=None):
+        """
+        Initialize an empty store.
+        
+        Args:
+            fields (dict): Field name -> default value (FIELDS if None)
+            capacity (int): Rows to allocate up front (the store grows as needed)
+            backend (str): 'numpy' or 'array' (NumPy when installed if None)
+        """
+        self.backend = backend or ('numpy' if numpy else 'array')
+        if self.backend == 'numpy' and numpy is None:
+            raise ValueError("The numpy backend needs NumPy installed")
+        if self.backend not in ('numpy', 'array'):
+            raise ValueError(f"Unknown backend: {self.backend}")
+        
+        self.defaults = dict(fields or FIELDS)
+        self.capacity = max(1, capacity)
+        self.columns = {name: self._column(self.capacity, default) for name, default in self.defaults.items()}
+        self.live = self._column(self.capacity, 0)  # 1 for rows held by a player
+        self.free = list(range(self.capacity - 1, -1, -1))  # free rows, lowest last
+    
+    def __len__(self):
+        """Number of rows held by players."""
+        return self.capacity - len(self.free)
+    
+    def _column(self, size, value):
+        """Create a column of 64-bit integers filled with a value."""
+        if self.backend == 'numpy':
+            return numpy.full(size, value, dtype=numpy.int64)
+        return array('q', [value]) * size
+    
+    def _grow(self):
+        """Double the number of rows."""
+        extra = self.capacity
+        for name, column in self.columns.items():
+            self.columns[name] = self._extend(column, self._column(extra, self.defaults[name]))
+        self.live = self._extend(self.live, self._column(extra, 0))
+        self.free.extend(range(self.capacity + extra - 1, self.capacity - 1, -1))
+        self.capacity += extra
+    
+    def _extend(self, column, extra):
+        """Append extra rows to a column, returning the longer column."""
+        if self.backend == 'numpy':
+            return numpy.concatenate((column, extra))
+        column.extend(extra)
+        return column
+    
+    def allocate(self):
+        """
+        Take a row for a new player, set to the default values.
+        
+        Returns:
+            int: The row
+        """
+        if not self.free:
+            self._grow()
+        row = self.free.pop()
+        for name, default in self.defaults.items():
+            self.columns[name][row] = default
+        self.live[row] = 1
+        return row
+    
+    def release(self, row):
+        """Give a player's row back to the store."""
+        if self.live[row]:
+            self.live[row] = 0
+            self.free.append(row)
+    
+    def get(self, name, row):
+        """Get one player's value of a field."""
+        return int(self.columns[name][row])
+    
+    def set(self, name, row, value):
+        """Set one player's value of a field."""
+        self.columns[name][row] = value
+    
+    def add(self, name, amount, low=None, high=None):
+        """
+        Add to a field of every player at once, clamping the results.
+        
+        Only rows held by players change; free rows keep their values.
+        
+        Args:
+            name (str): Field to update
+            amount (int): Amount to add (negative to subtract)
+            low (int): Smallest allowed result, or None
+            high (int): Largest allowed result, or None
+        """
+        column = self.columns[name]
+        if self.backend == 'numpy':
+            live = self.live != 0
+            values = column[live] + amount
+            if low is not None or high is not None:
+                numpy.clip(values, low, high, out=values)
+            column[live] = values
+            return
+        
+        low = INT64_MIN if low is None else low
+        high = INT64_MAX if high is None else high
+        column[:] = array('q', [min(high, max(low, value + amount)) if live else value
+                                for value, live in zip(column, self.live)])
@@ -0,0 +1,119 @@
+"""
+Room presence for ZorkMUD: Sentinel Realm
+Tracks which players are in which room and tells a room's occupants what happens there.
+
+Every player's game stays its own, but players sharing a Presence index see
+each other come and go, and see what the others take and drop. The index
+maps each room to the engines of the players in it, so telling a room about
+an event only visits that room's occupants, however many players are
+connected elsewhere.
+
+A broadcast is rendered once per terminal profile in the room and appended
+to each occupant's output buffer. Nothing is sent until deliver(), which
+flushes every occupant that was told something exactly once, so a command
+that causes several events still costs each listener a single write.
+"""
+
+from ansi_graphics import ANSIColors
+
+class Presence:
+    """Index of the players in each room, with per-room broadcasts."""
+    
+    def __init__(self):
+        """Initialize an empty index."""
+        self.rooms = {}  # room ID -> {engine: None} of the players there, in arrival order
+        self.locations = {}  # engine -> room ID it is listed under
+        self.pending = {}  # engine -> None for occupants with undelivered messages
+    
+    def enter(self, engine):
+        """
+        Add a player to the room they are in and announce them there.
+        
+        Args:
+            engine (GameEngine): The player's started game
+        """
+        room_id = engine.player.current_room
+        self.broadcast(room_id, f"{engine.player.name} arrives.")
+        self.rooms.setdefault(room_id, {})[engine] = None
+        self.locations[engine] = room_id
+    
+    def leave(self, engine):
+        """Remove a player from the index and announce their departure."""
+        room_id = self.locations.pop(engine, None)
+        if room_id is None:
+            return
+        self._remove(engine, room_id)
+        self.pending.pop(engine, None)
+        self.broadcast(room_id, f"{engine.player.name} leaves.")
+    
+    def update(self, engine):
+        """Move a player to the room they are now in, announcing it if they changed rooms."""
+        old_room = self.locations.get(engine)
+        new_room = engine.player.current_room
+        if old_room is None or old_room == new_room:
+            return
+        self._remove(engine, old_room)
+        self.broadcast(old_room, f"{engine.player.name} leaves.")
+        self.broadcast(new_room, f"{engine.player.name} arrives.")
+        self.rooms.setdefault(new_room, {})[engine] = None
+        self.locations[engine] = new_room
+    
+    def _remove(self, engine, room_id):
+        """Take a player out of a room's occupants."""
+        occupants = self.rooms[room_id]
+        del occupants[engine]
+        if not occupants:
+            del self.rooms[room_id]
+    
+    def occupants(self, room_id):
+        """Get the engines of the players in a room, in arrival order."""
+        return list(self.rooms.get(room_id, ()))
+    
+    def broadcast(self, room_id, text, exclude=None, color=ANSIColors.BRIGHT_BLUE):
+        """
+        Tell everyone in a room something, except the player who caused it.
+        
+        Args:
+            room_id (str): Room the event happened in
+            text (str): What happened, as one line without a newline
+            exclude (GameEngine): Player not to tell (usually the actor)
+            color (str): ANSI color of the line on terminals that have color
+        
+        Returns:
+            int: Number of players told
+        """
+        occupants = self.rooms.get(room_id)
+        if not occupants:
+            return 0
+        
+        lines = {}  # render cache -> the line rendered for its terminal profile
+        told = 0
+        for engine in occupants:
+            if engine is exclude:
+                continue
+            render = engine.render
+            line = lines.get(render)
+            if line is None:
+                line = lines[render] = render.colorize_dynamic(text, color) + '\n'
+            engine.output.write(line)
+            self.pending[engine] = None
+            told += 1
+        return told
+    
+    def deliver(self, suffix=None):
+        """
+        Send every player their undelivered messages, one write each.
+        
+        Args:
+            suffix (callable): Gives text to add after a player's messages,
+                such as their prompt (called with the player's engine)
+        
+        Returns:
+            int: Number of players sent to
+        """
+        pending, self.pending = self.pending, {}
+        for engine in pending:
+            if suffix:
+                engine.output.write(suffix(engine))
+            engine.output.flush()
+        return len(pending)
@@ -0,0 +1,218 @@
+"""
+Command rate limiting for ZorkMUD: Sentinel Realm
+Queues each session's input and runs it fairly, so one flooding client can't starve the rest.
+
+Every session gets a token bucket and a small queue of input lines. A single
+dispatcher task runs queued commands one at a time, taking sessions in
+round-robin order, so a client with a hundred lines queued gets one command
+in per turn like everyone else. A session that is out of tokens is set
+aside until its bucket refills (its command is delayed, not lost).
+
+A full queue pushes back on the client: the session stops reading its
+socket until there is room again, so the kernel's buffers, and eventually
+the client, wait instead of the server. Queues can be set to drop the
+overflowing lines instead.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+# Commands per second each session may sustain, and how many it may send at once
+COMMAND_RATE = 5.0
+COMMAND_BURST = 10
+
+# Input lines waiting per session before the session stops reading its socket
+INPUT_QUEUE = 32
+
+class TokenBucket:
+    """Token bucket allowing a sustained rate with bursts."""
+    
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+    
+    def __init__(self, rate=COMMAND_RATE, burst=COMMAND_BURST):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Most tokens the bucket holds
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+    
+    def take(self, now=None):
+        """
+        Take a token if one is available.
+        
+        Args:
+            now (float): Current time.monotonic() (read if None)
+        
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+class InputQueue:
+    """One session's queued input lines and rate limit."""
+    
+    __slots__ = ('run', 'lines', 'bucket', 'space', 'scheduled', 'waiting', 'closed')
+    
+    def __init__(self, run, bucket):
+        """
+        Initialize an empty queue.
+        
+        Args:
+            run (callable): Called with each input line when its turn comes
+            bucket (TokenBucket): The session's rate limit, or None for no limit
+        """
+        self.run = run
+        self.lines = deque()
+        self.bucket = bucket
+        self.space = asyncio.Event()  # set while the queue has room
+        self.space.set()
+        self.scheduled = False  # in the dispatcher's ready list or waiting for a token
+        self.waiting = False  # the next line has been delayed for a token
+        self.closed = False
+
+class CommandQueue:
+    """Round-robin dispatcher running every session's queued commands."""
+    
+    def __init__(self, rate=COMMAND_RATE, burst=COMMAND_BURST, queue_size=INPUT_QUEUE, drop_overflow=False):
+        """
+        Initialize a stopped dispatcher.
+        
+        Args:
+            rate (float): Commands per second per session (None for no limit)
+            burst (int): Commands a session may send at once
+            queue_size (int): Lines queued per session before backpressure (or dropping)
+            drop_overflow (bool): Drop lines that find the queue full instead of waiting
+        """
+        self.rate = rate
+        self.burst = burst
+        self.queue_size = queue_size
+        self.drop_overflow = drop_overflow
+        self.ready = deque()  # InputQueues with a line to run, in turn order
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.processed = 0  # commands run
+        self.delayed = 0  # commands that had to wait for their session's rate limit
+        self.dropped = 0  # lines thrown away: queue overflow or left queued at disconnect
+        self.throttled = 0  # times a session's reading paused because its queue was full
+    
+    def open(self, run):
+        """
+        Create the input queue of a new session.
+        
+        Args:
+            run (callable): Called with each of the session's input lines in turn
+        
+        Returns:
+            InputQueue: The session's queue, for submit() and close()
+        """
+        bucket = TokenBucket(self.rate, self.burst) if self.rate else None
+        return InputQueue(run, bucket)
+    
+    def close(self, queue):
+        """Stop running a session's input, dropping whatever is still queued."""
+        queue.closed = True
+        self.dropped += len(queue.lines)
+        queue.lines.clear()
+        queue.space.set()  # release a submit() waiting for room
+    
+    async def submit(self, queue, line):
+        """
+        Queue an input line, waiting while the session's queue is full.
+        
+        Args:
+            queue (InputQueue): The session's queue
+            line (str): The input line
+        
+        Returns:
+            bool: Whether the line was queued (False if dropped)
+        """
+        while len(queue.lines) >= self.queue_size and not queue.closed:
+            if self.drop_overflow:
+                self.dropped += 1
+                return False
+            self.throttled += 1
+            queue.space.clear()
+            await queue.space.wait()
+        if queue.closed:
+            self.dropped += 1
+            return False
+        
+        queue.lines.append(line)
+        if not queue.scheduled:
+            queue.scheduled = True
+            self.ready.append(queue)
+            self.wakeup.set()
+        return True
+    
+    def _requeue(self, queue):
+        """Put a session whose rate limit has refilled back in turn."""
+        self.ready.append(queue)
+        self.wakeup.set()
+    
+    def start(self):
+        """Start dispatching on the running event loop."""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop dispatching."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    async def _run(self):
+        """Run queued commands, one per session per turn."""
+        loop = asyncio.get_running_loop()
+        ready = self.ready
+        while True:
+            if not ready:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            
+            queue = ready.popleft()
+            if queue.closed or not queue.lines:
+                queue.scheduled = False
+                continue
+            if queue.bucket:
+                wait = queue.bucket.take()
+                if wait:
+                    if not queue.waiting:
+                        queue.waiting = True
+                        self.delayed += 1
+                    loop.call_later(wait, self._requeue, queue)
+                    continue
+            
+            queue.waiting = False
+            line = queue.lines.popleft()
+            queue.space.set()
+            if queue.lines:
+                ready.append(queue)
+            else:
+                queue.scheduled = False
+            try:
+                queue.run(line)
+            except Exception as e:
+                # A broken session must not stop everyone else's commands
+                self.close(queue)
+                loop.call_exception_handler({'message': "Error running a queued command", 'exception': e})
+            self.processed += 1
+            # Let sessions read, write and queue more input between commands
+            await asyncio.sleep(0)
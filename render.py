@@ -0,0 +1,232 @@
+"""
+Render cache for ZorkMUD: Sentinel Realm
+Pre-renders the static parts of the game's output once per world and terminal profile.
+
+Art, room headers and exit lines never change while a world is loaded, so
+they are rendered the first time they are needed and reused by every
+session using the same terminal profile. Only the dynamic parts of a
+response (items, status values, scores) are formatted per command. The
+caches are kept on their world, so they are freed along with it.
+
+Profiles without color never format colors at all, ASCII profiles swap the
+box-drawing and block glyphs for plain characters, and the machine profile
+drops decorative art and uses tagged ROOM:/STATUS: lines for bots.
+"""
+
+import re
+from collections import namedtuple
+
+from ansi_graphics import ANSIArt, ANSIColors, box_text, colorize_text
+
+# Color support of a profile
+COLOR_FULL = 'full'  # every escape code the art uses
+COLOR_16 = '16'  # the 8 basic colors plus bold, no blinking or other effects
+
+# What a client's terminal can show:
+#   color     - COLOR_FULL, COLOR_16 or None for no escape codes at all
+#   width     - line width of room headers
+#   ascii     - only 7-bit ASCII characters
+#   decorated - show art pictures and boxes (machine clients get plain tagged lines)
+TerminalProfile = namedtuple('TerminalProfile', ['name', 'color', 'width', 'ascii', 'decorated'])
+
+ANSI_PROFILE = TerminalProfile('ansi', COLOR_FULL, 78, False, True)
+COLOR16_PROFILE = TerminalProfile('ansi16', COLOR_16, 78, False, True)
+MONOCHROME_PROFILE = TerminalProfile('mono', None, 78, False, True)
+ASCII_PROFILE = TerminalProfile('ascii', None, 78, True, True)
+MACHINE_PROFILE = TerminalProfile('machine', None, 78, True, False)
+
+# Profiles by name, in the order they are listed to players
+PROFILES = {profile.name: profile for profile in (
+    ANSI_PROFILE, COLOR16_PROFILE, MONOCHROME_PROFILE, ASCII_PROFILE, MACHINE_PROFILE
+)}
+
+# ANSI escape sequences such as colors and screen clearing
+ANSI_ESCAPE = re.compile(r'\033\[[0-9;]*[A-Za-z]')
+
+# Color and effect codes (SGR) with a single parameter
+SGR_CODE = re.compile(r'\033\[(\d+)m')
+
+# Effects a 16-color terminal may not have: italic, blink, strikethrough
+UNSUPPORTED_16_EFFECTS = frozenset(['3', '5', '9'])
+
+# Plain stand-ins for the art's box-drawing, block and symbol glyphs
+ASCII_GLYPHS = str.maketrans({
+    '─': '-', '│': '|', '┌': '+', '┐': '+', '└': '+', '┘': '+',
+    '═': '=', '║': '|', '╔': '+', '╗': '+', '╚': '+', '╝': '+',
+    '█': '#', '▀': '#', '▄': '#', '▓': '#', '▒': ':', '░': '.',
+    '◈': '*', '◊': 'o', '♦': '*', '✦': '*', '∩': 'n', '≋': '~',
+})
+
+# ANSIArt pictures that machine clients don't get
+DECORATIVE_ART = frozenset([
+    'game_logo', 'title_card', 'bbs_footer', 'ascii_house', 'ascii_cave', 'ascii_treasure',
+    'victory_banner', 'dark_room_warning'
+])
+
+# ANSIArt pieces that take no arguments
+STATIC_ART = (
+    'game_logo', 'title_card', 'bbs_footer', 'ascii_house', 'ascii_cave', 'ascii_treasure',
+    'victory_banner', 'dark_room_warning', 'lamp_glow', 'command_prompt'
+)
+
+# Entries kept per cache table before it is cleared, bounding memory for huge worlds
+CACHE_LIMIT = 10000
+
+def strip_ansi(text):
+    """Remove ANSI escape sequences from text."""
+    return ANSI_ESCAPE.sub('', text)
+
+def _color_16(match):
+    """Rewrite one SGR code for a 16-color terminal."""
+    code = match.group(1)
+    if code in UNSUPPORTED_16_EFFECTS:
+        return ''
+    if len(code) == 2 and code[0] == '9':
+        return f"\033[1;3{code[1]}m"  # bright color: bold basic color
+    if len(code) == 2 and code[0] == '3':
+        return f"\033[22;{code}m"  # basic color: undo a bright color's bold
+    return match.group(0)
+
+def to_16_colors(text):
+    """Limit text's escape codes to what a 16-color terminal supports."""
+    return SGR_CODE.sub(_color_16, text)
+
+def to_ascii(text):
+    """Replace glyphs with plain characters and anything else non-ASCII with '?'."""
+    if text.isascii():
+        return text
+    return text.translate(ASCII_GLYPHS).encode('ascii', 'replace').decode('ascii')
+
+class _Placeholder:
+    """Formats as a marked replacement field, turning art functions into templates."""
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def __format__(self, spec):
+        return f"\0{self.name}:{spec}\0"
+
+def compile_template(function, *names):
+    """
+    Render an art function once into a str.format() template.
+    
+    Args:
+        function (callable): Art function taking one value per name
+        names (str): Names of the replacement fields, in argument order
+    
+    Returns:
+        str: Template to fill with template.format(name=value, ...)
+    """
+    text = function(*(_Placeholder(name) for name in names))
+    text = text.replace('{', '{{').replace('}', '}}')
+    return re.sub('\0([^\0]*)\0', r'{\1}', text)
+
+class RenderCache:
+    """Pre-rendered output for one world and terminal profile."""
+    
+    def __init__(self, world, profile=ANSI_PROFILE):
+        """
+        Initialize the cache and render all static art.
+        
+        Args:
+            world (World): The world whose rooms are rendered
+            profile (TerminalProfile): The terminal to render for
+        """
+        self.world = world
+        self.profile = profile
+        self.art = {
+            name: '' if name in DECORATIVE_ART and not profile.decorated else self.style(getattr(ANSIArt, name)())
+            for name in STATIC_ART
+        }
+        self.clear_screen = self.style(ANSIColors.CLEAR_SCREEN)
+        if profile.decorated:
+            self.status_template = self.style(
+                compile_template(ANSIArt.status_bar, 'health', 'score', 'moves', 'items')
+            )
+        else:
+            self.status_template = "STATUS: health={health} score={score} moves={moves} items={items}"
+        self.headers = {}  # room ID -> bordered room header
+        self.exit_lines = {}  # room ID -> exit list line
+        self.colored = {}  # (text, color) -> colored text
+        
+        if not profile.color:
+            # Plain profiles skip color formatting and its cache entirely
+            self.colorize = self.colorize_dynamic = _uncolored_ascii if profile.ascii else _uncolored
+    
+    def style(self, text):
+        """Adapt pre-colored text to the profile."""
+        if self.profile.color == COLOR_16:
+            text = to_16_colors(text)
+        elif not self.profile.color:
+            text = strip_ansi(text)
+        return to_ascii(text) if self.profile.ascii else text
+    
+    def colorize(self, text, color):
+        """Color a message catalog or world string, remembering the result."""
+        key = (text, color)
+        result = self.colored.get(key)
+        if result is None:
+            result = self.colorize_dynamic(text, color)
+            _remember(self.colored, key, result)
+        return result
+    
+    def colorize_dynamic(self, text, color):
+        """Color text that changes from call to call, such as scores, without caching it."""
+        text = colorize_text(text, color)
+        return to_16_colors(text) if self.profile.color == COLOR_16 else text
+    
+    def box(self, text, color=ANSIColors.BRIGHT_CYAN):
+        """Put dynamic text in a box (undecorated profiles get the text alone)."""
+        if not self.profile.decorated:
+            return to_ascii(text)
+        return self.style(box_text(text, color))
+    
+    def room_header(self, room_id):
+        """Get the bordered name and short description header of a room."""
+        header = self.headers.get(room_id)
+        if header is None:
+            room = self.world.rooms[room_id]
+            if self.profile.decorated:
+                header = self.style(ANSIArt.room_border(room.name, room.short_description, self.profile.width))
+            else:
+                header = to_ascii(f"ROOM: {room.name}" + (f" - {room.short_description}" if room.short_description else ""))
+            _remember(self.headers, room_id, header)
+        return header
+    
+    def exits_line(self, room_id):
+        """Get the line listing a room's exits (empty if it has none)."""
+        line = self.exit_lines.get(room_id)
+        if line is None:
+            exits = self.world.rooms[room_id].exits
+            line = ""
+            if exits:
+                line = "\nExits: " + ", ".join(
+                    self.colorize_dynamic(direction, ANSIColors.BRIGHT_MAGENTA) for direction in exits
+                )
+            _remember(self.exit_lines, room_id, line)
+        return line
+    
+    def status_bar(self, health, score, moves, items):
+        """Fill in the status bar template."""
+        return self.status_template.format(health=health, score=score, moves=moves, items=items)
+
+def _uncolored(text, color=None):
+    """Stand-in for colorize() on profiles without color."""
+    return text
+
+def _uncolored_ascii(text, color=None):
+    """Stand-in for colorize() on ASCII profiles without color."""
+    return to_ascii(text)
+
+def _remember(cache, key, value):
+    """Store a cache entry, starting over once the table is full."""
+    if len(cache) >= CACHE_LIMIT:
+        cache.clear()
+    cache[key] = value
+
+def render_cache(world, profile=ANSI_PROFILE):
+    """Return the shared render cache for a world and terminal profile."""
+    cache = world.render_caches.get(profile)
+    if cache is None:
+        cache = world.render_caches[profile] = RenderCache(world, profile)
+    return cache
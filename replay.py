@@ -0,0 +1,288 @@
+"""
+Session record and replay for ZorkMUD: Sentinel Realm
+Records sessions as compact logs and replays them for regression checks and load tests.
+
+A session log is a JSON-lines file (gzipped when its name ends in .gz).
+The first line is a header holding the player, the terminal profile, whether
+saves are reported afterwards as events (see GameEngine.save_later) and the
+game's state when recording started (see GameEngine.capture_state). Every
+other line is one command, [milliseconds since the start, input, output],
+where the output is left out when the recorder doesn't keep it. Timed world
+events are logged the same way with {"event": name} in place of the input.
+A load is logged as {"load": input, "save": save data} with the save it
+read (null if there was none), since the save may come from an earlier
+session or change after this one.
+
+The engine is deterministic, so replaying a log from its header's state
+must reproduce every recorded response exactly.
+"""
+
+import argparse
+import asyncio
+import difflib
+import gzip
+import json
+import time
+
+from game_engine import GameEngine
+from output import CaptureSink, OutputSink
+from render import PROFILES, ANSI_PROFILE
+from save_store import MemorySaveStore, DEFAULT_SLOT
+
+LOG_VERSION = 1
+
+def _open_log(path, mode):
+    """Open a session log for text reading or writing, gzipped if named *.gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+class SessionRecorder:
+    """Engine recorder that writes every command of a session to a log."""
+    
+    def __init__(self, path, engine, keep_output=True):
+        """
+        Start a log with the engine's current state as its starting point.
+        
+        Args:
+            path (str): Log file to create
+            engine (GameEngine): A started game to record
+            keep_output (bool): Store each response so a replay can be diffed against it
+        """
+        self.path = path
+        self.keep_output = keep_output
+        self.start = time.monotonic()
+        self.file = _open_log(path, 'w')
+        header = {
+            'version': LOG_VERSION,
+            'player': engine.player.name,
+            'profile': engine.profile.name,
+            'started': time.time(),
+            'deferred_saves': engine.save_later is not None,
+            'state': engine.capture_state(),
+        }
+        self.file.write(json.dumps(header, separators=(',', ':')) + '\n')
+    
+    def record(self, engine, command, input_text):
+        """Log a command with its time and the response still buffered in the engine's output."""
+        elapsed = round((time.monotonic() - self.start) * 1000)
+        if command == 'event':
+            entry = [elapsed, {'event': input_text}]
+        elif command == 'load':
+            entry = [elapsed, {'load': input_text, 'save': self._loaded_save(engine)}]
+        else:
+            entry = [elapsed, input_text]
+        if self.keep_output:
+            entry.append(engine.output.getvalue())
+        self.file.write(json.dumps(entry, separators=(',', ':'), ensure_ascii=False) + '\n')
+    
+    def _loaded_save(self, engine):
+        """Read back the save a load command has just read, or None if there was none."""
+        try:
+            return engine.save_store.load(engine.player.name, DEFAULT_SLOT)
+        except Exception:
+            # Missing or unreadable: either way the load found nothing to restore
+            return None
+    
+    def close(self):
+        """Finish the log."""
+        self.file.close()
+
+def read_log(path):
+    """
+    Read a session log.
+    
+    Args:
+        path (str): Log file
+    
+    Returns:
+        tuple: (header dict, list of [milliseconds, input] or [milliseconds, input, output])
+    """
+    with _open_log(path, 'r') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != LOG_VERSION:
+            raise ValueError(f"{path}: log version {header.get('version')} is not supported")
+        entries = [json.loads(line) for line in f if line.strip()]
+    return header, entries
+
+def start_session(header, output=None, save_store=None):
+    """
+    Create an engine in the state a log's session started from.
+    
+    Args:
+        header (dict): The log's header
+        output (OutputSink): Where responses go (discarded if None)
+        save_store: Store for the session's saves (a private MemorySaveStore if None)
+    
+    Returns:
+        GameEngine: The engine, or None if the world could not be loaded
+    """
+    engine = GameEngine(save_store or MemorySaveStore(), output or OutputSink())
+    if header.get('deferred_saves'):
+        # The log holds each save's result as a 'saved' or 'save_failed' event
+        engine.save_later = _save_quietly
+    engine.set_profile(PROFILES.get(header.get('profile'), ANSI_PROFILE))
+    if not engine.new_game(header['player']):
+        return None
+    engine.restore_state(header['state'])
+    return engine
+
+def _save_quietly(engine, slot):
+    """Save without reporting it, for replays of servers that report saves as events."""
+    engine.save_game(slot)
+
+def play_entry(engine, entry):
+    """Replay one log entry, a command, a load or a timed event, on an engine."""
+    if not isinstance(entry[1], dict):
+        engine.process_command(entry[1])
+    elif 'load' in entry[1]:
+        # Put back the save the recorded load found, then load it the same way
+        if entry[1]['save'] is None:
+            engine.save_store.delete(engine.player.name, DEFAULT_SLOT)
+        else:
+            engine.save_store.save(engine.player.name, DEFAULT_SLOT, entry[1]['save'])
+        engine.process_command(entry[1]['load'])
+    else:
+        engine.run_event(entry[1]['event'])
+
+def check_log(path):
+    """
+    Replay a log and compare every response with the recorded one.
+    
+    Args:
+        path (str): Log file
+    
+    Returns:
+        dict: 'log', 'commands' (replayed), 'compared' (with a recorded
+        response) and 'mismatches', a list of {'index', 'input', 'diff'}
+    """
+    header, entries = read_log(path)
+    output = CaptureSink()
+    engine = start_session(header, output)
+    if engine is None:
+        raise RuntimeError("Could not load the world")
+    
+    compared = 0
+    mismatches = []
+    for index, entry in enumerate(entries):
+        play_entry(engine, entry)
+        actual = output.take()
+        if len(entry) < 3:
+            continue
+        compared += 1
+        if actual != entry[2]:
+            diff = difflib.unified_diff(entry[2].splitlines(), actual.splitlines(),
+                                        'recorded', 'replayed', lineterm='')
+            mismatches.append({'index': index, 'input': entry[1], 'diff': '\n'.join(diff)})
+    
+    return {'log': path, 'commands': len(entries), 'compared': compared, 'mismatches': mismatches}
+
+async def _play_session(header, entries, speed, stats):
+    """Play one log's commands at their recorded times divided by speed."""
+    engine = start_session(header)
+    if engine is None:
+        return
+    
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for entry in entries:
+        due = start + entry[0] / 1000 / speed if speed else loop.time()
+        delay = due - loop.time()
+        # Always yield, so sessions interleave even at full speed
+        await asyncio.sleep(max(delay, 0))
+        
+        began = loop.time()
+        play_entry(engine, entry)
+        stats['latencies'].append(loop.time() - began)
+        stats['lags'].append(max(began - due, 0))
+
+def play_logs(paths, speed=1.0):
+    """
+    Play many logs at once against in-process engines as synthetic load.
+    
+    Every log becomes one session, started together and driven by its
+    recorded timing like a real player, all on one event loop the way the
+    server runs its sessions.
+    
+    Args:
+        paths (list): Log files
+        speed (float): Time acceleration (2.0 plays twice as fast; 0 plays without waiting)
+    
+    Returns:
+        dict: 'sessions', 'commands', 'elapsed' (seconds), 'commands_per_second',
+        and 'latency' and 'lag' as {'p50', 'p99', 'max'} in seconds, where lag
+        is how late commands started compared to their schedule
+    """
+    logs = [read_log(path) for path in paths]
+    stats = {'latencies': [], 'lags': []}
+    
+    async def play_all():
+        await asyncio.gather(*(_play_session(header, entries, speed, stats) for header, entries in logs))
+    
+    start = time.perf_counter()
+    asyncio.run(play_all())
+    elapsed = time.perf_counter() - start
+    
+    commands = len(stats['latencies'])
+    return {
+        'sessions': len(logs),
+        'commands': commands,
+        'elapsed': elapsed,
+        'commands_per_second': commands / elapsed if elapsed else 0.0,
+        'latency': _percentiles(stats['latencies']),
+        'lag': _percentiles(stats['lags']),
+    }
+
+def _percentiles(values):
+    """Summarize timings as p50, p99 and max."""
+    if not values:
+        return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = sorted(values)
+    return {
+        'p50': values[int(len(values) * 0.5)],
+        'p99': values[min(int(len(values) * 0.99), len(values) - 1)],
+        'max': values[-1],
+    }
+
+def run_cli(args):
+    """
+    Command line entry point: python main.py replay LOG... [--load] [--speed X]
+    
+    Args:
+        args (list): Arguments after 'replay'
+    
+    Returns:
+        int: Exit status (1 if any replayed response differs from its log)
+    """
+    parser = argparse.ArgumentParser(
+        prog='python main.py replay',
+        description="Replay recorded sessions, checking their output or playing them as load."
+    )
+    parser.add_argument('logs', nargs='+', help="session log files")
+    parser.add_argument('--load', action='store_true', help="play all logs at once and report timings")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="time acceleration for --load (0 plays without waiting)")
+    options = parser.parse_args(args)
+    
+    if options.load:
+        result = play_logs(options.logs, options.speed)
+        print(f"{result['sessions']} sessions, {result['commands']} commands in {result['elapsed']:.2f}s "
+              f"({result['commands_per_second']:.0f} commands/s)")
+        for name in ('latency', 'lag'):
+            timings = result[name]
+            print(f"{name:>8}: p50 {timings['p50'] * 1e3:.2f} ms, p99 {timings['p99'] * 1e3:.2f} ms, "
+                  f"max {timings['max'] * 1e3:.2f} ms")
+        return 0
+    
+    status = 0
+    for path in options.logs:
+        result = check_log(path)
+        if result['mismatches']:
+            status = 1
+            print(f"{path}: {len(result['mismatches'])} of {result['compared']} responses differ")
+            for mismatch in result['mismatches']:
+                print(f"  entry {mismatch['index'] + 1}: {mismatch['input']}")
+                print('\n'.join('    ' + line for line in mismatch['diff'].splitlines()))
+        else:
+            print(f"{path}: OK ({result['commands']} commands, {result['compared']} responses compared)")
+    return status
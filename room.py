@@ -6,6 +6,8 @@ Represents locations in the game world.
 class Room:
     """Represents a room/location in the game world."""
     
+    __slots__ = ('name', 'description', 'short_description', 'exits', 'items', 'visited')
+    
     def __init__(self, name, description, short_description=None):
         """
         Initialize a room.
@@ -48,6 +50,15 @@ class Room:
                 return item
         return None
     
+    def get_contained_item(self, item_name):
+        """Get an item by name from inside an open container in the room."""
+        for room_item in self.items:
+            if room_item.is_open:
+                for content_item in room_item.contents:
+                    if content_item.matches_name(item_name):
+                        return content_item
+        return None
+    
     def look(self):
         """Get the full room description."""
         desc = self.description
@@ -0,0 +1,73 @@
+"""
+Lazily materialized room storage for ZorkMUD: Sentinel Realm
+Serves template rooms from a memory-mapped world snapshot, building a Room
+only when it is first needed and evicting the least recently used ones.
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from room import Room
+
+# Default number of materialized rooms kept per process
+ROOM_CACHE_SIZE = 4096
+
+class RoomStore(Mapping):
+    """Read-only mapping of room ID -> Room backed by snapshot records."""
+    
+    def __init__(self, reader, capacity=ROOM_CACHE_SIZE):
+        """
+        Initialize the store.
+        
+        Args:
+            reader (SnapshotReader): Snapshot holding one record per room
+            capacity (int): Maximum number of Room objects kept materialized
+        """
+        self.reader = reader
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __getitem__(self, room_id):
+        """Get a room, materializing it from its record if it isn't cached."""
+        room = self.cache.get(room_id)
+        if room is not None:
+            self.cache.move_to_end(room_id)
+            self.hits += 1
+            return room
+        
+        if room_id not in self.reader.room_index:
+            raise KeyError(room_id)
+        
+        name, description, short_description, exits = self.reader.room(room_id)
+        room = Room(name, description, short_description)
+        room.exits = exits
+        
+        self.misses += 1
+        self.cache[room_id] = room
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+        return room
+    
+    def __contains__(self, room_id):
+        return room_id in self.reader.room_index
+    
+    def __iter__(self):
+        return iter(self.reader.room_index)
+    
+    def __len__(self):
+        return len(self.reader.room_index)
+    
+    def stats(self):
+        """Return cache counters for monitoring."""
+        return {
+            'rooms': len(self),
+            'materialized': len(self.cache),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
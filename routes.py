@@ -0,0 +1,170 @@
+"""
+Route planning for ZorkMUD: Sentinel Realm
+Finds the shortest way between two rooms for the travel command.
+
+Routes are looked up in next-hop tables: for one destination, a table maps
+every room that can reach it to the exit to take next. A table is built
+with a single breadth-first search backwards along the exits, after which
+any route to that destination is read off in O(path length). Tables are
+built the first time a destination is asked for and shared by every
+session of the world, up to ROUTE_CACHE_SIZE destinations.
+
+Exits belong to the read-only world template, so a table never goes stale
+while its world is loaded. The route table is kept on its world, so
+reloading the world starts a fresh one and the old one goes with the old world.
+"""
+
+from collections import OrderedDict, deque
+
+# Destinations whose next-hop tables are kept per world
+ROUTE_CACHE_SIZE = 1024
+
+# Words left out when matching room names, so "the Attic" finds "Attic"
+ROOM_NAME_ARTICLES = frozenset(('the', 'a', 'an'))
+
+def normalize_room_name(name):
+    """
+    Normalize a room name for lookup: lowercase, single spaces, no articles.
+    
+    Only whole words are dropped, so names like "Treasure Room" keep every letter.
+    
+    Args:
+        name (str): Room ID, name or short description as written
+    
+    Returns:
+        str: The lookup key
+    """
+    return ' '.join(word for word in name.lower().split() if word not in ROOM_NAME_ARTICLES)
+
+class RouteTable:
+    """Lazily built next-hop tables toward the rooms of one world."""
+    
+    def __init__(self, world, capacity=ROUTE_CACHE_SIZE):
+        """
+        Initialize an empty route table.
+        
+        Args:
+            world (World): The world whose exits are followed
+            capacity (int): Maximum number of destination tables kept
+        """
+        self.world = world
+        self.capacity = capacity
+        self.entrances = None  # room ID -> [(neighbor ID, direction leading here)], built on first use
+        self.names = None  # normalized room ID, name or short description -> tuple of room IDs
+        self.tables = OrderedDict()  # (destination, blocked rooms) -> {room ID: direction or None}
+    
+    def _build_entrances(self):
+        """Reverse the exit graph so searches can run backwards from a destination."""
+        entrances = {}
+        for room_id in self.world.rooms:
+            for direction, target in self.world.rooms[room_id].exits.items():
+                entrances.setdefault(target, []).append((room_id, direction))
+        self.entrances = entrances
+    
+    def next_hops(self, destination, blocked=frozenset()):
+        """
+        Get the next-hop table toward a destination.
+        
+        Args:
+            destination (str): Room ID to reach
+            blocked (frozenset): Room IDs that can't be entered on the way
+        
+        Returns:
+            dict: Room ID -> direction to take next (None at the destination);
+            rooms that can't reach the destination are missing
+        """
+        key = (destination, blocked)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            return table
+        
+        if self.entrances is None:
+            self._build_entrances()
+        
+        table = {destination: None}
+        pending = deque([destination])
+        while pending:
+            room_id = pending.popleft()
+            if room_id in blocked:
+                continue  # nobody can step in here, so nothing leads on from it
+            for neighbor, direction in self.entrances.get(room_id, ()):
+                if neighbor not in table:
+                    table[neighbor] = direction
+                    pending.append(neighbor)
+        
+        self.tables[key] = table
+        if len(self.tables) > self.capacity:
+            self.tables.popitem(last=False)
+        return table
+    
+    def route(self, start, destination, blocked=frozenset()):
+        """
+        Find a shortest route between two rooms.
+        
+        Args:
+            start (str): Room ID to leave from
+            destination (str): Room ID to reach
+            blocked (frozenset): Room IDs that can't be entered on the way
+        
+        Returns:
+            list: (direction, room ID entered) steps, or None if there is no route
+        """
+        table = self.next_hops(destination, blocked)
+        if start not in table:
+            return None
+        
+        steps = []
+        room_id = start
+        while room_id != destination:
+            direction = table[room_id]
+            room_id = self.world.rooms[room_id].exits[direction]
+            steps.append((direction, room_id))
+        return steps
+    
+    def _build_names(self):
+        """
+        Index every room by ID, name and short description.
+        
+        Room IDs win over names, and names over short descriptions, so a
+        description that reads like another room's name never hides that room.
+        A key shared by several rooms at its best kind lists them all.
+        """
+        kinds = ({}, {}, {})  # room IDs, names, short descriptions: key -> room IDs
+        for room_id in self.world.rooms:
+            room = self.world.rooms[room_id]
+            for keys, key in zip(kinds, (room_id, room.name, room.short_description)):
+                if key:
+                    matches = keys.setdefault(normalize_room_name(key), [])
+                    if room_id not in matches:
+                        matches.append(room_id)
+        names = {}
+        for keys in kinds:
+            for key, matches in keys.items():
+                names.setdefault(key, tuple(matches))
+        self.names = names
+    
+    def find_rooms(self, name):
+        """
+        Find the rooms a room ID, name or short description could mean (see normalize_room_name).
+        
+        Args:
+            name (str): What the player called the room
+        
+        Returns:
+            tuple: Matching room IDs: none, one, or several if the name is ambiguous
+        """
+        if self.names is None:
+            self._build_names()
+        return self.names.get(normalize_room_name(name), ())
+    
+    def find_room(self, name):
+        """Resolve a room ID, name or short description to a room ID, or None if unknown or ambiguous."""
+        matches = self.find_rooms(name)
+        return matches[0] if len(matches) == 1 else None
+
+def route_table(world):
+    """Return the shared route table of a world."""
+    if world.route_table is None:
+        world.route_table = RouteTable(world)
+    return world.route_table
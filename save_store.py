@@ -0,0 +1,236 @@
+"""
+Save storage for ZorkMUD: Sentinel Realm
+Keeps saved games per player and slot, as files, in a SQLite database or in memory.
+
+All stores hold the same encoded saves (see savegame.py) and share one
+interface: save(), save_many(), load(), list() and delete().
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import quote, unquote
+
+from savegame import SaveError, decode_save, encode_save, write_save, read_save
+
+DEFAULT_SLOT = 'default'
+SAVE_SUFFIX = '.sav'
+
+def _file_part(text):
+    """Encode a player or slot name for use in a file name."""
+    return quote(text, safe='').replace('.', '%2E')
+
+class FileSaveStore:
+    """Saves stored as one file per player and slot."""
+    
+    def __init__(self, directory='saves'):
+        """
+        Initialize the store.
+        
+        Args:
+            directory (str): Directory holding the save files
+        """
+        self.directory = directory
+    
+    def path(self, player, slot):
+        """Get the file holding a player's save slot."""
+        name = f"{_file_part(player)}.{_file_part(slot)}{SAVE_SUFFIX}"
+        return os.path.join(self.directory, name)
+    
+    def save(self, player, slot, save_data):
+        """Store save data in a player's slot, replacing what was there."""
+        os.makedirs(self.directory, exist_ok=True)
+        write_save(self.path(player, slot), save_data)
+    
+    def save_many(self, entries):
+        """Store several (player, slot, save_data) entries."""
+        for player, slot, save_data in entries:
+            self.save(player, slot, save_data)
+    
+    def load(self, player, slot):
+        """Get the save data in a player's slot (raises SaveError if empty)."""
+        return read_save(self.path(player, slot))
+    
+    def list(self, player=None):
+        """
+        List stored saves.
+        
+        Args:
+            player (str): Only list this player's saves
+        
+        Returns:
+            list: (player, slot, saved_at) tuples sorted by player and slot
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        
+        saves = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(SAVE_SUFFIX) or name.count('.') != 2:
+                continue
+            owner, slot = (unquote(part) for part in name[:-len(SAVE_SUFFIX)].split('.'))
+            if player is None or owner == player:
+                saved_at = os.path.getmtime(os.path.join(self.directory, name))
+                saves.append((owner, slot, saved_at))
+        return sorted(saves)
+    
+    def delete(self, player, slot):
+        """Delete a player's save slot; returns True if it existed."""
+        try:
+            os.remove(self.path(player, slot))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def close(self):
+        """Nothing to release for files."""
+
+class MemorySaveStore:
+    """Saves kept in memory for the life of the process, e.g. for headless runs."""
+    
+    def __init__(self):
+        """Initialize an empty store."""
+        self.saves = {}  # (player, slot) -> (encoded save, saved_at)
+    
+    def save(self, player, slot, save_data):
+        """Store save data in a player's slot, replacing what was there."""
+        self.saves[(player, slot)] = (encode_save(save_data), time.time())
+    
+    def save_many(self, entries):
+        """Store several (player, slot, save_data) entries."""
+        for player, slot, save_data in entries:
+            self.save(player, slot, save_data)
+    
+    def load(self, player, slot):
+        """Get the save data in a player's slot (raises SaveError if empty)."""
+        entry = self.saves.get((player, slot))
+        if entry is None:
+            raise SaveError(f"No saved game for {player!r} in slot {slot!r}")
+        return decode_save(entry[0])
+    
+    def list(self, player=None):
+        """
+        List stored saves.
+        
+        Args:
+            player (str): Only list this player's saves
+        
+        Returns:
+            list: (player, slot, saved_at) tuples sorted by player and slot
+        """
+        return sorted((owner, slot, saved_at) for (owner, slot), (_, saved_at) in self.saves.items()
+                      if player is None or owner == player)
+    
+    def delete(self, player, slot):
+        """Delete a player's save slot; returns True if it existed."""
+        return self.saves.pop((player, slot), None) is not None
+    
+    def close(self):
+        """Nothing to release in memory."""
+
+class SQLiteSaveStore:
+    """Saves stored in one SQLite database shared by every session."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS saves (
+            player TEXT NOT NULL,
+            slot TEXT NOT NULL,
+            data BLOB NOT NULL,
+            saved_at REAL NOT NULL,
+            PRIMARY KEY (player, slot)
+        ) WITHOUT ROWID
+    """
+    
+    UPSERT = "INSERT OR REPLACE INTO saves (player, slot, data, saved_at) VALUES (?, ?, ?, ?)"
+    
+    def __init__(self, path=os.path.join('saves', 'saves.db')):
+        """
+        Initialize the store, creating the database if needed.
+        
+        Args:
+            path (str): Database file
+        """
+        self.path = path
+        self.local = threading.local()  # one connection per thread
+        self.connections = []
+        self.lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection()  # create the schema up front
+    
+    def connection(self):
+        """Get the calling thread's connection, opening it on first use."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            # WAL lets readers and the writer work at the same time, and with it
+            # synchronous=NORMAL only syncs at checkpoints, not every commit.
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(self.SCHEMA)
+            self.local.connection = connection
+            with self.lock:
+                self.connections.append(connection)
+        return connection
+    
+    def save(self, player, slot, save_data):
+        """Store save data in a player's slot, replacing what was there."""
+        self.save_many([(player, slot, save_data)])
+    
+    def save_many(self, entries):
+        """Store several (player, slot, save_data) entries in a single transaction."""
+        now = time.time()
+        rows = [(player, slot, encode_save(save_data), now) for player, slot, save_data in entries]
+        connection = self.connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany(self.UPSERT, rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+    
+    def load(self, player, slot):
+        """Get the save data in a player's slot (raises SaveError if empty)."""
+        row = self.connection().execute(
+            "SELECT data FROM saves WHERE player = ? AND slot = ?", (player, slot)
+        ).fetchone()
+        if row is None:
+            raise SaveError(f"No saved game for {player!r} in slot {slot!r}")
+        return decode_save(row[0])
+    
+    def list(self, player=None):
+        """
+        List stored saves.
+        
+        Args:
+            player (str): Only list this player's saves
+        
+        Returns:
+            list: (player, slot, saved_at) tuples sorted by player and slot
+        """
+        query = "SELECT player, slot, saved_at FROM saves"
+        if player is None:
+            rows = self.connection().execute(query + " ORDER BY player, slot")
+        else:
+            rows = self.connection().execute(query + " WHERE player = ? ORDER BY slot", (player,))
+        return rows.fetchall()
+    
+    def delete(self, player, slot):
+        """Delete a player's save slot; returns True if it existed."""
+        cursor = self.connection().execute(
+            "DELETE FROM saves WHERE player = ? AND slot = ?", (player, slot)
+        )
+        return cursor.rowcount > 0
+    
+    def close(self):
+        """Close every thread's connection."""
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for connection in connections:
+            connection.close()
+        self.local = threading.local()
@@ -0,0 +1,97 @@
+"""
+Saved game files for ZorkMUD: Sentinel Realm
+A small, versioned container for the delta between a game and the world template.
+
+Layout (all integers little-endian):
+    magic      4 bytes   b'ZMSV'
+    version    uint16    SAVE_VERSION
+    body       compact JSON (UTF-8) of the save data
+
+The body is plain data only, so loading a save can never run code, and it
+does not depend on how the engine's classes are laid out. What the body
+contains is up to the caller (see GameEngine.capture_state); this module only
+deals with the container. A mid-game save of the shipped world is about
+half a kilobyte, most of it the item IDs of the changed locations.
+"""
+
+import json
+import os
+import struct
+import tempfile
+
+SAVE_MAGIC = b'ZMSV'
+SAVE_VERSION = 1
+
+HEADER = struct.Struct('<4sH')
+
+class SaveError(Exception):
+    """Raised when a save file is missing, corrupt or from another version."""
+
+def encode_save(save_data):
+    """
+    Encode save data into the save file format.
+    
+    Args:
+        save_data (dict): JSON-compatible save data
+    
+    Returns:
+        bytes: The encoded save
+    """
+    body = json.dumps(save_data, separators=(',', ':'), ensure_ascii=False)
+    return HEADER.pack(SAVE_MAGIC, SAVE_VERSION) + body.encode('utf-8')
+
+def decode_save(data):
+    """
+    Decode a save produced by encode_save().
+    
+    Args:
+        data (bytes): The encoded save
+    
+    Returns:
+        dict: The save data
+    """
+    if len(data) < HEADER.size:
+        raise SaveError("Save file is truncated")
+    
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != SAVE_MAGIC:
+        raise SaveError("Not a saved game")
+    if version != SAVE_VERSION:
+        raise SaveError(f"Save version {version} is not supported (expected {SAVE_VERSION})")
+    
+    try:
+        return json.loads(data[HEADER.size:].decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise SaveError(f"Save file is corrupt: {e}")
+
+def write_save(path, save_data, durable=False):
+    """
+    Write save data to a file, replacing any previous save atomically.
+    
+    Args:
+        path (str): Save file to write
+        save_data (dict): JSON-compatible save data
+        durable (bool): Sync the file to disk before it replaces the old save
+    """
+    data = encode_save(save_data)
+    # A uniquely named temporary file, so concurrent writers of one save don't collide
+    directory, name = os.path.split(path)
+    f = tempfile.NamedTemporaryFile('wb', dir=directory or '.', prefix=f"{name}.", suffix='.tmp', delete=False)
+    try:
+        with f:
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+def read_save(path):
+    """Read save data from a file."""
+    try:
+        with open(path, 'rb') as f:
+            return decode_save(f.read())
+    except FileNotFoundError:
+        raise SaveError(f"No saved game at {path}")
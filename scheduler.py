@@ -0,0 +1,208 @@
+"""
+World tick scheduler for ZorkMUD: Sentinel Realm
+Runs timed world events, such as lamp fuel running out, at a fixed tick rate.
+
+Timers live in a hierarchical timing wheel. Each level has WHEEL_SLOTS
+slots, and a slot on level L covers WHEEL_SLOTS ** L ticks. A timer goes in
+the lowest level whose range reaches its due tick, so scheduling and
+cancelling are O(1). Each tick fires one level 0 slot. Whenever a level
+wraps, the next slot of the level above is spread out over the levels
+below, so each timer is moved at most once per level. Timers further away
+than the top level can reach wait in an overflow list.
+
+TickScheduler drives a wheel from the asyncio event loop at a fixed rate:
+if the loop falls behind, it runs the missed ticks back to back instead of
+stretching the schedule.
+"""
+
+import asyncio
+
+# Seconds per world tick
+TICK_SECONDS = 1.0
+
+# Slots per wheel level and number of levels (64 ** 4 ticks is about 194 days at 1 tick a second)
+WHEEL_BITS = 6
+WHEEL_SLOTS = 1 << WHEEL_BITS
+WHEEL_LEVELS = 4
+
+class Timer:
+    """A scheduled callback; cancel it through its wheel."""
+    
+    __slots__ = ('due', 'callback', 'args', 'bucket')
+    
+    def __init__(self, due, callback, args):
+        """
+        Initialize a timer.
+        
+        Args:
+            due (int): Tick the timer fires on
+            callback (callable): Called with args when the timer fires
+            args (tuple): Arguments for the callback
+        """
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.bucket = None  # slot (or overflow) dict holding the timer while it is pending
+    
+    @property
+    def pending(self):
+        """Whether the timer has neither fired nor been cancelled."""
+        return self.bucket is not None
+
+class TimingWheel:
+    """Hierarchical timing wheel counting time in whole ticks."""
+    
+    def __init__(self, levels=WHEEL_LEVELS):
+        """
+        Initialize an empty wheel at tick 0.
+        
+        Args:
+            levels (int): Number of wheel levels
+        """
+        self.now = 0
+        self.levels = [[{} for _ in range(WHEEL_SLOTS)] for _ in range(levels)]
+        self.overflow = {}  # timers too far away for the top level
+        self.count = 0
+    
+    def __len__(self):
+        """Number of pending timers."""
+        return self.count
+    
+    def schedule(self, delay, callback, *args):
+        """
+        Call callback(*args) after a number of ticks.
+        
+        Args:
+            delay (int): Ticks from now (at least 1; the current tick has already run)
+            callback (callable): Function to call
+            args: Arguments for the callback
+        
+        Returns:
+            Timer: Handle for cancel()
+        """
+        timer = Timer(self.now + max(1, int(delay)), callback, args)
+        self._insert(timer)
+        self.count += 1
+        return timer
+    
+    def cancel(self, timer):
+        """Cancel a pending timer (does nothing if it already fired or was cancelled)."""
+        if timer.bucket is None:
+            return
+        del timer.bucket[timer]
+        timer.bucket = None
+        self.count -= 1
+    
+    def _insert(self, timer):
+        """Put a timer in the lowest level whose slots reach its due tick."""
+        for level, slots in enumerate(self.levels):
+            shift = level * WHEEL_BITS
+            if (timer.due >> shift) - (self.now >> shift) < WHEEL_SLOTS:
+                bucket = slots[(timer.due >> shift) & (WHEEL_SLOTS - 1)]
+                break
+        else:
+            bucket = self.overflow
+        bucket[timer] = None
+        timer.bucket = bucket
+    
+    def _cascade(self, level):
+        """Spread the current slot of a level over the levels below it."""
+        if level == len(self.levels):
+            timers, self.overflow = self.overflow, {}
+        else:
+            slots = self.levels[level]
+            index = (self.now >> (level * WHEEL_BITS)) & (WHEEL_SLOTS - 1)
+            timers, slots[index] = slots[index], {}
+        for timer in timers:
+            self._insert(timer)
+    
+    def tick(self):
+        """
+        Advance one tick and fire the timers due on it.
+        
+        Returns:
+            int: Number of timers fired
+        """
+        self.now += 1
+        # Higher levels first, so their timers can land in the slots cascaded next
+        for level in range(len(self.levels), 0, -1):
+            if self.now & ((1 << (level * WHEEL_BITS)) - 1) == 0:
+                self._cascade(level)
+        
+        slots = self.levels[0]
+        index = self.now & (WHEEL_SLOTS - 1)
+        due, slots[index] = slots[index], {}
+        fired = 0
+        for timer in due:
+            if timer.bucket is not due:
+                continue  # cancelled by an earlier callback of this tick
+            timer.bucket = None
+            self.count -= 1
+            fired += 1
+            timer.callback(*timer.args)
+        return fired
+    
+    def advance(self, ticks):
+        """
+        Advance several ticks, firing timers in order.
+        
+        Returns:
+            int: Number of timers fired
+        """
+        return sum(self.tick() for _ in range(ticks))
+
+class TickScheduler:
+    """Fixed-rate world clock on the asyncio event loop, backed by a timing wheel."""
+    
+    def __init__(self, tick_seconds=TICK_SECONDS, wheel=None):
+        """
+        Initialize a stopped clock.
+        
+        Args:
+            tick_seconds (float): Seconds per tick
+            wheel (TimingWheel): Wheel holding the timers (a new one if None)
+        """
+        self.tick_seconds = tick_seconds
+        self.wheel = wheel or TimingWheel()
+        self.task = None
+        self.late_ticks = 0  # ticks run late because the loop fell behind
+    
+    @property
+    def now(self):
+        """The current tick."""
+        return self.wheel.now
+    
+    def schedule(self, delay, callback, *args):
+        """Call callback(*args) after delay ticks (see TimingWheel.schedule)."""
+        return self.wheel.schedule(delay, callback, *args)
+    
+    def cancel(self, timer):
+        """Cancel a pending timer."""
+        self.wheel.cancel(timer)
+    
+    def start(self):
+        """Start ticking on the running event loop."""
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self):
+        """Stop ticking."""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+    
+    async def _run(self):
+        """Tick at a fixed rate, catching up on ticks missed while the loop was busy."""
+        loop = asyncio.get_running_loop()
+        start = loop.time() - self.wheel.now * self.tick_seconds
+        while True:
+            due = int((loop.time() - start) / self.tick_seconds)
+            if due - self.wheel.now > 1:
+                self.late_ticks += due - self.wheel.now - 1
+            while self.wheel.now < due:
+                self.wheel.tick()
+            await asyncio.sleep(start + (self.wheel.now + 1) * self.tick_seconds - loop.time())
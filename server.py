@@ -0,0 +1,397 @@
+"""
+Network server for ZorkMUD: Sentinel Realm
+Hosts many concurrent telnet-style sessions in a single asyncio process.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import logging
+import os
+import sqlite3
+import time
+
+from game_engine import GameEngine
+from output import StreamSink, COMPRESSION_LEVEL
+from save_store import SQLiteSaveStore, _file_part
+from savegame import SaveError
+from autosave import Autosaver, AUTOSAVE_SLOT
+from replay import SessionRecorder
+from presence import Presence
+from scheduler import TickScheduler
+from player_stats import PlayerStats
+from ratelimit import CommandQueue, COMMAND_RATE, COMMAND_BURST, INPUT_QUEUE
+from ansi_graphics import ANSIColors, colorize_text
+
+# Longest accepted player name
+MAX_NAME_LENGTH = 20
+
+logger = logging.getLogger(__name__)
+
+# Telnet protocol bytes
+IAC = 255
+SB = 250
+SE = 240
+WILL = 251
+WONT = 252
+DO = 253
+DONT = 254
+
+# Telnet option of the MUD Client Compression Protocol v2
+COMPRESS2 = 86
+
+def strip_telnet(data, negotiations=None):
+    """
+    Remove telnet negotiation sequences from raw client input.
+    
+    Args:
+        data (bytes): Raw bytes received from the client
+        negotiations (list): Gets (command, option) appended for every
+            WILL, WONT, DO and DONT removed, if given
+    
+    Returns:
+        bytes: The input with IAC commands and subnegotiations removed
+    """
+    if IAC not in data:
+        return data
+    
+    cleaned = bytearray()
+    i = 0
+    length = len(data)
+    while i < length:
+        byte = data[i]
+        if byte != IAC:
+            cleaned.append(byte)
+            i += 1
+            continue
+        
+        command = data[i + 1] if i + 1 < length else None
+        if command == IAC:
+            # Escaped 0xFF data byte
+            cleaned.append(IAC)
+            i += 2
+        elif command == SB:
+            # Skip the whole subnegotiation up to IAC SE
+            end = data.find(bytes([IAC, SE]), i + 2)
+            i = length if end == -1 else end + 2
+        elif command in (WILL, WONT, DO, DONT):
+            if negotiations is not None and i + 2 < length:
+                negotiations.append((command, data[i + 2]))
+            i += 3
+        else:
+            i += 2
+    
+    return bytes(cleaned)
+
+class Session:
+    """A single connected player with its own engine and output stream."""
+    
+    def __init__(self, server, reader, writer):
+        """
+        Initialize a session.
+        
+        Args:
+            server (MUDServer): The server hosting this session
+            reader (asyncio.StreamReader): Client input stream
+            writer (asyncio.StreamWriter): Client output stream
+        """
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.output = StreamSink(writer)  # telnet line endings, one write per response
+        # Saves go through the autosaver, so `save` never waits on the database
+        self.engine = GameEngine(server.autosaver, self.output, stats=server.stats)
+        self.engine.save_later = self.save_later
+        self.peer = writer.get_extra_info('peername')
+        self.input = None  # InputQueue holding the commands waiting to run, see ratelimit.py
+        self.name = None  # player name reserved in the server's players, see claim_name()
+    
+    async def send(self, text=''):
+        """Send text, along with anything the engine left unsent, and wait for the client to keep up."""
+        self.output.write(text)
+        self.output.flush()
+        await self.writer.drain()
+    
+    async def read_line(self):
+        """
+        Read one line of input from the client.
+        
+        Returns:
+            str: The decoded line, or None if the client went away or idled out
+        """
+        try:
+            raw = await asyncio.wait_for(self.reader.readline(), self.server.idle_timeout)
+        except asyncio.TimeoutError:
+            await self.send(colorize_text("\nIdle timeout. Goodbye!\n", ANSIColors.BRIGHT_YELLOW))
+            return None
+        except ValueError:
+            # Line exceeded the stream limit; the reader already discarded it
+            await self.send(colorize_text("That line is too long.\n", ANSIColors.BRIGHT_RED))
+            return ''
+        
+        if not raw:
+            return None
+        negotiations = []
+        line = strip_telnet(raw, negotiations)
+        for command, option in negotiations:
+            self.negotiate(command, option)
+        return line.decode('utf-8', 'ignore').strip()
+    
+    def negotiate(self, command, option):
+        """Act on a client's answer to a telnet option the server offered."""
+        if option != COMPRESS2 or not self.server.compression:
+            return
+        if command == DO and self.output.compressor is None:
+            # Everything after IAC SB COMPRESS2 IAC SE is one zlib stream
+            self.output.start_compression(bytes([IAC, SB, COMPRESS2, IAC, SE]), self.server.compression)
+        elif command == DONT:
+            self.output.end_compression()
+    
+    def save_later(self, engine, slot):
+        """Write a `save` on the autosave worker and report it once it is stored (see GameEngine.save_later)."""
+        future = self.server.autosaver.save(engine.player.name, slot, engine.capture_state())
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda future: loop.call_soon_threadsafe(self.report_save, future))
+    
+    def report_save(self, future):
+        """Tell the player whether their save was stored, between commands like a timed event."""
+        if self.writer.is_closing():
+            return
+        self.engine.run_event('save_failed' if future.exception() else 'saved')
+    
+    async def ask_name(self):
+        """
+        Ask the client for a player name, which also keys their saved games.
+        
+        Returns:
+            str: The cleaned up name, or None if the client went away
+        """
+        if self.server.compression:
+            self.output.send_bytes(bytes([IAC, WILL, COMPRESS2]))  # offer MCCP2
+        await self.send(colorize_text("What is your name, adventurer? ", ANSIColors.BRIGHT_CYAN))
+        line = await self.read_line()
+        if line is None:
+            return None
+        name = ''.join(char for char in line if char.isprintable()).strip()[:MAX_NAME_LENGTH]
+        return name or "Adventurer"
+    
+    async def claim_name(self):
+        """
+        Ask for a name until the client picks one nobody connected is playing as.
+        
+        A name keys the player's autosave, so two sessions under one name
+        would keep overwriting each other's progress.
+        
+        Returns:
+            str: The name, now reserved for this session, or None if the client went away
+        """
+        while True:
+            name = await self.ask_name()
+            if name is None:
+                return None
+            if name not in self.server.players:
+                self.server.players[name] = self
+                self.name = name
+                return name
+            await self.send(colorize_text(f"{name} is already playing. Please choose another name.\n", ANSIColors.BRIGHT_RED))
+    
+    async def run(self):
+        """Drive the engine from client input until the player leaves."""
+        name = await self.claim_name()
+        if name is None:
+            return
+        
+        if not self.engine.new_game(name):
+            await self.send(colorize_text("Error: Could not start game.\n", ANSIColors.BRIGHT_RED))
+            return
+        
+        # Pick up where this player's last session left off
+        try:
+            self.engine.restore_state(self.server.autosaver.load(name, AUTOSAVE_SLOT))
+            # A finished game, won or lost to a grue, starts over instead
+            resumed = not self.engine.game_won and self.engine.player.is_alive()
+        except SaveError:
+            resumed = False
+        except (KeyError, TypeError, ValueError, AttributeError, sqlite3.Error):
+            # A damaged autosave must not keep the player out: start them afresh
+            logger.exception("Could not resume %s from their autosave", name)
+            resumed = False
+        if not resumed:
+            self.engine.new_game(name)
+        
+        self.engine.show_welcome()
+        await self.send()
+        if resumed:
+            await self.send(colorize_text(f"Welcome back, {name}. Your progress has been restored.\n", ANSIColors.BRIGHT_GREEN))
+        
+        presence = self.server.presence
+        self.engine.presence = presence
+        presence.enter(self.engine)
+        presence.deliver(_prompt)
+        self.engine.attach_scheduler(self.server.clock)
+        self.server.autosaver.attach(self.engine)
+        recorder = self.server.start_recording(self.engine)
+        commands = self.server.commands
+        self.input = commands.open(self.run_command)
+        try:
+            await self.send(_prompt(self.engine))
+            # Commands run in the server's dispatcher; this loop only queues them
+            while self.engine.running and not self.engine.game_won:
+                line = await self.read_line()
+                if line is None:
+                    break
+                if line:
+                    if not await commands.submit(self.input, line) and not self.input.closed:
+                        self.output.write(colorize_text(f"Too many commands at once; ignored: {line}\n", ANSIColors.BRIGHT_RED))
+                elif not self.input.lines:
+                    self.output.write(_prompt(self.engine))
+                # Stop reading while the client isn't taking its output
+                await self.send()
+        finally:
+            commands.close(self.input)
+            presence.leave(self.engine)
+            presence.deliver(_prompt)
+            self.engine.presence = None
+            self.engine.attach_scheduler(None)
+            self.server.autosaver.detach(self.engine)
+            if recorder:
+                self.engine.recorders.remove(recorder)
+                recorder.close()
+    
+    def run_command(self, line):
+        """Run one queued input line and send the response (called by the server's dispatcher)."""
+        if self.writer.is_closing():
+            # The client is gone; don't play out the rest of its input
+            self.server.commands.close(self.input)
+            return
+        self.engine.process_command(line)
+        # Before the dispatcher yields, so no other session runs with these messages unsent
+        self.server.presence.deliver(_prompt)
+        if self.engine.running and not self.engine.game_won:
+            self.output.write(_prompt(self.engine))
+            self.output.flush()
+        else:
+            # The game is over: end the read loop by closing the connection after the response
+            self.output.flush()
+            self.output.end_compression()
+            self.writer.close()
+
+def _prompt(engine):
+    """Prompt shown again after messages about other players."""
+    return engine.render.art['command_prompt']
+
+class MUDServer:
+    """Asyncio TCP server that runs one GameEngine per connected client."""
+    
+    def __init__(self, host='0.0.0.0', port=4000, max_sessions=1000,
+                 idle_timeout=1800, max_line=512, save_store=None, autosave_interval=30.0,
+                 record_dir=None, command_rate=COMMAND_RATE, command_burst=COMMAND_BURST,
+                 input_queue=INPUT_QUEUE, drop_overflow=False, compression=COMPRESSION_LEVEL):
+        """
+        Initialize the server.
+        
+        Args:
+            host (str): Interface to listen on
+            port (int): TCP port to listen on
+            max_sessions (int): Maximum number of concurrent sessions
+            idle_timeout (float): Seconds of silence before a client is dropped
+            max_line (int): Maximum accepted input line length in bytes
+            save_store: Store shared by every session's saves (saves/saves.db if None)
+            autosave_interval (float): Seconds after which a changed game is autosaved
+            record_dir (str): Directory to record every session's log into (see replay.py)
+            command_rate (float): Commands per second a session may sustain (None for no limit)
+            command_burst (int): Commands a session may send at once
+            input_queue (int): Input lines queued per session before it stops being read
+            drop_overflow (bool): Drop input that finds a session's queue full instead
+            compression (int): zlib level of MCCP2 output compression offered to
+                clients (0 not to offer it)
+        """
+        self.host = host
+        self.port = port
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_line = max_line
+        self.save_store = save_store or SQLiteSaveStore()
+        self.autosaver = Autosaver(self.save_store, interval=autosave_interval)
+        self.record_dir = record_dir
+        self.session_numbers = itertools.count(1)
+        self.sessions = set()
+        self.presence = Presence()  # who is in which room, shared by every session
+        self.clock = TickScheduler()  # world clock running every session's timed events
+        self.stats = PlayerStats()  # numeric fields of every session's player, one row each
+        self.commands = CommandQueue(command_rate, command_burst, input_queue, drop_overflow)  # see ratelimit.py
+        self.compression = compression
+        self.players = {}  # player name -> the session playing under it
+        self.server = None
+    
+    async def handle_client(self, reader, writer):
+        """Run a session for a newly connected client."""
+        session = Session(self, reader, writer)
+        try:
+            if len(self.sessions) >= self.max_sessions:
+                await session.send(colorize_text("The realm is full. Please try again later.\n", ANSIColors.BRIGHT_RED))
+                return
+            
+            self.sessions.add(session)
+            await session.run()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            if self.players.get(session.name) is session:
+                del self.players[session.name]
+            if session.engine.player:
+                session.engine.player.release()
+            session.output.end_compression()
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+    
+    def start_recording(self, engine):
+        """
+        Start recording a session's commands if recording is enabled.
+        
+        Args:
+            engine (GameEngine): The session's started game
+        
+        Returns:
+            SessionRecorder: The recorder attached to the engine, or None
+        """
+        if not self.record_dir:
+            return None
+        os.makedirs(self.record_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(self.session_numbers)}-{_file_part(engine.player.name)}.log.gz"
+        recorder = SessionRecorder(os.path.join(self.record_dir, name), engine)
+        engine.recorders.append(recorder)
+        return recorder
+    
+    async def start(self):
+        """Start listening for connections."""
+        self.server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, limit=self.max_line
+        )
+        self.clock.start()
+        self.autosaver.start(self.clock)
+        self.commands.start()
+        return self.server
+    
+    async def serve_forever(self):
+        """Start the server and run until cancelled."""
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.commands.stop()
+            await self.clock.stop()
+
+def run_server(host='0.0.0.0', port=4000, **options):
+    """Run the MUD server in the current process until interrupted."""
+    server = MUDServer(host, port, **options)
+    print(colorize_text(f"Sentinel Realm server listening on {host}:{port}", ANSIColors.BRIGHT_GREEN))
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print(colorize_text("\nServer shutting down.", ANSIColors.BRIGHT_YELLOW))
+    finally:
+        server.autosaver.close()  # write the final autosaves
@@ -0,0 +1,162 @@
+"""
+Binary world snapshots for ZorkMUD: Sentinel Realm
+A compiled, versioned copy of the data/*.json world files that loads in one read.
+
+Layout (all integers little-endian):
+    magic      4 bytes   b'ZMWS'
+    version    uint16    SNAPSHOT_VERSION
+    reserved   uint16
+    meta_size  uint32    size of the marshalled metadata that follows
+    meta       marshal   dict of world tables plus 'sources' and 'records'
+    records    marshal   one record per room, located via meta['records']
+
+meta['records'] maps each room ID to the offset and size of its record,
+packed into one integer as (offset << 32) | size with the offset counted from
+the start of the records section, so a reader can decode rooms one at a time
+instead of all at once. What the tables and records contain is
+up to the caller (see world.py); this module only deals with the container.
+"""
+
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+
+SNAPSHOT_MAGIC = b'ZMWS'
+SNAPSHOT_VERSION = 2
+SNAPSHOT_NAME = 'world.snapshot'
+
+HEADER = struct.Struct('<4sHHI')
+
+# Low bits of a packed record index entry holding the record size
+RECORD_SIZE_MASK = 0xFFFFFFFF
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, corrupt or from another version."""
+
+def snapshot_path(data_dir):
+    """Default snapshot location for a data directory."""
+    return os.path.join(data_dir, SNAPSHOT_NAME)
+
+def source_stamps(paths):
+    """
+    Identify the current version of each source file.
+    
+    Args:
+        paths (list): Source file paths
+    
+    Returns:
+        dict: File name -> (mtime_ns, size), or None for a missing file
+    """
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps[os.path.basename(path)] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            stamps[os.path.basename(path)] = None
+    return stamps
+
+def write_snapshot(path, sources, tables, records):
+    """
+    Write a world snapshot.
+    
+    Args:
+        path (str): Snapshot file to create
+        sources (dict): Source stamps from source_stamps()
+        tables (dict): Marshallable world tables stored in the metadata
+        records (dict): Room ID -> marshallable room record
+    """
+    encoded = []
+    index = {}
+    offset = 0
+    for room_id, record in records.items():
+        data = marshal.dumps(record)
+        index[room_id] = (offset << 32) | len(data)
+        encoded.append(data)
+        offset += len(data)
+    
+    meta = dict(tables, sources=sources, records=index)
+    meta = marshal.dumps(meta)
+    
+    # Write to a temporary file first so readers never see a partial snapshot.
+    # Its name is unique, so processes building the same snapshot don't collide.
+    directory, name = os.path.split(path)
+    f = tempfile.NamedTemporaryFile('wb', dir=directory or '.', prefix=f"{name}.", suffix='.tmp', delete=False)
+    try:
+        with f:
+            f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, len(meta)))
+            f.write(meta)
+            f.writelines(encoded)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
+
+class SnapshotReader:
+    """Decodes a snapshot held in memory (or in any buffer such as an mmap)."""
+    
+    def __init__(self, buffer):
+        """
+        Initialize the reader and decode the snapshot metadata.
+        
+        Args:
+            buffer (bytes or mmap): The complete snapshot contents
+        """
+        if len(buffer) < HEADER.size:
+            raise SnapshotError("Snapshot is truncated")
+        
+        magic, version, _, meta_size = HEADER.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("Not a world snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"Snapshot version {version} is not supported (expected {SNAPSHOT_VERSION})")
+        
+        self.buffer = memoryview(buffer)
+        self.records_start = HEADER.size + meta_size
+        try:
+            self.meta = marshal.loads(self.buffer[HEADER.size:self.records_start])
+            self.sources = self.meta['sources']
+            self.room_index = self.meta['records']
+        except (EOFError, ValueError, TypeError, KeyError) as e:
+            raise SnapshotError(f"Snapshot metadata is corrupt: {e}")
+    
+    @classmethod
+    def open(cls, path):
+        """Read a snapshot file in a single read."""
+        try:
+            with open(path, 'rb') as f:
+                return cls(f.read())
+        except FileNotFoundError:
+            raise SnapshotError(f"No snapshot at {path}")
+    
+    @classmethod
+    def map(cls, path):
+        """
+        Memory-map a snapshot file instead of reading it.
+        
+        Room records stay in the OS page cache, shared by every process
+        mapping the same file, and are only paged in when decoded.
+        """
+        try:
+            with open(path, 'rb') as f:
+                return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        except FileNotFoundError:
+            raise SnapshotError(f"No snapshot at {path}")
+        except ValueError as e:
+            raise SnapshotError(f"Snapshot cannot be mapped: {e}")
+    
+    def room(self, room_id):
+        """Decode the record for one room."""
+        entry = self.room_index[room_id]
+        start = self.records_start + (entry >> 32)
+        size = entry & RECORD_SIZE_MASK
+        try:
+            return marshal.loads(self.buffer[start:start + size])
+        except (EOFError, ValueError, TypeError) as e:
+            raise SnapshotError(f"Room record {room_id!r} is corrupt: {e}")
+    
+    def rooms(self):
+        """Decode every room record, in the order they were written."""
+        return {room_id: self.room(room_id) for room_id in self.room_index}
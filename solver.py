@@ -0,0 +1,259 @@
+"""
+Walkthrough solver for ZorkMUD: Sentinel Realm
+Proves a world can be won, finds its shortest solution and reports what can never be reached.
+
+The solver plays the real engine rather than a model of its rules, so dark
+rooms, locked containers and scoring behave exactly as they do for players.
+It runs a breadth-first search over game states: from each state it tries
+every useful command (moves along exits, taking visible items, opening
+closed containers, using carried items and reading scored items), restoring
+the state before each one with GameEngine.restore_state.
+
+States are identified by a compact tuple of the current room, the carried
+items, the opened containers and whether the lamp is lit. A transposition
+table keyed by that tuple makes sure every state is expanded only once, and
+BFS order makes the first winning command sequence found a shortest one.
+Large worlds can expand each BFS level across a process pool.
+"""
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import GameEngine
+from output import OutputSink
+from render import MACHINE_PROFILE
+from save_store import MemorySaveStore
+from world import PLAYER, room_location, container_location
+
+# States explored before the search gives up
+MAX_STATES = 200000
+
+def state_key(engine):
+    """
+    Get the compact key identifying an engine's game state.
+    
+    Returns:
+        tuple: (room ID, frozenset of carried item IDs, frozenset of opened container IDs, lamp on)
+    """
+    state = engine.state
+    return (engine.player.current_room, frozenset(state.contents_of(PLAYER)),
+            frozenset(state.opened), engine.lamp_on)
+
+def _visible_items(engine):
+    """IDs of the items in the current room and in its open containers, however deeply nested."""
+    state = engine.state
+    here = room_location(engine.player.current_room)
+    visible = list(state.contents_of(here))
+    containers = list(state.open_containers.get(here, ()))
+    for container_id in containers:
+        inside = container_location(container_id)
+        visible.extend(state.contents_of(inside))
+        containers.extend(state.open_containers.get(inside, ()))
+    return visible
+
+def candidate_commands(engine):
+    """
+    List the commands worth trying in the engine's current state.
+    
+    Dropping items is never tried: nothing in the engine requires an item
+    to be put down, so it can't make a win reachable.
+    
+    Returns:
+        list: Command strings, without duplicates
+    """
+    world = engine.world
+    state = engine.state
+    visible = _visible_items(engine)
+    carried = list(state.contents_of(PLAYER))
+    
+    commands = list(world.rooms[engine.player.current_room].exits)
+    for item_id in visible:
+        if world.items[item_id].takeable:
+            commands.append(f"take {world.items[item_id].name}")
+    for item_id in visible + carried:
+        if world.items[item_id].openable and not state.is_open(item_id):
+            commands.append(f"open {world.items[item_id].name}")
+    for item_id in carried:
+        if world.items[item_id].useable:
+            commands.append(f"use {world.items[item_id].name}")
+    for item_id in visible + carried:
+        if ('read', item_id) in world.scoring:
+            commands.append(f"read {world.items[item_id].name}")
+    return list(dict.fromkeys(commands))
+
+def expand(engine, save_data):
+    """
+    Try every candidate command from a state.
+    
+    Args:
+        engine (GameEngine): Engine to play on (its game is replaced)
+        save_data (dict): The state, as captured by GameEngine.capture_state()
+    
+    Returns:
+        tuple: (IDs of the items seen in the state, list of
+        (command, child key, child won, child save data))
+    """
+    engine.restore_state(save_data)
+    seen = _visible_items(engine) + list(engine.state.contents_of(PLAYER))
+    successors = []
+    for command in candidate_commands(engine):
+        engine.restore_state(save_data)
+        engine.process_command(command)
+        successors.append((command, state_key(engine), engine.game_won, engine.capture_state()))
+    return seen, successors
+
+def _new_engine(data_dir):
+    """Create a quiet engine for searching a world."""
+    engine = GameEngine(MemorySaveStore(), OutputSink(), data_dir)
+    engine.set_profile(MACHINE_PROFILE)  # cheapest output to render
+    return engine
+
+# Each pool worker's engine, created by _init_worker
+_worker_engine = None
+
+def _init_worker(data_dir):
+    """Load the world once in a pool worker."""
+    global _worker_engine
+    _worker_engine = _new_engine(data_dir)
+    _worker_engine.new_game()
+
+def _expand_in_worker(save_data):
+    """Expand a state in a pool worker."""
+    return expand(_worker_engine, save_data)
+
+def exit_graph_rooms(world, start):
+    """Rooms connected to a start room through exits, ignoring anything that blocks the way."""
+    reached = {start}
+    pending = [start]
+    while pending:
+        for room_id in world.rooms[pending.pop()].exits.values():
+            if room_id not in reached and room_id in world.rooms:
+                reached.add(room_id)
+                pending.append(room_id)
+    return reached
+
+def solve(data_dir='data', jobs=1, max_states=MAX_STATES, stop_at_goal=False):
+    """
+    Search a world's game states for the shortest win and for what is unreachable.
+    
+    Args:
+        data_dir (str): Directory holding the world's data files
+        jobs (int): Worker processes expanding each BFS level (1 searches in this process)
+        max_states (int): Give up after this many distinct states
+        stop_at_goal (bool): Stop at the first win instead of exploring every state
+    
+    Returns:
+        dict: 'solved', 'solution' (shortest command list, or None), 'states'
+        (distinct states found), 'exhausted' (every state was explored),
+        'unreachable_rooms' (never entered), 'disconnected_rooms' (not even
+        linked by exits), 'unseen_items' (never visible or carried) and
+        'unscored_rules' (scoring rules never earned)
+    """
+    engine = _new_engine(data_dir)
+    if not engine.new_game():
+        raise RuntimeError(f"Could not load the world in {data_dir}")
+    world = engine.world
+    
+    start_key = state_key(engine)
+    parents = {start_key: None}  # transposition table: key -> (parent key, command)
+    frontier = [(start_key, engine.capture_state())]
+    seen_items = set()
+    scored = set()
+    goal = None
+    
+    pool = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(data_dir,)) if jobs > 1 else None
+    try:
+        while frontier and len(parents) < max_states and not (goal and stop_at_goal):
+            if pool:
+                chunksize = max(1, len(frontier) // (jobs * 4))
+                expanded = pool.map(_expand_in_worker, [save for _, save in frontier], chunksize=chunksize)
+            else:
+                expanded = (expand(engine, save) for _, save in frontier)
+            
+            next_frontier = []
+            for (key, _), (seen, successors) in zip(frontier, expanded):
+                seen_items.update(seen)
+                for command, child_key, won, child_save in successors:
+                    scored.update(child_save['scored_actions'])  # reading scores without changing the key
+                    if child_key in parents:
+                        continue
+                    parents[child_key] = (key, command)
+                    seen_items.update(child_key[1])
+                    if won:
+                        goal = goal or child_key  # wins end the game, so they aren't expanded
+                    else:
+                        next_frontier.append((child_key, child_save))
+            frontier = next_frontier
+    finally:
+        if pool:
+            pool.shutdown()
+    
+    solution = None
+    if goal:
+        solution = []
+        key = goal
+        while parents[key] is not None:
+            key, command = parents[key]
+            solution.append(command)
+        solution.reverse()
+    
+    start = start_key[0]
+    entered = {key[0] for key in parents}
+    return {
+        'solved': goal is not None,
+        'solution': solution,
+        'states': len(parents),
+        'exhausted': not frontier,
+        'unreachable_rooms': sorted(set(world.rooms) - entered),
+        'disconnected_rooms': sorted(set(world.rooms) - exit_graph_rooms(world, start)),
+        'unseen_items': sorted(set(world.items) - seen_items),
+        'unscored_rules': sorted({rule['key'] for rule in world.scoring.values()} - scored),
+    }
+
+def run_cli(args):
+    """
+    Command line entry point: python main.py solve [options]
+    
+    Args:
+        args (list): Arguments after 'solve'
+    
+    Returns:
+        int: Exit status (1 if the world can't be won)
+    """
+    parser = argparse.ArgumentParser(
+        prog='python main.py solve',
+        description="Find the shortest winning command sequence and report unreachable rooms and items."
+    )
+    parser.add_argument('--data', default='data', help="world data directory")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes expanding each search level")
+    parser.add_argument('--max-states', type=int, default=MAX_STATES, help="give up after this many states")
+    parser.add_argument('--first', action='store_true', help="stop at the first win instead of exploring everything")
+    parser.add_argument('--json', action='store_true', help="print the result as JSON")
+    parser.add_argument('--script', help="also write the solution as a run-script command file")
+    options = parser.parse_args(args)
+    
+    result = solve(options.data, options.jobs, options.max_states, options.first)
+    if options.script and result['solution']:
+        with open(options.script, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(result['solution']) + '\n')
+    
+    if options.json:
+        print(json.dumps(result))
+        return 0 if result['solved'] else 1
+    
+    search = "all states" if result['exhausted'] else "stopped early; raise --max-states to search further"
+    print(f"Explored {result['states']} states ({search}).")
+    if result['solved']:
+        print(f"Shortest solution ({len(result['solution'])} commands):")
+        for command in result['solution']:
+            print(f"  {command}")
+    else:
+        print("No winning sequence found.")
+    for label, name in (("Rooms never entered", 'unreachable_rooms'),
+                        ("Rooms not linked by exits", 'disconnected_rooms'),
+                        ("Items never seen", 'unseen_items'),
+                        ("Scoring rules never earned", 'unscored_rules')):
+        if result[name]:
+            print(f"{label}: {', '.join(result[name])}")
+    return 0 if result['solved'] else 1
@@ -0,0 +1,137 @@
+"""
+Tests for the autosaver: sweeps on the world clock and saves written off the command path.
+"""
+
+import threading
+
+import pytest
+
+from autosave import Autosaver, AUTOSAVE_SLOT
+from save_store import MemorySaveStore, SaveError
+from scheduler import TickScheduler
+
+class GatedStore(MemorySaveStore):
+    """Memory store whose writes wait until the test opens the gate."""
+    
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.writing = threading.Event()
+    
+    def save_many(self, entries):
+        self.writing.set()
+        self.gate.wait(10)
+        super().save_many(entries)
+
+class BrokenStore(MemorySaveStore):
+    """Memory store that fails every write."""
+    
+    def save_many(self, entries):
+        raise OSError("disk full")
+
+@pytest.fixture
+def clock():
+    """A world clock of one-second ticks, advanced by hand."""
+    return TickScheduler(tick_seconds=1.0)
+
+def test_sweep_saves_an_idle_players_change(clock, new_engine):
+    """A change followed by silence is saved by the next sweep, not the next command."""
+    store = MemorySaveStore()
+    autosaver = Autosaver(store, interval=5.0)
+    autosaver.start(clock)
+    engine = new_engine(name="Dana")
+    autosaver.attach(engine)
+    engine.process_command("open mailbox")
+    
+    clock.wheel.advance(4)
+    assert autosaver.captured == 0
+    clock.wheel.advance(1)
+    assert autosaver.captured == 1
+    autosaver.close()
+    assert store.load("Dana", AUTOSAVE_SLOT) == engine.capture_state()
+
+def test_sweep_skips_unchanged_games(clock, new_engine):
+    """Games with no changing command since their last capture aren't saved again."""
+    autosaver = Autosaver(MemorySaveStore(), interval=5.0)
+    autosaver.start(clock)
+    engine = new_engine(name="Dana")
+    autosaver.attach(engine)
+    engine.process_command("look")
+    engine.process_command("inventory")
+    
+    clock.wheel.advance(20)
+    assert autosaver.captured == 0
+    engine.process_command("open mailbox")
+    clock.wheel.advance(5)
+    clock.wheel.advance(20)
+    assert autosaver.captured == 1
+    autosaver.close()
+    assert len(clock.wheel) == 0
+
+def test_capture_after_every_moves(new_engine):
+    """A busy game is captured every every_moves changing commands."""
+    autosaver = Autosaver(MemorySaveStore(), every_moves=2)
+    engine = new_engine(name="Dana")
+    autosaver.attach(engine)
+    for command in ("open mailbox", "take leaflet", "south"):
+        engine.process_command(command)
+    assert autosaver.captured == 1
+    autosaver.close()
+
+def test_save_does_not_wait_for_the_store(new_engine):
+    """An explicit save is queued for the worker, and loads see it before it is written."""
+    store = GatedStore()
+    autosaver = Autosaver(store)
+    engine = new_engine(autosaver, name="Dana")
+    engine.process_command("open mailbox")
+    
+    assert engine.save_game("slot1")
+    assert store.writing.wait(10)
+    with pytest.raises(SaveError):
+        store.load("Dana", "slot1")
+    assert autosaver.load("Dana", "slot1") == engine.capture_state()
+    
+    store.gate.set()
+    autosaver.close()
+    assert store.load("Dana", "slot1") == engine.capture_state()
+
+def test_save_future_tells_when_stored():
+    """The future from save() resolves once the write is done, or with the write's error."""
+    store = GatedStore()
+    autosaver = Autosaver(store)
+    future = autosaver.save("Dana", "slot1", {'player': {}})
+    assert store.writing.wait(10)
+    assert not future.done()
+    store.gate.set()
+    assert future.result(10) is None
+    autosaver.close()
+    
+    autosaver = Autosaver(BrokenStore())
+    future = autosaver.save("Dana", "slot1", {'player': {}})
+    with pytest.raises(OSError):
+        future.result(10)
+    autosaver.close()
+
+def test_finished_game_is_dropped(new_engine):
+    """Leaving a won game deletes its autosave, and loads see the deletion at once."""
+    store = MemorySaveStore()
+    store.save("Dana", AUTOSAVE_SLOT, {})
+    autosaver = Autosaver(store)
+    engine = new_engine(name="Dana")
+    autosaver.attach(engine)
+    engine.game_won = True
+    autosaver.detach(engine)
+    with pytest.raises(SaveError):
+        autosaver.load("Dana", AUTOSAVE_SLOT)
+    autosaver.close()
+    with pytest.raises(SaveError):
+        store.load("Dana", AUTOSAVE_SLOT)
+
+def test_write_errors_are_logged(caplog, new_engine):
+    """A failed write is logged by the worker, which keeps running."""
+    autosaver = Autosaver(BrokenStore())
+    engine = new_engine(name="Dana")
+    autosaver.capture(engine)
+    autosaver.close()
+    assert "Error autosaving 1 game(s)" in caplog.text
+    assert "disk full" in caplog.text
@@ -0,0 +1,56 @@
+"""
+Tests for the game's timed events on a world clock, and what a dead player can still do.
+"""
+
+from output import CaptureSink
+from scheduler import TickScheduler
+
+# From the start to the dark hallway with the lamp lit
+INTO_THE_DARK = ["east", "north", "east", "take lamp", "use lamp", "west", "east", "east"]
+
+def killed_by_a_grue(new_engine):
+    """Walk into the dark hallway with the lamp lit and wait on the clock until a grue kills the player."""
+    engine = new_engine(output=CaptureSink())
+    engine.attach_scheduler(TickScheduler())
+    for command in INTO_THE_DARK:
+        engine.process_command(command)
+    assert engine.player.current_room == 'hallway'
+    engine.output.take()
+    
+    clock = engine.scheduler.wheel
+    for _ in range(engine.LAMP_FUEL + 10 * engine.GRUE_DELAY):
+        clock.tick()
+        if not engine.player.is_alive():
+            break
+    assert not engine.player.is_alive()
+    assert "Game over" in engine.output.take()
+    return engine
+
+def test_grue_kills_player_in_the_dark(new_engine):
+    """Once the lamp burns out, grues attack until the player is dead, then stop."""
+    engine = killed_by_a_grue(new_engine)
+    assert not engine.timers.get('grue') and not engine.timers.get('heal')
+
+def test_dead_player_commands_are_refused(new_engine):
+    """After death, commands that would play on only repeat the death message."""
+    engine = killed_by_a_grue(new_engine)
+    state = engine.capture_state()
+    for command in ("use lamp", "west", "open chest", "look", "take golden treasure", "xyzzy"):
+        engine.process_command(command)
+        assert "Game over" in engine.output.take()
+    assert engine.capture_state() == state
+    assert not engine.game_won
+
+def test_dead_player_can_load_or_quit(new_engine):
+    """A dead player can load a saved game, which brings them back to life, or quit."""
+    engine = killed_by_a_grue(new_engine)
+    engine.save_store.save(engine.player.name, 'default', new_engine().capture_state())
+    engine.process_command("load")
+    assert engine.player.is_alive()
+    assert engine.player.current_room == 'field'
+    engine.process_command("east")
+    assert engine.player.current_room != 'field'
+    
+    engine = killed_by_a_grue(new_engine)
+    engine.process_command("quit")
+    assert not engine.running
@@ -0,0 +1,84 @@
+"""
+Tests for crash recovery from the command journal.
+"""
+
+import pytest
+
+from game_engine import GameEngine
+from journal import Journal, JournalFlusher
+from output import OutputSink
+from save_store import MemorySaveStore
+
+COMMANDS = [
+    "open mailbox", "take leaflet", "south", "take brass key", "north",
+    "east", "north", "east", "take lamp", "use lamp", "east",
+]
+
+@pytest.fixture
+def flusher():
+    """A flusher that never flushes on its own, so the tests decide what reaches the disk."""
+    return JournalFlusher(interval=3600)
+
+def crash(journal):
+    """Abandon a journal without closing it, as a crashed process would."""
+    journal.flusher.remove(journal)
+    journal.file.close()
+
+def recovered_state(tmp_path, flusher):
+    """Recover the session into a new engine, as the next run of the game would."""
+    engine = GameEngine(MemorySaveStore(), OutputSink())
+    journal = Journal(str(tmp_path), 'game', flusher=flusher)
+    assert journal.recover(engine)
+    journal.close()
+    return engine.capture_state()
+
+def test_recover_without_checkpoint_drops_torn_line(tmp_path, flusher, new_engine):
+    """Commands journaled without a checkpoint are replayed, except a line torn mid-write."""
+    engine = new_engine()
+    journal = Journal(str(tmp_path), 'game', checkpoint_every=1000, flusher=flusher)
+    engine.recorders.append(journal)
+    for command in COMMANDS[:-1]:
+        engine.process_command(command)
+    expected = engine.capture_state()
+    
+    engine.process_command(COMMANDS[-1])
+    journal.flush()
+    crash(journal)
+    
+    # The crash hit while the last line was being written
+    with open(journal.path, 'r+b') as f:
+        data = f.read()
+        f.truncate(len(data) - 4)
+    assert not (tmp_path / 'game.checkpoint').exists()
+    
+    assert recovered_state(tmp_path, flusher) == expected
+
+def test_recover_checkpoint_and_journal_tail(tmp_path, flusher, new_engine):
+    """A checkpoint is restored and only the commands after it are replayed."""
+    engine = new_engine()
+    journal = Journal(str(tmp_path), 'game', checkpoint_every=4, flusher=flusher)
+    engine.recorders.append(journal)
+    for command in COMMANDS:
+        engine.process_command(command)
+    journal.flush()
+    crash(journal)
+    
+    assert (tmp_path / 'game.checkpoint').exists()
+    assert recovered_state(tmp_path, flusher) == engine.capture_state()
+
+def test_recover_new_game_when_nothing_journaled(tmp_path, flusher, new_engine):
+    """With nothing to recover the engine is left with a new game."""
+    engine = GameEngine(MemorySaveStore(), OutputSink())
+    journal = Journal(str(tmp_path), 'game', flusher=flusher)
+    assert not journal.recover(engine)
+    journal.close(discard=True)
+    assert engine.capture_state() == new_engine().capture_state()
+
+def test_unreadable_checkpoint_is_logged(tmp_path, flusher, caplog):
+    """A damaged checkpoint is reported through logging, not printed."""
+    (tmp_path / 'game.checkpoint').write_bytes(b'not a save')
+    engine = GameEngine(MemorySaveStore(), OutputSink())
+    journal = Journal(str(tmp_path), 'game', flusher=flusher)
+    journal.recover(engine)
+    journal.close()
+    assert "Error reading checkpoint" in caplog.text
@@ -0,0 +1,115 @@
+"""
+Tests for the command parser's first-word verb table.
+"""
+
+import re
+
+import pytest
+
+from parser import Parser
+
+# Input -> the (command, arguments) parse() must return for it
+EXPECTED_PARSES = [
+    # Movement and its abbreviations
+    ("n", ('move', 'north')),
+    ("go north", ('move', 'north')),
+    ("GO  South ", ('move', 'south')),
+    ("e", ('move', 'east')),
+    ("go w", ('move', 'west')),
+    ("u", ('move', 'up')),
+    ("down", ('move', 'down')),
+    
+    # Synonyms of one command, including multi-word verbs
+    ("look", ('look', 'look')),
+    ("l", ('look', 'l')),
+    ("look around", ('look', None)),
+    ("examine room", ('look', None)),
+    ("x lamp", ('examine', 'lamp')),
+    ("look at leaflet", ('examine', 'leaflet')),
+    ("inspect mailbox", ('examine', 'mailbox')),
+    ("i", ('inventory', 'i')),
+    ("inv", ('inventory', None)),
+    ("get lamp", ('take', 'lamp')),
+    ("pick up brass key", ('take', 'brass key')),
+    ("put down lamp", ('drop', 'lamp')),
+    ("?", ('help', None)),
+    ("commands", ('help', None)),
+    ("q", ('quit', 'q')),
+    ("bye", ('quit', None)),
+    ("save game", ('save', None)),
+    ("restore", ('load', None)),
+    ("hp", ('health', None)),
+    ("stat", ('status', None)),
+    
+    # Articles are kept in the arguments; normalize_object_name drops them
+    ("take the lamp", ('take', 'the lamp')),
+    ("examine a brass key", ('examine', 'a brass key')),
+    ("put down an apple", ('drop', 'an apple')),
+    ("open the treasure chest", ('open', 'the treasure chest')),
+    
+    # Travel and terminal
+    ("travel kitchen", ('travel', 'kitchen')),
+    ("goto white house", ('travel', 'white house')),
+    ("go to the kitchen", ('travel', 'the kitchen')),
+    ("terminal", ('terminal', None)),
+    ("terminal mono", ('terminal', 'mono')),
+    
+    # Unknown input
+    ("", (None, None)),
+    ("dance", ('unknown', 'dance')),
+    ("go", ('unknown', 'go')),
+    ("north east", ('unknown', 'north east')),
+    ("take", ('unknown', 'take')),
+    ("Sing Loudly", ('unknown', 'sing loudly')),
+]
+
+@pytest.fixture(scope='module')
+def parser():
+    """A parser shared by the tests of this module."""
+    return Parser()
+
+def linear_parse(parser, input_text):
+    """Parse the way the parser did before the verb table: every pattern in order."""
+    if not input_text:
+        return None, None
+    input_text = input_text.strip().lower()
+    
+    for pattern in parser.commands['movement']['patterns']:
+        match = re.match(pattern, input_text)
+        if match:
+            return 'move', parser.commands['movement']['directions'].get(match.group(2))
+    
+    for command, patterns in parser.commands.items():
+        if command == 'movement':
+            continue
+        for pattern in patterns:
+            match = re.match(pattern, input_text)
+            if match:
+                return command, match.groups()[-1] if match.groups() else None
+    return 'unknown', input_text
+
+@pytest.mark.parametrize('input_text, expected', EXPECTED_PARSES)
+def test_parse(parser, input_text, expected):
+    """Every input parses to its expected command and arguments."""
+    assert parser.parse(input_text) == expected
+
+@pytest.mark.parametrize('input_text', [text for text, _ in EXPECTED_PARSES])
+def test_verb_table_matches_linear_parse(parser, input_text):
+    """The verb table picks the same pattern as trying every pattern in order."""
+    assert parser.parse(input_text) == linear_parse(parser, input_text)
+
+def test_every_pattern_has_a_first_word(parser):
+    """All the shipped patterns are filed under their first words, none tried for every input."""
+    assert parser.fallback_patterns is None
+    for word in ('go', 'pick', 'put', 'look', 'travel', 'goto', 'terminal', '?'):
+        assert word in parser.verb_table
+
+@pytest.mark.parametrize('name, expected', [
+    ("The Brass Key", "brass key"),
+    ("an apple", "apple"),
+    ("a lamp", "lamp"),
+    ("", ""),
+])
+def test_normalize_object_name(parser, name, expected):
+    """Object names lose their case and articles."""
+    assert parser.normalize_object_name(name) == expected
@@ -0,0 +1,70 @@
+"""
+Tests for the column store of players' numeric fields.
+"""
+
+import pytest
+
+from player import Player
+from player_stats import PlayerStats, FIELDS, MAX_HEALTH, numpy
+
+@pytest.fixture(params=['array', pytest.param('numpy', marks=pytest.mark.skipif(numpy is None, reason="needs NumPy"))])
+def stats(request):
+    """An empty store on each backend."""
+    return PlayerStats(capacity=2, backend=request.param)
+
+def column(stats, name):
+    return [int(value) for value in stats.columns[name]]
+
+def test_new_rows_get_the_defaults(stats):
+    row = stats.allocate()
+    assert {name: stats.get(name, row) for name in FIELDS} == FIELDS
+    assert len(stats) == 1
+
+def test_rows_are_reused_lowest_first(stats):
+    rows = [stats.allocate() for _ in range(2)]
+    assert rows == [0, 1]
+    stats.set('score', 0, 50)
+    stats.release(0)
+    stats.release(0)  # releasing twice does nothing
+    assert len(stats) == 1
+    assert stats.allocate() == 0
+    assert stats.get('score', 0) == 0  # reset for the new player
+
+def test_store_grows_and_keeps_values(stats):
+    rows = [stats.allocate() for _ in range(5)]
+    for row in rows:
+        stats.set('moves', row, row * 10)
+    assert stats.capacity >= 5
+    assert [stats.get('moves', row) for row in rows] == [0, 10, 20, 30, 40]
+
+def test_add_clamps(stats):
+    rows = [stats.allocate() for _ in range(3)]
+    for row, health in zip(rows, (95, 50, 3)):
+        stats.set('health', row, health)
+    stats.add('health', 10, high=MAX_HEALTH)
+    assert [stats.get('health', row) for row in rows] == [100, 60, 13]
+    stats.add('health', -20, low=0)
+    assert [stats.get('health', row) for row in rows] == [80, 40, 0]
+    stats.add('score', 7)
+    assert [stats.get('score', row) for row in rows] == [7, 7, 7]
+
+def test_add_leaves_free_rows_alone(stats):
+    rows = [stats.allocate() for _ in range(4)]
+    stats.set('health', rows[1], 30)
+    stats.release(rows[1])
+    stats.add('health', -50, low=0)
+    assert column(stats, 'health')[:4] == [50, 30, 50, 50]
+    assert all(value == MAX_HEALTH for value in column(stats, 'health')[4:])
+
+def test_players_are_views_of_their_row(stats):
+    ann = Player("Ann", stats=stats)
+    bob = Player("Bob", stats=stats)
+    ann.take_damage(40)
+    stats.add('health', 5, high=MAX_HEALTH)
+    assert (ann.health, bob.health) == (65, 100)
+    bob.release()
+    assert len(stats) == 1
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        PlayerStats(backend='pandas')
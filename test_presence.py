@@ -0,0 +1,100 @@
+"""
+Tests for room presence: who sees other players arrive, leave and act.
+"""
+
+import pytest
+
+from game_engine import GameEngine
+from output import CaptureSink
+from presence import Presence
+from render import MACHINE_PROFILE
+from save_store import MemorySaveStore
+
+@pytest.fixture
+def presence():
+    return Presence()
+
+def join(presence, name, moves=()):
+    """Start a player's game, walk it somewhere, then add it to the presence index."""
+    engine = GameEngine(MemorySaveStore(), CaptureSink())
+    engine.new_game(name)
+    engine.set_profile(MACHINE_PROFILE)
+    for command in moves:
+        engine.process_command(command)
+    engine.presence = presence
+    presence.enter(engine)
+    presence.deliver()
+    return engine
+
+def play(presence, engine, command):
+    """Run a command the way the server does: the command, then everyone's messages."""
+    engine.process_command(command)
+    presence.deliver()
+
+def heard(*engines):
+    """Take what each player has been sent since last asked."""
+    return [engine.output.take() for engine in engines]
+
+def test_arrivals_are_seen_in_the_same_room(presence):
+    ann = join(presence, "Ann")
+    heard(ann)
+    bob = join(presence, "Bob")
+    ann_heard, bob_heard = heard(ann, bob)
+    assert "Bob arrives." in ann_heard
+    assert "arrives" not in bob_heard
+    assert presence.occupants('field') == [ann, bob]
+
+def test_moving_is_seen_in_both_rooms(presence):
+    ann = join(presence, "Ann")
+    bob = join(presence, "Bob")
+    cat = join(presence, "Cat", ["east"])
+    heard(ann, bob, cat)
+    
+    play(presence, bob, "east")
+    ann_heard, bob_heard, cat_heard = heard(ann, bob, cat)
+    assert "Bob leaves." in ann_heard and "Bob arrives." not in ann_heard
+    assert "Bob arrives." in cat_heard and "Bob leaves." not in cat_heard
+    assert "leaves" not in bob_heard and "arrives" not in bob_heard
+    assert presence.occupants('field') == [ann]
+    assert presence.occupants('house') == [cat, bob]
+
+def test_other_rooms_hear_nothing(presence):
+    ann = join(presence, "Ann")
+    dan = join(presence, "Dan", ["south"])
+    heard(ann, dan)
+    
+    bob = join(presence, "Bob")
+    play(presence, bob, "open mailbox")
+    play(presence, bob, "take leaflet")
+    play(presence, bob, "north")
+    ann_heard, dan_heard = heard(ann, dan)
+    assert "Bob arrives." in ann_heard
+    assert "Bob takes the leaflet." in ann_heard
+    assert "Bob leaves." in ann_heard
+    assert dan_heard == ""
+
+def test_leaving_the_game_is_announced(presence):
+    ann = join(presence, "Ann")
+    bob = join(presence, "Bob")
+    heard(ann, bob)
+    
+    presence.leave(bob)
+    presence.deliver()
+    ann_heard, bob_heard = heard(ann, bob)
+    assert "Bob leaves." in ann_heard
+    assert bob_heard == ""
+    assert presence.occupants('field') == [ann]
+    presence.leave(bob)  # leaving twice does nothing
+    assert presence.deliver() == 0
+
+def test_each_listener_gets_one_write(presence):
+    """Several events from one command reach each listener in a single write."""
+    ann = join(presence, "Ann")
+    bob = join(presence, "Bob")
+    heard(ann, bob)
+    
+    presence.broadcast('field', "Thunder rumbles.")
+    presence.broadcast('field', "Rain starts to fall.", exclude=bob)
+    assert presence.deliver() == 2
+    assert ann.output.captured == ["Thunder rumbles.\nRain starts to fall.\n"]
+    assert bob.output.captured == ["Thunder rumbles.\n"]
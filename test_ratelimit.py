@@ -0,0 +1,184 @@
+"""
+Tests for the per-session token buckets and the round-robin command dispatcher.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import ratelimit
+from ratelimit import CommandQueue, TokenBucket
+
+class FakeClock:
+    """Stands in for time.monotonic(), moving only when a test says so."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the rate limiter's clock (only its own: the event loop keeps real time)."""
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+def test_bucket_allows_a_burst(clock):
+    """A new bucket lets a whole burst through at once, then makes the next one wait."""
+    bucket = TokenBucket(rate=2.0, burst=3)
+    assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.take() == pytest.approx(0.5)
+
+def test_bucket_refills_at_its_rate(clock):
+    """Tokens come back at the rate, and the wait shrinks as the next one refills."""
+    bucket = TokenBucket(rate=4.0, burst=2)
+    bucket.take()
+    bucket.take()
+    clock.now += 0.125
+    assert bucket.take() == pytest.approx(0.125)
+    clock.now += 0.125
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(0.25)
+
+def test_bucket_never_holds_more_than_a_burst(clock):
+    """A long idle spell refills the bucket only up to the burst."""
+    bucket = TokenBucket(rate=10.0, burst=2)
+    clock.now += 3600
+    assert [bucket.take() for _ in range(2)] == [0, 0]
+    assert bucket.take() > 0
+
+def test_take_uses_the_given_time():
+    """take() can be driven entirely by the caller's clock."""
+    bucket = TokenBucket(rate=1.0, burst=1)
+    bucket.updated = 0.0
+    assert bucket.take(now=0.0) == 0
+    assert bucket.take(now=0.25) == pytest.approx(0.75)
+    assert bucket.take(now=1.25) == 0
+
+def run_dispatcher(commands, test):
+    """Run test(commands, ran) with the dispatcher started; ran lists (session, line) in run order."""
+    async def main():
+        ran = []
+        try:
+            return await asyncio.wait_for(test(commands, ran), 5)
+        finally:
+            await commands.stop()
+    return asyncio.run(main())
+
+async def settle():
+    """Let the dispatcher run until it has nothing left to do right now."""
+    for _ in range(50):
+        await asyncio.sleep(0)
+
+def test_sessions_take_turns():
+    """A session with many lines queued gets one command per turn like everyone else."""
+    async def test(commands, ran):
+        flooder = commands.open(lambda line: ran.append(('flooder', line)))
+        player = commands.open(lambda line: ran.append(('player', line)))
+        for n in range(5):
+            await commands.submit(flooder, f"f{n}")
+        for n in range(2):
+            await commands.submit(player, f"p{n}")
+        commands.start()
+        await settle()
+        return ran
+    
+    ran = run_dispatcher(CommandQueue(rate=None), test)
+    assert [line for _, line in ran] == ['f0', 'p0', 'f1', 'p1', 'f2', 'f3', 'f4']
+
+def test_rate_limit_delays_but_keeps_commands(clock):
+    """Commands past the burst wait for a token and then run, in order."""
+    async def test(commands, ran):
+        queue = commands.open(lambda line: ran.append(line))
+        commands.start()
+        for n in range(3):
+            await commands.submit(queue, f"c{n}")
+        await settle()
+        assert ran == ['c0', 'c1']
+        assert commands.delayed == 1
+        
+        clock.now += 0.02  # the token refills; the dispatcher retries after its wait
+        while len(ran) < 3:
+            await asyncio.sleep(0.005)
+        return ran
+    
+    commands = CommandQueue(rate=100.0, burst=2)
+    assert run_dispatcher(commands, test) == ['c0', 'c1', 'c2']
+    assert commands.processed == 3
+    assert commands.delayed == 1
+
+def test_full_queue_pushes_back():
+    """submit() waits while a session's queue is full, instead of dropping its input."""
+    async def test(commands, ran):
+        queue = commands.open(lambda line: ran.append(line))
+        for n in range(2):
+            assert await commands.submit(queue, f"c{n}")
+        blocked = asyncio.ensure_future(commands.submit(queue, "c2"))
+        await settle()
+        assert not blocked.done()
+        assert commands.throttled == 1
+        
+        commands.start()
+        assert await blocked
+        await settle()
+        return ran
+    
+    commands = CommandQueue(rate=None, queue_size=2)
+    assert run_dispatcher(commands, test) == ['c0', 'c1', 'c2']
+    assert commands.dropped == 0
+
+def test_full_queue_can_drop_instead():
+    """With drop_overflow, lines that find the queue full are dropped and counted."""
+    async def test(commands, ran):
+        queue = commands.open(lambda line: ran.append(line))
+        results = [await commands.submit(queue, f"c{n}") for n in range(4)]
+        commands.start()
+        await settle()
+        return results, ran
+    
+    commands = CommandQueue(rate=None, queue_size=2, drop_overflow=True)
+    results, ran = run_dispatcher(commands, test)
+    assert results == [True, True, False, False]
+    assert ran == ['c0', 'c1']
+    assert commands.dropped == 2
+    assert commands.throttled == 0
+
+def test_close_drops_queued_input():
+    """Closing a session drops whatever it still had queued, and later input."""
+    async def test(commands, ran):
+        queue = commands.open(lambda line: ran.append(line))
+        for n in range(3):
+            await commands.submit(queue, f"c{n}")
+        commands.close(queue)
+        assert not await commands.submit(queue, "late")
+        commands.start()
+        await settle()
+        return ran
+    
+    commands = CommandQueue(rate=None)
+    assert run_dispatcher(commands, test) == []
+    assert commands.dropped == 4
+
+def test_failing_session_does_not_stop_the_others():
+    """A command that raises closes its own session; the other sessions keep running."""
+    def broken(line):
+        raise RuntimeError("broken session")
+    
+    async def test(commands, ran):
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: None)
+        bad = commands.open(broken)
+        good = commands.open(lambda line: ran.append(line))
+        for n in range(2):
+            await commands.submit(bad, f"b{n}")
+            await commands.submit(good, f"g{n}")
+        commands.start()
+        await settle()
+        assert bad.closed
+        return ran
+    
+    commands = CommandQueue(rate=None)
+    assert run_dispatcher(commands, test) == ['g0', 'g1']
+    assert commands.dropped == 1
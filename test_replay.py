@@ -0,0 +1,46 @@
+"""
+Tests for recording sessions and checking them by replay.
+"""
+
+from game_engine import GameEngine
+from output import CaptureSink
+from replay import SessionRecorder, check_log, read_log
+from save_store import MemorySaveStore
+
+def record_session(path, store, commands):
+    """Record a game played against a save store."""
+    engine = GameEngine(store, CaptureSink())
+    engine.new_game("Dana")
+    recorder = SessionRecorder(str(path), engine)
+    engine.recorders.append(recorder)
+    for command in commands:
+        engine.process_command(command)
+    recorder.close()
+
+def test_load_of_an_earlier_save_replays(tmp_path):
+    """A load of a save made before recording started replays without mismatches."""
+    store = MemorySaveStore()
+    record_session(tmp_path / 'earlier.log', store, ["open mailbox", "take leaflet", "south", "save"])
+    
+    path = tmp_path / 'later.log.gz'
+    record_session(path, store, ["north", "load", "look", "north"])
+    _, entries = read_log(str(path))
+    assert entries[1][1]['load'] == "load"
+    assert "Game loaded successfully." in entries[1][2]
+    assert entries[1][1]['save'] == store.load("Dana", 'default')
+    
+    result = check_log(str(path))
+    assert result['compared'] == 4
+    assert result['mismatches'] == []
+
+def test_load_without_a_save_replays(tmp_path):
+    """A load that found no save replays as the same failure, even if the replay's store has one."""
+    path = tmp_path / 'session.log'
+    record_session(path, MemorySaveStore(), ["open mailbox", "load", "save", "load"])
+    _, entries = read_log(str(path))
+    assert entries[1][1]['save'] is None
+    assert "no saved game found" in entries[1][2]
+    assert entries[3][1]['save'] is not None
+    
+    result = check_log(str(path))
+    assert result['mismatches'] == []
@@ -0,0 +1,87 @@
+"""
+Tests for travel's room name lookup and the per-world route table.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from routes import RouteTable, normalize_room_name, route_table
+from world import World
+from worldgen import generate_world
+
+def room(name, short_description, **exits):
+    """A stand-in room with just what the route table reads."""
+    return SimpleNamespace(name=name, short_description=short_description, exits=exits)
+
+@pytest.fixture
+def routes():
+    """Route table over rooms whose names contain 'a', 'an' and 'the' inside words."""
+    world = SimpleNamespace(rooms={
+        'stand': room("Banana Stand", "a banana stand", east='theater'),
+        'theater': room("The Theater", "an old theater", west='stand', north='annex'),
+        'annex': room("Annex", "the annex", south='theater'),
+    })
+    return RouteTable(world)
+
+@pytest.mark.parametrize('query, room_id', [
+    ("Banana Stand", 'stand'),
+    ("banana   stand", 'stand'),
+    ("the banana stand", 'stand'),
+    ("a banana stand", 'stand'),
+    ("Theater", 'theater'),
+    ("the theater", 'theater'),
+    ("an old theater", 'theater'),
+    ("old theater", 'theater'),
+    ("annex", 'annex'),
+    ("the annex", 'annex'),
+    ("ANNEX", 'annex'),
+    ("stand", 'stand'),
+])
+def test_find_room(routes, query, room_id):
+    """Names match whatever the case, spacing or articles, without eating letters out of words."""
+    assert routes.find_room(query) == room_id
+
+def test_names_win_over_short_descriptions():
+    """In a generated world where descriptions read like other rooms' names, every name finds its own room."""
+    data, _ = generate_world(300, 60, seed=3)
+    world = World.from_data(**data)
+    routes = RouteTable(world)
+    names = {normalize_room_name(room['name']): room_id for room_id, room in data['rooms'].items()}
+    shadowed = [room_id for room_id, room in data['rooms'].items()
+                if names.get(normalize_room_name(room['short_description']), room_id) != room_id]
+    assert shadowed, "seed 3 no longer has a description that reads like another room's name"
+    for room_id, room in data['rooms'].items():
+        assert routes.find_room(room['name']) == room_id
+        assert routes.find_room(room_id) == room_id
+
+def test_ambiguous_description():
+    """A description shared by rooms with other names matches them all, and find_room picks neither."""
+    routes = RouteTable(SimpleNamespace(rooms={
+        'north_cellar': room("North Cellar", "a damp cellar"),
+        'south_cellar': room("South Cellar", "a damp cellar"),
+    }))
+    assert routes.find_rooms("damp cellar") == ('north_cellar', 'south_cellar')
+    assert routes.find_room("damp cellar") is None
+    assert routes.find_room("south cellar") == 'south_cellar'
+
+def test_find_unknown_room(routes):
+    assert routes.find_room("banan stand") is None
+    assert routes.find_room("the") is None
+
+def test_normalize_room_name():
+    assert normalize_room_name("  The  Banana Stand ") == "banana stand"
+    assert normalize_room_name("Treasure Area") == "treasure area"
+
+def test_travel_by_name_with_articles(new_engine):
+    """travel accepts 'to' and articles, and walks the whole way."""
+    engine = new_engine()
+    engine.process_command("travel to the white house")
+    assert engine.player.current_room == 'house'
+
+def test_route_table_is_kept_on_its_world(new_engine):
+    """A world keeps its own route table, so it is freed along with the world."""
+    engine = new_engine()
+    table = route_table(engine.world)
+    assert route_table(engine.world) is table
+    assert engine.world.route_table is table
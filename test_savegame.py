@@ -0,0 +1,148 @@
+"""
+Tests for the ZMSV save format and the save stores.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from game_engine import GameEngine
+from output import OutputSink
+from savegame import SaveError, SAVE_MAGIC, SAVE_VERSION, HEADER, encode_save, decode_save, write_save, read_save
+from save_store import FileSaveStore, MemorySaveStore, SQLiteSaveStore
+from world import PLAYER
+
+# Opening moves of the walkthrough: items moved, mailbox and chest opened, lamp lit, points scored
+OPENING_MOVES = [
+    "open mailbox", "take leaflet", "read leaflet", "south", "take brass key", "north",
+    "east", "north", "east", "take lamp", "use lamp", "east", "east", "open treasure chest",
+]
+
+# Largest encoded size expected of a mid-game save of the shipped world
+MID_GAME_SAVE_BYTES = 512
+
+def mid_game_engine(save_store=None):
+    """Start a game and play the opening moves."""
+    engine = GameEngine(save_store or MemorySaveStore(), OutputSink())
+    engine.new_game()
+    for command in OPENING_MOVES:
+        engine.process_command(command)
+    return engine
+
+@pytest.fixture(params=['file', 'sqlite', 'memory'])
+def store(request, tmp_path):
+    """Each kind of save store, empty."""
+    if request.param == 'file':
+        store = FileSaveStore(str(tmp_path / 'saves'))
+    elif request.param == 'sqlite':
+        store = SQLiteSaveStore(str(tmp_path / 'saves.db'))
+    else:
+        store = MemorySaveStore()
+    yield store
+    store.close()
+
+def test_mid_game_state_is_what_the_tests_expect():
+    """The opening moves reach the state the round trips are meant to cover."""
+    engine = mid_game_engine()
+    assert engine.player.current_room == 'living_room'
+    assert engine.lamp_on
+    assert engine.player.score > 0
+    assert engine.state.is_open('chest')
+    assert {'leaflet', 'key', 'lamp'} <= set(engine.state.contents_of(PLAYER))
+
+def test_encode_decode_round_trip():
+    """A captured state survives encoding unchanged."""
+    save_data = mid_game_engine().capture_state()
+    data = encode_save(save_data)
+    assert data.startswith(SAVE_MAGIC)
+    assert decode_save(data) == save_data
+
+def test_mid_game_save_size():
+    """A mid-game save of the shipped world stays around half a kilobyte."""
+    assert len(encode_save(mid_game_engine().capture_state())) <= MID_GAME_SAVE_BYTES
+
+def test_store_round_trip(store):
+    """A game saved to a store loads into a new engine as the same game."""
+    engine = mid_game_engine(store)
+    assert engine.save_game()
+    
+    restored = GameEngine(store, OutputSink())
+    restored.new_game()
+    assert restored.load_game(engine.player.name)
+    assert restored.capture_state() == engine.capture_state()
+    
+    # The restored game carries on: the chest is open, so the treasure can be taken
+    restored.process_command("take golden treasure")
+    assert restored.game_won
+
+def test_store_slots_list_and_delete(store):
+    """Slots are kept per player, listed and deleted one by one."""
+    save_data = mid_game_engine().capture_state()
+    store.save('Alice', 'default', save_data)
+    store.save_many([('Alice', 'autosave', save_data), ('Bob', 'default', save_data)])
+    
+    assert [(player, slot) for player, slot, _ in store.list()] == [
+        ('Alice', 'autosave'), ('Alice', 'default'), ('Bob', 'default')]
+    assert [slot for _, slot, _ in store.list('Bob')] == ['default']
+    assert store.load('Bob', 'default') == save_data
+    
+    assert store.delete('Alice', 'default')
+    assert not store.delete('Alice', 'default')
+    with pytest.raises(SaveError):
+        store.load('Alice', 'default')
+
+def test_missing_save_raises(store):
+    """Loading an empty slot raises SaveError."""
+    with pytest.raises(SaveError):
+        store.load('Nobody', 'default')
+
+def test_bad_magic_raises():
+    """Data that isn't a save is rejected."""
+    data = encode_save({'player': {}})
+    with pytest.raises(SaveError, match="Not a saved game"):
+        decode_save(b'PKL!' + data[4:])
+
+def test_unsupported_version_raises():
+    """A save from another format version is rejected."""
+    body = encode_save({'player': {}})[HEADER.size:]
+    with pytest.raises(SaveError, match="not supported"):
+        decode_save(HEADER.pack(SAVE_MAGIC, SAVE_VERSION + 1) + body)
+
+@pytest.mark.parametrize('data', [b'', b'ZMS', HEADER.pack(SAVE_MAGIC, SAVE_VERSION) + b'{"player":',
+                                  HEADER.pack(SAVE_MAGIC, SAVE_VERSION) + b'\xff\xfe'])
+def test_truncated_or_corrupt_save_raises(data):
+    """Truncated and corrupt saves raise SaveError, not a decoding error."""
+    with pytest.raises(SaveError):
+        decode_save(data)
+
+def test_bad_file_raises(tmp_path):
+    """A file store reading a damaged or missing file raises SaveError."""
+    path = str(tmp_path / 'game.sav')
+    with pytest.raises(SaveError):
+        read_save(path)
+    
+    write_save(path, {'player': {}})
+    with open(path, 'r+b') as f:
+        f.write(b'XXXX')
+    with pytest.raises(SaveError):
+        read_save(path)
+
+def test_failed_load_leaves_game_untouched(tmp_path):
+    """load_game with a bad save reports the error and keeps the current game."""
+    store = FileSaveStore(str(tmp_path))
+    engine = mid_game_engine(store)
+    before = engine.capture_state()
+    with open(store.path(engine.player.name, 'default'), 'wb') as f:
+        f.write(HEADER.pack(SAVE_MAGIC, SAVE_VERSION + 1) + b'{}')
+    
+    assert not engine.load_game()
+    assert engine.capture_state() == before
+
+def test_concurrent_writes_do_not_collide(tmp_path):
+    """Writers racing to replace one save each use their own temporary file."""
+    path = str(tmp_path / 'race.sav')
+    saves = [{'player': {'name': "Dana", 'moves': n}} for n in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda save_data: write_save(path, save_data), saves))
+    assert read_save(path) in saves
+    assert [entry.name for entry in tmp_path.iterdir()] == ['race.sav']
@@ -0,0 +1,115 @@
+"""
+Tests for the timing wheel, checked against a plain list of due ticks.
+"""
+
+import random
+
+import pytest
+
+from scheduler import TimingWheel, WHEEL_SLOTS
+
+# Two levels reach WHEEL_SLOTS ** 2 ticks, so the tests reach the overflow list quickly
+LEVELS = 2
+REACH = WHEEL_SLOTS ** LEVELS
+
+class Reference:
+    """Pending timers as a list of (due tick, name), checked against what the wheel fires."""
+    
+    def __init__(self):
+        self.timers = []
+    
+    def add(self, due, name):
+        self.timers.append((due, name))
+    
+    def remove(self, name):
+        self.timers = [(due, other) for due, other in self.timers if other != name]
+    
+    def pop_due(self, now):
+        """Remove and return the names due at a tick, checking none were missed."""
+        self.timers.sort()
+        assert not self.timers or self.timers[0][0] >= now, "a timer was never fired"
+        due = {name for tick, name in self.timers if tick == now}
+        self.timers = [(tick, name) for tick, name in self.timers if tick != now]
+        return due
+
+def random_delay(rng):
+    """A delay within level 0, across levels, or beyond the top level."""
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.randint(1, WHEEL_SLOTS)
+    if kind < 0.8:
+        return rng.randint(WHEEL_SLOTS, REACH)
+    return rng.randint(REACH, 3 * REACH)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_sorted_list(seed):
+    """Random schedules, cancels and re-arms fire exactly when a sorted list says they should."""
+    rng = random.Random(seed)
+    wheel = TimingWheel(levels=LEVELS)
+    reference = Reference()
+    timers = {}  # name -> Timer, for pending timers
+    fired = set()
+    
+    def fire(name):
+        fired.add(name)
+        del timers[name]
+        # Callbacks re-arm themselves and cancel others, as game rules do
+        if rng.random() < 0.1:
+            rearm(name + 'r', random_delay(rng))
+        if timers and rng.random() < 0.1:
+            victim = rng.choice(sorted(timers))
+            wheel.cancel(timers.pop(victim))
+            reference.remove(victim)
+    
+    def rearm(name, delay):
+        timers[name] = wheel.schedule(delay, fire, name)
+        reference.add(wheel.now + delay, name)
+    
+    count = 0
+    overflowed = 0
+    while wheel.now < 4 * REACH:
+        for _ in range(rng.randint(0, 8)):
+            count += 1
+            rearm(f't{count}', random_delay(rng))
+        for _ in range(rng.randint(0, 2)):
+            if timers:
+                name = rng.choice(sorted(timers))
+                wheel.cancel(timers.pop(name))
+                reference.remove(name)
+                if rng.random() < 0.5:
+                    rearm(name, random_delay(rng))  # re-arm under the same name
+        
+        overflowed = max(overflowed, len(wheel.overflow))
+        
+        for _ in range(rng.randint(1, 3 * WHEEL_SLOTS)):
+            fired.clear()
+            wheel.tick()
+            assert fired == reference.pop_due(wheel.now)
+            assert len(wheel) == len(timers) == len(reference.timers)
+    
+    assert overflowed
+
+def test_cancel_is_idempotent():
+    """Cancelling a fired or cancelled timer does nothing."""
+    wheel = TimingWheel(levels=LEVELS)
+    calls = []
+    fired = wheel.schedule(1, calls.append, 'fired')
+    cancelled = wheel.schedule(2, calls.append, 'cancelled')
+    wheel.cancel(cancelled)
+    wheel.advance(3)
+    wheel.cancel(fired)
+    wheel.cancel(cancelled)
+    assert calls == ['fired']
+    assert not fired.pending and not cancelled.pending
+    assert len(wheel) == 0
+
+def test_overflow_timer_fires_on_time():
+    """A timer beyond the top level waits in the overflow list and still fires on its tick."""
+    wheel = TimingWheel(levels=LEVELS)
+    calls = []
+    timer = wheel.schedule(2 * REACH + 5, calls.append, 'late')
+    assert timer.bucket is wheel.overflow
+    wheel.advance(2 * REACH + 4)
+    assert calls == []
+    wheel.tick()
+    assert calls == ['late']
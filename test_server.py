@@ -0,0 +1,250 @@
+"""
+Tests for the server's logins: resuming autosaves and one session per player name.
+"""
+
+import asyncio
+import zlib
+
+from ansi_graphics import ANSIArt, ANSIColors, colorize_text
+from autosave import AUTOSAVE_SLOT
+from replay import check_log
+from savegame import encode_save
+from save_store import MemorySaveStore
+from server import MUDServer, IAC, WILL, DO, DONT, SB, SE, COMPRESS2
+
+PROMPT = ANSIArt.command_prompt().encode()
+NAME_QUESTION = colorize_text("What is your name, adventurer? ", ANSIColors.BRIGHT_CYAN).encode()
+
+def run_with_server(store, client):
+    """Run a client coroutine, client(port), against a local server using a save store."""
+    async def main():
+        server = MUDServer('127.0.0.1', 0, save_store=store, compression=0)
+        await server.start()
+        try:
+            return await asyncio.wait_for(client(server.server.sockets[0].getsockname()[1]), 10)
+        finally:
+            server.server.close()
+            await server.commands.stop()
+            await server.clock.stop()
+            server.autosaver.close()
+    return asyncio.run(main())
+
+async def log_in(port, name):
+    """Connect and answer the name question; returns (reader, writer, text up to the next prompt or question)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    await reader.readuntil(NAME_QUESTION)
+    writer.write(f"{name}\r\n".encode())
+    text = await read_reply(reader)
+    return reader, writer, text
+
+async def read_reply(reader):
+    """Read until the server waits for input again: a command prompt or the name question."""
+    data = b''
+    while not (data.endswith(PROMPT) or data.endswith(NAME_QUESTION)):
+        chunk = await reader.read(1)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode('utf-8', 'replace')
+
+async def quit_game(reader, writer):
+    """Quit and wait for the server to hang up."""
+    writer.write(b"quit\r\n")
+    await reader.read()
+    writer.close()
+
+def test_damaged_autosave_starts_new_game(caplog):
+    """An autosave of the wrong shape is logged and the player gets a new game."""
+    store = MemorySaveStore()
+    store.save('Dana', AUTOSAVE_SLOT, {'player': 5})
+    
+    async def client(port):
+        reader, writer, text = await log_in(port, 'Dana')
+        await quit_game(reader, writer)
+        return text
+    
+    text = run_with_server(store, client)
+    assert "Open Field" in text
+    assert "Welcome back" not in text
+    assert "Could not resume Dana" in caplog.text
+
+def test_dead_players_autosave_starts_new_game(new_engine):
+    """An autosave of a player killed in the dark isn't resumed."""
+    engine = new_engine(name='Hal')
+    engine.process_command("east")
+    engine.player.health = 0
+    store = MemorySaveStore()
+    store.save('Hal', AUTOSAVE_SLOT, engine.capture_state())
+    
+    async def client(port):
+        reader, writer, text = await log_in(port, 'Hal')
+        writer.write(b"health\r\n")
+        text += await read_reply(reader)
+        await quit_game(reader, writer)
+        return text
+    
+    text = run_with_server(store, client)
+    assert "Welcome back" not in text
+    assert "Health: 100/100" in text
+
+def test_autosave_is_resumed():
+    """A good autosave is restored on login."""
+    store = MemorySaveStore()
+    
+    async def client(port):
+        reader, writer, _ = await log_in(port, 'Eve')
+        writer.write(b"south\r\n")
+        await read_reply(reader)
+        writer.close()
+        await asyncio.sleep(0.1)  # let the session end and autosave
+        reader, writer, text = await log_in(port, 'Eve')
+        await quit_game(reader, writer)
+        return text
+    
+    assert "Welcome back, Eve" in run_with_server(store, client)
+
+def test_second_login_with_same_name_is_refused():
+    """A name already playing can't be used by another connection until it leaves."""
+    async def client(port):
+        first = await log_in(port, 'Finn')
+        second_reader, second_writer, refused = await log_in(port, 'Finn')
+        second_writer.write(b"Gwen\r\n")
+        accepted = await read_reply(second_reader)
+        await quit_game(second_reader, second_writer)
+        await quit_game(*first[:2])
+        return refused, accepted
+    
+    refused, accepted = run_with_server(MemorySaveStore(), client)
+    assert "Finn is already playing" in refused
+    assert "Open Field" in accepted
+
+class BrokenStore(MemorySaveStore):
+    """Memory store that fails every write."""
+    
+    def save_many(self, entries):
+        raise OSError("disk full")
+
+def save_and_quit(store, reply, record_dir=None):
+    """Log in, save, and return what the player saw after typing save, up to an expected reply."""
+    async def main():
+        server = MUDServer('127.0.0.1', 0, save_store=store, compression=0, record_dir=record_dir)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.server.sockets[0].getsockname()[1])
+            await reader.readuntil(NAME_QUESTION)
+            writer.write(b"Jo\r\n")
+            await read_reply(reader)
+            writer.write(b"save\r\n")
+            text = await asyncio.wait_for(reader.readuntil(reply.encode()), 10)
+            await quit_game(reader, writer)
+            return text.decode('utf-8', 'replace')
+        finally:
+            server.server.close()
+            await server.commands.stop()
+            await server.clock.stop()
+            server.autosaver.close()
+    return asyncio.run(main())
+
+def test_save_is_reported_once_stored(tmp_path):
+    """`save` reports success after the write, and the session's recording still replays."""
+    store = MemorySaveStore()
+    text = save_and_quit(store, "Game saved successfully.", record_dir=str(tmp_path))
+    assert "Game saved successfully." in text
+    assert store.load('Jo', 'default')
+    
+    logs = [str(path) for path in tmp_path.iterdir()]
+    assert len(logs) == 1
+    result = check_log(logs[0])
+    assert result['mismatches'] == []
+
+def test_failed_save_is_reported():
+    """A save the store can't write tells the player it failed."""
+    text = save_and_quit(BrokenStore(), "Error saving game.")
+    assert "Error saving game." in text
+    assert "successfully" not in text
+
+class MemoryWriter:
+    """Stands in for a client connection's StreamWriter, keeping everything written."""
+    
+    def __init__(self):
+        self.data = bytearray()
+        self.closed = False
+    
+    def write(self, data):
+        self.data += data
+    
+    def is_closing(self):
+        return self.closed
+    
+    async def drain(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    async def wait_closed(self):
+        pass
+    
+    def get_extra_info(self, name):
+        return None
+
+def play_in_memory(answer, lines):
+    """
+    Run one session over in-memory streams, answering the MCCP2 offer first.
+    
+    Args:
+        answer (int): DO or DONT for the offered COMPRESS2 option
+        lines (list): Input lines sent after the name, each once the previous one has run
+    
+    Returns:
+        bytes: Everything the server wrote
+    """
+    async def main():
+        server = MUDServer('127.0.0.1', 0, save_store=MemorySaveStore())
+        server.commands.start()
+        reader = asyncio.StreamReader()
+        writer = MemoryWriter()
+        session = asyncio.ensure_future(server.handle_client(reader, writer))
+        try:
+            reader.feed_data(bytes([IAC, answer, COMPRESS2]) + b"Ivy\r\n")
+            for line in lines:
+                await settle(writer)
+                reader.feed_data(line.encode() + b"\r\n")
+            await settle(writer)
+            reader.feed_eof()
+            await asyncio.wait_for(session, 5)
+        finally:
+            await server.commands.stop()
+            server.autosaver.close()
+        return bytes(writer.data)
+    return asyncio.run(main())
+
+async def settle(writer):
+    """Wait until the server has stopped writing for a moment."""
+    size = -1
+    while size != len(writer.data):
+        size = len(writer.data)
+        await asyncio.sleep(0.02)
+
+MCCP2_START = bytes([IAC, SB, COMPRESS2, IAC, SE])
+
+def test_mccp2_output_inflates():
+    """A client answering DO gets the stream start marker, then one zlib stream it can inflate."""
+    data = play_in_memory(DO, ["look", "score", "quit"])
+    assert data.startswith(bytes([IAC, WILL, COMPRESS2]))
+    assert data.count(MCCP2_START) == 1
+    
+    plain, compressed = data.split(MCCP2_START)
+    assert b"What is your name, adventurer?" in plain
+    inflater = zlib.decompressobj()
+    text = inflater.decompress(compressed).decode('utf-8')
+    assert inflater.eof and not inflater.unused_data  # the stream was finished on quit
+    assert "Open Field" in text
+    assert "Thanks for playing" in text
+    assert len(compressed) < len(text.encode('utf-8'))
+
+def test_mccp2_refused_stays_plain():
+    """A client answering DONT gets plain text and no stream start marker."""
+    data = play_in_memory(DONT, ["look", "quit"])
+    assert MCCP2_START not in data
+    assert b"Open Field" in data
@@ -0,0 +1,19 @@
+"""
+Tests for compiling world snapshots.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from snapshot import SnapshotReader
+from world import compile_world
+
+def test_concurrent_compiles_do_not_collide(tmp_path):
+    """Builders racing to write one snapshot each use their own temporary file."""
+    path = str(tmp_path / 'world.snapshot')
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert list(pool.map(lambda _: compile_world('data', path), range(16))) == [path] * 16
+    
+    with open(path, 'rb') as f:
+        reader = SnapshotReader(f.read())
+    assert 'field' in reader.rooms()
+    assert [entry.name for entry in tmp_path.iterdir()] == ['world.snapshot']
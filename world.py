@@ -0,0 +1,711 @@
+"""
+World template for ZorkMUD: Sentinel Realm
+Holds the read-only world shared by every session in a process and the
+small per-session delta layered on top of it.
+"""
+
+import gc
+import json
+import os
+import sys
+from collections.abc import Mapping
+
+from room import Room
+from item import Item
+from room_store import RoomStore, ROOM_CACHE_SIZE
+from snapshot import SnapshotReader, SnapshotError, snapshot_path, source_stamps, write_snapshot
+
+# Item locations are small tuples so they hash cheaply and never collide
+# between room IDs and item IDs.
+PLAYER = ('player',)
+
+def room_location(room_id):
+    """Location key for items lying in a room."""
+    return ('room', room_id)
+
+def container_location(item_id):
+    """Location key for items stored inside another item."""
+    return ('item', item_id)
+
+def location_name(location):
+    """Encode a location key as a string, e.g. 'room:field' or 'player'."""
+    return ':'.join(location)
+
+def parse_location(name):
+    """Decode a string produced by location_name() back into a location key."""
+    kind, _, target = name.partition(':')
+    return (kind, target) if target else (kind,)
+
+class World:
+    """Read-only world template shared by every session in a process."""
+    
+    def __init__(self, rooms, items, messages, placements, scoring=None, contents=None, index=None,
+                 dark_rooms=()):
+        """
+        Initialize the world template.
+        
+        Args:
+            rooms (dict): Room ID -> Room with name, descriptions and exits
+            items (dict): Item ID -> Item prototype with text and capabilities
+            messages (dict): The message catalog
+            placements (dict): Item ID -> starting location key
+            scoring (dict): Rule key -> {'action', 'item', 'points', 'wins'} scoring rules
+            contents (dict): Precomputed starting contents (derived from placements if omitted)
+            index (dict): Precomputed starting name index (derived from items if omitted)
+            dark_rooms (iterable): IDs of the rooms that can't be seen in without a lit lamp
+        """
+        self.rooms = rooms
+        self.items = items
+        self.messages = messages
+        self.placements = placements
+        self.dark_rooms = frozenset(dark_rooms)
+        
+        # Scoring rules keyed by (action, item ID) for a single lookup per action
+        self.scoring = {}
+        for key, rule in (scoring or {}).items():
+            self.scoring[(rule['action'], rule['item'])] = {
+                'key': key,
+                'points': rule.get('points', 0),
+                'wins': rule.get('wins', False)
+            }
+        self.max_score = sum(rule['points'] for rule in self.scoring.values())
+        
+        # Starting contents of every location, in data file order
+        if contents is None:
+            contents = {}
+            for item_id, location in placements.items():
+                contents.setdefault(location, []).append(item_id)
+            contents = {location: tuple(ids) for location, ids in contents.items()}
+        self.contents = contents
+        
+        # Starting name index of every location: lowercased name/synonym -> item IDs
+        if index is None:
+            index = {}
+            for location, ids in self.contents.items():
+                names = {}
+                for item_id in ids:
+                    for name in items[item_id].match_names:
+                        names.setdefault(name, []).append(item_id)
+                index[location] = {name: tuple(matches) for name, matches in names.items()}
+        self.index = index
+        
+        self.route_table = None  # shared RouteTable, built on first use (see routes.route_table)
+        self.render_caches = {}  # terminal profile -> shared RenderCache (see render.render_cache)
+    
+    @classmethod
+    def from_data(cls, rooms, items, messages, scoring=None):
+        """
+        Build a world template from decoded data files.
+        
+        Room IDs and exit directions are interned so every reference to them
+        shares one string, and items with identical data share one prototype.
+        
+        Args:
+            rooms (dict): Room ID -> room data as found in rooms.json
+            items (dict): Item ID -> item data as found in items.json
+            messages (dict): The message catalog
+            scoring (dict): Scoring rules as found in scoring.json
+        """
+        strings = {}  # one copy of each repeated description text
+        
+        room_objects = {}
+        for room_id, data in rooms.items():
+            room = Room(data['name'], strings.setdefault(data['description'], data['description']),
+                        data.get('short_description'))
+            room.exits = {sys.intern(direction): sys.intern(target)
+                          for direction, target in data.get('exits', {}).items()}
+            room_objects[sys.intern(room_id)] = room
+        dark_rooms = [room_id for room_id, data in rooms.items() if data.get('dark', False)]
+        
+        prototypes = {}  # item fields -> the shared Item prototype
+        item_objects = {}
+        for item_id, data in items.items():
+            fields = (
+                data['name'],
+                strings.setdefault(data['description'], data['description']),
+                tuple(data.get('synonyms', [])),
+                data.get('takeable', True),
+                data.get('readable', False),
+                data.get('useable', False),
+                data.get('openable', False),
+                data.get('key_required'),
+                strings.setdefault(data.get('read_text', ''), data.get('read_text', ''))
+            )
+            item = prototypes.get(fields)
+            if item is None:
+                item = Item(*fields[:2], list(fields[2]), *fields[3:8])
+                item.read_text = fields[8]
+                prototypes[fields] = item
+            item_objects[sys.intern(item_id)] = item
+        
+        placements = {}
+        for item_id, data in items.items():
+            if 'room' in data:
+                if data['room'] in room_objects:
+                    placements[sys.intern(item_id)] = room_location(sys.intern(data['room']))
+            elif 'container' in data:
+                if data['container'] in item_objects:
+                    placements[sys.intern(item_id)] = container_location(sys.intern(data['container']))
+        
+        return cls(room_objects, item_objects, messages, placements, scoring, dark_rooms=dark_rooms)
+    
+    @classmethod
+    def from_json(cls, data_dir='data'):
+        """Build a world template from the JSON data files."""
+        return cls.from_data(**read_world_data(data_dir))
+    
+    @classmethod
+    def from_snapshot(cls, reader, room_cache_size=ROOM_CACHE_SIZE):
+        """
+        Build a world template from an open SnapshotReader written by snapshot_tables().
+        
+        Rooms are not decoded up front: they are served by a RoomStore that
+        materializes each one on first access and keeps at most
+        room_cache_size of them alive.
+        
+        Args:
+            reader (SnapshotReader): The snapshot to build from
+            room_cache_size (int): Maximum number of materialized rooms
+        """
+        meta = reader.meta
+        rooms = RoomStore(reader, room_cache_size)
+        
+        # Items that shared a prototype share one fields tuple in the snapshot
+        prototypes = {}
+        items = {}
+        for item_id, fields in meta['items'].items():
+            item = prototypes.get(id(fields))
+            if item is None:
+                item = Item(*fields[:-1])
+                item.read_text = fields[-1]
+                prototypes[id(fields)] = item
+            items[item_id] = item
+        
+        return cls(rooms, items, meta['messages'], meta['placements'], meta['scoring'],
+                   meta['contents'], meta['index'], meta.get('dark_rooms', ()))
+    
+    def snapshot_tables(self):
+        """
+        Flatten the world into marshallable snapshot tables.
+        
+        Returns:
+            tuple: (tables for the snapshot metadata, room ID -> room record)
+        """
+        prototypes = {}
+        items = {}
+        for item_id, item in self.items.items():
+            fields = prototypes.get(id(item))
+            if fields is None:
+                fields = prototypes[id(item)] = (
+                    item.name, item.description, list(item.synonyms), item.takeable,
+                    item.readable, item.useable, item.openable, item.key_required,
+                    item.read_text
+                )
+            items[item_id] = fields
+        
+        scoring = {}
+        for (action, item_id), rule in self.scoring.items():
+            scoring[rule['key']] = {'action': action, 'item': item_id,
+                                    'points': rule['points'], 'wins': rule['wins']}
+        
+        tables = {
+            'items': items,
+            'messages': self.messages,
+            'placements': self.placements,
+            'scoring': scoring,
+            'contents': self.contents,
+            'index': self.index,
+            'dark_rooms': sorted(self.dark_rooms)
+        }
+        records = {
+            room_id: (room.name, room.description, room.short_description, room.exits)
+            for room_id, room in self.rooms.items()
+        }
+        return tables, records
+
+# Data files making up a world; scoring.json is optional
+DATA_FILES = ('rooms.json', 'items.json', 'messages.json', 'scoring.json')
+
+class WorldDataError(ValueError):
+    """Raised when world data files are inconsistent."""
+    
+    def __init__(self, problems):
+        super().__init__(f"{len(problems)} problem(s) in world data: " + "; ".join(problems[:5]))
+        self.problems = problems
+
+def read_world_data(data_dir='data'):
+    """
+    Decode the JSON data files of a world.
+    
+    Returns:
+        dict: {'rooms', 'items', 'messages', 'scoring'} as stored in the files
+    """
+    with open(os.path.join(data_dir, 'rooms.json'), 'r') as f:
+        rooms = json.load(f)
+    with open(os.path.join(data_dir, 'items.json'), 'r') as f:
+        items = json.load(f)
+    with open(os.path.join(data_dir, 'messages.json'), 'r') as f:
+        messages = json.load(f)
+    
+    scoring = {}
+    scoring_path = os.path.join(data_dir, 'scoring.json')
+    if os.path.exists(scoring_path):
+        with open(scoring_path, 'r') as f:
+            scoring = json.load(f)
+    
+    return {'rooms': rooms, 'items': items, 'messages': messages, 'scoring': scoring}
+
+def validate_world_data(rooms, items, messages, scoring):
+    """
+    Check that the world data files agree with each other.
+    
+    Returns:
+        list: Human readable problems; empty when the world is consistent
+    """
+    problems = []
+    
+    for room_id, data in rooms.items():
+        for field in ('name', 'description'):
+            if not isinstance(data.get(field), str):
+                problems.append(f"room {room_id!r} needs a text {field!r}")
+        for direction, target in data.get('exits', {}).items():
+            if target not in rooms:
+                problems.append(f"room {room_id!r} exit {direction!r} leads to unknown room {target!r}")
+    
+    names = set()
+    for data in items.values():
+        names.add(str(data.get('name', '')).lower())
+        names.update(str(synonym).lower() for synonym in data.get('synonyms', []))
+    
+    for item_id, data in items.items():
+        for field in ('name', 'description'):
+            if not isinstance(data.get(field), str):
+                problems.append(f"item {item_id!r} needs a text {field!r}")
+        if 'room' in data and data['room'] not in rooms:
+            problems.append(f"item {item_id!r} starts in unknown room {data['room']!r}")
+        if 'container' in data and data['container'] not in items:
+            problems.append(f"item {item_id!r} starts in unknown container {data['container']!r}")
+        key = data.get('key_required')
+        if key and key.lower() not in names:
+            problems.append(f"item {item_id!r} needs key {key!r}, which no item is called")
+    
+    for key, rule in scoring.items():
+        if rule.get('item') not in items:
+            problems.append(f"scoring rule {key!r} refers to unknown item {rule.get('item')!r}")
+    
+    return problems
+
+def compile_world(data_dir='data', path=None):
+    """
+    Validate the JSON world files and compile them into a binary snapshot.
+    
+    Args:
+        data_dir (str): Directory holding the world's JSON data files
+        path (str): Snapshot file to write (defaults to data_dir/world.snapshot)
+    
+    Returns:
+        str: Path of the written snapshot
+    """
+    path = path or snapshot_path(data_dir)
+    sources = source_stamps([os.path.join(data_dir, name) for name in DATA_FILES])
+    data = read_world_data(data_dir)
+    _write_snapshot(path, sources, data, World.from_data(**data))
+    return path
+
+def _write_snapshot(path, sources, data, world):
+    """Validate decoded world data and write its world as a snapshot."""
+    problems = validate_world_data(**data)
+    if problems:
+        raise WorldDataError(problems)
+    tables, records = world.snapshot_tables()
+    write_snapshot(path, sources, tables, records)
+
+_worlds = {}
+
+def load_world(data_dir='data', reload=False):
+    """
+    Return the world template for a data directory, loading it at most once per process.
+    
+    A compiled snapshot is used when it matches the JSON files. Otherwise the
+    JSON files are read and the snapshot is rebuilt. Either way the snapshot
+    is memory-mapped and rooms are materialized on demand (see RoomStore).
+    
+    Args:
+        data_dir (str): Directory holding the world's JSON data files
+        reload (bool): Force the data files to be read again
+    
+    Returns:
+        World: The shared, read-only world template
+    """
+    key = os.path.abspath(data_dir)
+    if reload or key not in _worlds:
+        _worlds[key] = _load_world(data_dir)
+    return _worlds[key]
+
+def _load_world(data_dir):
+    """Load a world from its snapshot if current, otherwise from JSON."""
+    # Loading allocates many long-lived objects at once; pausing the cyclic
+    # collector stops it from rescanning them over and over during the load.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _read_world(data_dir)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def _read_world(data_dir):
+    """Read a world from its snapshot if current, otherwise from JSON."""
+    path = snapshot_path(data_dir)
+    sources = source_stamps([os.path.join(data_dir, name) for name in DATA_FILES])
+    
+    try:
+        reader = SnapshotReader.map(path)
+        if reader.sources == sources:
+            return World.from_snapshot(reader)
+    except SnapshotError:
+        pass
+    
+    data = read_world_data(data_dir)
+    world = World.from_data(**data)
+    try:
+        _write_snapshot(path, sources, data, world)
+        # Serve rooms from the fresh snapshot so they don't all stay in memory
+        return World.from_snapshot(SnapshotReader.map(path))
+    except (OSError, WorldDataError, SnapshotError):
+        pass  # The snapshot is only a cache; keep the world built from JSON
+    return world
+
+class WorldState:
+    """Per-session changes layered over a shared World template."""
+    
+    def __init__(self, world):
+        """
+        Initialize an unchanged session state.
+        
+        Args:
+            world (World): The shared world template
+        """
+        self.world = world
+        self.locations = {}  # item_id -> location, only for items that moved
+        self.contents = {}  # location -> ordered {item_id: None}, only for locations that changed
+        self.index = {}  # location -> {name: [item IDs]}, only for locations that changed
+        self.opened = set()  # IDs of opened containers
+        self.open_containers = {}  # location -> ordered {container_id: None} of opened containers
+        self.rooms = RoomMap(self)
+        self.items = ItemMap(self)
+    
+    def location(self, item_id):
+        """Get the current location key of an item (None if removed from play)."""
+        if item_id in self.locations:
+            return self.locations[item_id]
+        return self.world.placements.get(item_id)
+    
+    def contents_of(self, location):
+        """Get the IDs of the items currently at a location, in order."""
+        if location in self.contents:
+            return self.contents[location]
+        return self.world.contents.get(location, ())
+    
+    def find(self, location, name):
+        """
+        Resolve a name or synonym to the first matching item at a location.
+        
+        Args:
+            location (tuple): Location key to search
+            name (str): Item name or synonym
+        
+        Returns:
+            str: ID of the matching item, or None
+        """
+        index = self.index.get(location)
+        if index is None:
+            index = self.world.index.get(location, {})
+        matches = index.get(name.lower())
+        return matches[0] if matches else None
+    
+    def find_in_open_containers(self, location, name):
+        """Resolve a name to an item inside the open containers at a location, or in open containers nested in them."""
+        containers = list(self.open_containers.get(location, ()))
+        for container_id in containers:  # grows as nested open containers are found
+            inside = container_location(container_id)
+            item_id = self.find(inside, name)
+            if item_id:
+                return item_id
+            containers.extend(self.open_containers.get(inside, ()))
+        return None
+    
+    def _editable(self, location):
+        """Copy a location's template contents and name index into the session on first change."""
+        if location not in self.contents:
+            self.contents[location] = dict.fromkeys(self.world.contents.get(location, ()))
+            template_index = self.world.index.get(location, {})
+            self.index[location] = {name: list(matches) for name, matches in template_index.items()}
+        return self.contents[location], self.index[location]
+    
+    def move(self, item_id, location):
+        """
+        Move an item to a new location.
+        
+        Args:
+            item_id (str): ID of the item to move
+            location (tuple): Destination location key, or None to remove it from play
+        """
+        names = self.world.items[item_id].match_names
+        current = self.location(item_id)
+        if current is not None:
+            contents, index = self._editable(current)
+            del contents[item_id]
+            for name in names:
+                matches = index[name]
+                matches.remove(item_id)
+                if not matches:
+                    del index[name]
+        
+        if location is not None:
+            contents, index = self._editable(location)
+            contents[item_id] = None
+            for name in names:
+                index.setdefault(name, []).append(item_id)
+        
+        self.locations[item_id] = location
+        if item_id in self.opened:
+            self._track_open(item_id, current, False)
+            self._track_open(item_id, location, True)
+    
+    def _track_open(self, container_id, location, is_open):
+        """Add or remove an opened container from its location's open list."""
+        if location is None:
+            return
+        if is_open:
+            self.open_containers.setdefault(location, {})[container_id] = None
+        else:
+            containers = self.open_containers.get(location, {})
+            containers.pop(container_id, None)
+            if not containers:
+                self.open_containers.pop(location, None)
+    
+    def is_open(self, item_id):
+        """Check if a container has been opened in this session."""
+        return item_id in self.opened
+    
+    def set_open(self, item_id, is_open):
+        """Record a container as open or closed."""
+        if is_open:
+            self.opened.add(item_id)
+        else:
+            self.opened.discard(item_id)
+        self._track_open(item_id, self.location(item_id), is_open)
+    
+    def snapshot(self):
+        """
+        Return the session delta as compact, JSON-ready data.
+        
+        Only locations whose contents differ from the template are kept, and
+        item locations are implied by those contents.
+        
+        Returns:
+            dict: {'contents': {location name: [item IDs]}, 'removed': [item IDs],
+                   'opened': [container IDs]}
+        """
+        contents = {}
+        for location, ids in self.contents.items():
+            ids = tuple(ids)
+            if ids != self.world.contents.get(location, ()):
+                contents[location_name(location)] = list(ids)
+        
+        # Opened containers in the order they were opened at each location
+        opened = [item_id for containers in self.open_containers.values() for item_id in containers]
+        opened += sorted(self.opened.difference(opened))
+        
+        return {
+            'contents': contents,
+            'removed': [item_id for item_id, location in self.locations.items() if location is None],
+            'opened': opened
+        }
+    
+    def restore(self, snapshot):
+        """Replace the session delta with one produced by snapshot()."""
+        self.locations = {}
+        self.contents = {}
+        self.index = {}
+        for name, ids in snapshot['contents'].items():
+            location = parse_location(name)
+            self.contents[location] = dict.fromkeys(ids)
+            index = self.index[location] = {}
+            for item_id in ids:
+                for match_name in self.world.items[item_id].match_names:
+                    index.setdefault(match_name, []).append(item_id)
+                if self.world.placements.get(item_id) != location:
+                    self.locations[item_id] = location
+        for item_id in snapshot['removed']:
+            self.locations[item_id] = None
+        
+        self.opened = set()
+        self.open_containers = {}
+        for item_id in snapshot['opened']:
+            self.set_open(item_id, True)
+
+class RoomView(Room):
+    """A template room seen through one session's WorldState."""
+    
+    __slots__ = ('state', 'room_id', 'template', 'location')
+    
+    def __init__(self, state, room_id):
+        """
+        Initialize a room view.
+        
+        Args:
+            state (WorldState): The session state
+            room_id (str): ID of the template room
+        """
+        self.state = state
+        self.room_id = room_id
+        self.template = state.world.rooms[room_id]
+        self.location = room_location(room_id)
+        self.visited = False
+    
+    @property
+    def name(self):
+        return self.template.name
+    
+    @property
+    def description(self):
+        return self.template.description
+    
+    @property
+    def short_description(self):
+        return self.template.short_description
+    
+    @property
+    def exits(self):
+        return self.template.exits
+    
+    @property
+    def items(self):
+        """Items currently in the room for this session."""
+        return [ItemView(self.state, item_id) for item_id in self.state.contents_of(self.location)]
+    
+    def add_exit(self, direction, room_id):
+        """Exits belong to the shared template and cannot change per session."""
+        raise TypeError("Room exits are part of the read-only world template")
+    
+    def add_item(self, item):
+        """Add an item to the room."""
+        self.state.move(item.item_id, self.location)
+    
+    def remove_item(self, item_name):
+        """Remove an item from the room by name."""
+        item = self.get_item(item_name)
+        if item:
+            self.state.move(item.item_id, None)
+        return item
+    
+    def get_item(self, item_name):
+        """Get an item from the room by name."""
+        item_id = self.state.find(self.location, item_name)
+        return ItemView(self.state, item_id) if item_id else None
+    
+    def get_contained_item(self, item_name):
+        """Get an item by name from inside an open container in the room."""
+        item_id = self.state.find_in_open_containers(self.location, item_name)
+        return ItemView(self.state, item_id) if item_id else None
+
+def _prototype_attribute(name):
+    """Property that reads an attribute from the shared item prototype."""
+    return property(lambda self: getattr(self.prototype, name))
+
+class ItemView(Item):
+    """An item prototype seen through one session's WorldState."""
+    
+    __slots__ = ('state', 'item_id', 'prototype')
+    
+    name = _prototype_attribute('name')
+    description = _prototype_attribute('description')
+    synonyms = _prototype_attribute('synonyms')
+    takeable = _prototype_attribute('takeable')
+    readable = _prototype_attribute('readable')
+    useable = _prototype_attribute('useable')
+    openable = _prototype_attribute('openable')
+    key_required = _prototype_attribute('key_required')
+    read_text = _prototype_attribute('read_text')
+    match_names = _prototype_attribute('match_names')
+    
+    def __init__(self, state, item_id):
+        """
+        Initialize an item view.
+        
+        Args:
+            state (WorldState): The session state
+            item_id (str): ID of the item prototype
+        """
+        self.state = state
+        self.item_id = item_id
+        self.prototype = state.world.items[item_id]
+    
+    def __eq__(self, other):
+        return (isinstance(other, ItemView) and other.state is self.state
+                and other.item_id == self.item_id)
+    
+    def __hash__(self):
+        return hash(self.item_id)
+    
+    @property
+    def is_open(self):
+        return self.state.is_open(self.item_id)
+    
+    @is_open.setter
+    def is_open(self, value):
+        self.state.set_open(self.item_id, value)
+    
+    @property
+    def contents(self):
+        """Items currently inside this item for this session."""
+        location = container_location(self.item_id)
+        return [ItemView(self.state, item_id) for item_id in self.state.contents_of(location)]
+    
+    def add_content(self, item):
+        """Add an item to this item's contents."""
+        self.state.move(item.item_id, container_location(self.item_id))
+    
+    def remove_content(self, item_name):
+        """Remove an item from this item's contents."""
+        item_id = self.state.find(container_location(self.item_id), item_name)
+        if item_id is None:
+            return None
+        self.state.move(item_id, None)
+        return ItemView(self.state, item_id)
+
+class RoomMap(Mapping):
+    """Mapping of room ID -> RoomView for one session."""
+    
+    def __init__(self, state):
+        self.state = state
+    
+    def __getitem__(self, room_id):
+        if room_id not in self.state.world.rooms:
+            raise KeyError(room_id)
+        return RoomView(self.state, room_id)
+    
+    def __iter__(self):
+        return iter(self.state.world.rooms)
+    
+    def __len__(self):
+        return len(self.state.world.rooms)
+
+class ItemMap(Mapping):
+    """Mapping of item ID -> ItemView for one session."""
+    
+    def __init__(self, state):
+        self.state = state
+    
+    def __getitem__(self, item_id):
+        if item_id not in self.state.world.items:
+            raise KeyError(item_id)
+        return ItemView(self.state, item_id)
+    
+    def __iter__(self):
+        return iter(self.state.world.items)
+    
+    def __len__(self):
+        return len(self.state.world.items)
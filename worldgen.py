@@ -0,0 +1,466 @@
+"""
+World generator for ZorkMUD: Sentinel Realm
+Writes large, reproducible and always winnable worlds for scale testing and content work.
+
+A generated world uses the same data files as the shipped one (rooms.json,
+items.json, scoring.json and a copy of messages.json), so the engine, the
+server and every tool load it unchanged. The same sizes and seed always
+produce the same files.
+
+Rooms are laid out on a grid, grown from the starting room as a random
+tree with a few extra loops, so every room can be reached and every exit
+has a way back. Some rooms are dark. The world holds one lamp, lockable
+chests and the keys that open them, plain boxes, containers nested inside
+other containers, and filler items (trinkets, scenery and notes). The game
+is won by taking the golden treasure from the treasure chest.
+
+Winnability is built in rather than searched for:
+  - the lamp lies in a room reachable from the start without passing a dark room;
+  - containers are numbered, and a container only ever sits inside, or has
+    its key inside, a container with a lower number, so they can always be
+    opened in order;
+  - the treasure chest comes last.
+The generator also writes the winning walkthrough it followed (walkthrough.txt,
+a script for run-script), which run_cli() plays to check the world.
+"""
+
+import argparse
+import json
+import os
+import random
+from collections import deque
+
+from headless import run_script
+from parser import Parser
+from world import compile_world, WorldDataError
+
+# Grid steps and the direction leading back, in the order exits are listed
+DIRECTIONS = {
+    'north': ((0, -1), 'south'),
+    'south': ((0, 1), 'north'),
+    'east': ((1, 0), 'west'),
+    'west': ((-1, 0), 'east'),
+}
+
+# The engine starts every player in the room with this ID
+START_ROOM = 'field'
+
+ROOM_ADJECTIVES = ['dusty', 'mossy', 'silent', 'narrow', 'crumbling', 'windswept', 'sunken', 'gilded',
+                   'frozen', 'hollow', 'misty', 'ruined', 'quiet', 'shadowy', 'ancient', 'vaulted']
+ROOM_NOUNS = ['hall', 'chamber', 'gallery', 'passage', 'cellar', 'grotto', 'courtyard', 'library',
+              'crypt', 'study', 'armory', 'chapel', 'garden', 'tunnel', 'vault', 'attic']
+ROOM_DETAILS = [
+    "Cobwebs hang from every corner.",
+    "Water drips somewhere out of sight.",
+    "The floor is covered with old straw.",
+    "Faded murals cover the walls.",
+    "A cold draft blows through the room.",
+    "Roots have pushed through the ceiling.",
+    "The air smells of smoke and old paper.",
+    "Your footsteps echo off the stone.",
+]
+
+MATERIALS = ['brass', 'iron', 'silver', 'copper', 'tin', 'bronze', 'bone', 'oak',
+             'pewter', 'jade', 'ivory', 'glass', 'clay', 'steel']
+TRINKETS = ['coin', 'ring', 'feather', 'pebble', 'candle', 'bottle', 'spoon', 'button',
+            'bell', 'comb', 'compass', 'locket', 'whistle', 'thimble']
+SCENERY = ['statue', 'fountain', 'pillar', 'tapestry', 'mirror', 'bench', 'altar', 'anvil']
+NOTES = ['note', 'letter', 'diary', 'scrap', 'journal']
+BOXES = ['crate', 'box', 'basket', 'casket', 'cabinet', 'trunk']
+CHESTS = ['chest', 'strongbox', 'coffer', 'safe']
+NOTE_TEXTS = [
+    "\"Whoever holds the lamp need not fear the dark.\"",
+    "\"Every lock in this place has its key somewhere within these walls.\"",
+    "\"The treasure waits in a chest behind many locks.\"",
+    "\"Open the boxes you find; some hold more than dust.\"",
+]
+
+def generate_world(room_count, item_count, seed=0, dark_fraction=0.1, lock_fraction=0.05,
+                   box_fraction=0.05, nest_chance=0.3, loop_chance=0.2, messages=None):
+    """
+    Generate the data files of a random, winnable world.
+    
+    Args:
+        room_count (int): Number of rooms
+        item_count (int): Number of items, including the lamp, keys, containers and treasure
+        seed: Seed of the random generator; the same arguments always give the same world
+        dark_fraction (float): Share of rooms (other than the start) that are dark
+        lock_fraction (float): Share of items that are locked chests (each adds its key too)
+        box_fraction (float): Share of items that are unlocked boxes
+        nest_chance (float): Chance that an item starts inside a container instead of a room
+        loop_chance (float): Chance of an extra exit between neighboring rooms
+        messages (dict): Message catalog to use (the shipped data/messages.json if None)
+    
+    Returns:
+        tuple: ({'rooms', 'items', 'messages', 'scoring'} ready to write as the
+        JSON data files, list of walkthrough commands that win the game)
+    """
+    if room_count < 1:
+        raise ValueError("A world needs at least one room")
+    locks = max(1, round(item_count * lock_fraction))  # including the treasure chest
+    spare = item_count - 2 - 2 * locks  # after the lamp, the treasure, the chests and their keys
+    if spare < 0:
+        raise ValueError(f"{item_count} items are too few: this world needs at least {2 + 2 * locks}")
+    boxes = min(round(item_count * box_fraction), spare)
+    
+    rng = random.Random(seed)
+    exits = _grid_map(room_count, rng, loop_chance)
+    room_ids = [START_ROOM] + [f"room{n}" for n in range(1, room_count)]
+    
+    dark = set(rng.sample(range(1, room_count), int((room_count - 1) * dark_fraction)))
+    lit = _reachable(exits, 0, dark)
+    
+    rooms = {}
+    room_names = _Names()
+    for n, room_id in enumerate(room_ids):
+        adjective, noun = rng.choice(ROOM_ADJECTIVES), rng.choice(ROOM_NOUNS)
+        data = {
+            'name': room_names.unique(f"{adjective.title()} {noun.title()}"),
+            'description': f"You are in {_a(adjective)} {noun}. {rng.choice(ROOM_DETAILS)}",
+            'short_description': f"{_a(adjective)} {noun}",
+        }
+        if n in dark:
+            data['dark'] = True
+        data['exits'] = {direction: room_ids[target] for direction, target in exits[n].items()}
+        rooms[room_id] = data
+    
+    items = {}
+    scoring = {}
+    names = _Names(["lamp", "lantern", "light", "treasure chest", "golden treasure", "golden key"])
+    items['lamp'] = _item("lamp", "It's a brass lantern with a switch on the side.",
+                          synonyms=["lantern", "light"], useable=True)
+    items['lamp']['room'] = room_ids[rng.choice(lit)]
+    scoring['take_lamp'] = {'action': 'take', 'item': 'lamp', 'points': 10}
+    
+    # Containers in opening order; the treasure chest is always opened last
+    containers = ['box'] * boxes + ['chest'] * (locks - 1)
+    rng.shuffle(containers)
+    container_ids = []
+    keys = {}  # container ID -> ID of its key
+    for n, kind in enumerate(containers):
+        container_id = f"{kind}{n}"
+        if kind == 'box':
+            name = names.pick(rng, MATERIALS, BOXES)
+            items[container_id] = _item(name, f"It's {_a(name)}. Its lid is closed.",
+                                        synonyms=[name.split()[-1]], takeable=False, openable=True)
+        else:
+            name = names.pick(rng, MATERIALS, CHESTS)
+            key_name = names.unique(f"{name.split()[0]} key")
+            items[container_id] = _item(name, f"It's a sturdy {name}. It appears to be locked and requires a key.",
+                                        synonyms=[name.split()[-1]], takeable=False, openable=True,
+                                        key_required=key_name)
+            keys[container_id] = f"key{n}"
+            scoring[f"open_{container_id}"] = {'action': 'open', 'item': container_id, 'points': 10}
+        container_ids.append(container_id)
+    
+    items['chest'] = _item("treasure chest",
+                           "It's a large, ornate treasure chest made of dark wood with brass fittings. "
+                           "It appears to be locked and requires a key.",
+                           synonyms=["chest", "treasure"], takeable=False, openable=True, key_required="golden key")
+    keys['chest'] = 'key_chest'
+    scoring['open_treasure_chest'] = {'action': 'open', 'item': 'chest', 'points': 20}
+    container_ids.append('chest')
+    
+    # Place every container in a room or in a container that is opened before it
+    for n, container_id in enumerate(container_ids):
+        _place(items[container_id], rng, room_ids, container_ids, n, nest_chance)
+    
+    for n, container_id in enumerate(container_ids):
+        if container_id not in keys:
+            continue
+        key_name = items[container_id]['key_required']
+        key = _item(key_name, f"It's {_a(key_name)}. It looks like it might open something.",
+                    synonyms=["key"], useable=True)
+        _place(key, rng, room_ids, container_ids, n, nest_chance)
+        items[keys[container_id]] = key
+    
+    items['treasure'] = _item("golden treasure",
+                              "It's a magnificent golden chalice encrusted with precious gems. "
+                              "This is clearly the treasure you've been seeking!",
+                              synonyms=["gold", "chalice", "cup", "prize"])
+    items['treasure']['container'] = 'chest'
+    scoring['take_golden_treasure'] = {'action': 'take', 'item': 'treasure', 'points': 50, 'wins': True}
+    
+    for n in range(spare - boxes):
+        kind = rng.random()
+        if kind < 0.5:
+            name = names.pick(rng, MATERIALS, TRINKETS)
+            item = _item(name, f"It's {_a(name)}, worn smooth by many hands.", synonyms=[name.split()[-1]])
+        elif kind < 0.8:
+            name = names.pick(rng, MATERIALS, SCENERY)
+            item = _item(name, f"It's {_a(name)}. It is far too heavy to move.", synonyms=[name.split()[-1]],
+                         takeable=False)
+        else:
+            name = names.pick(rng, MATERIALS, NOTES)
+            item = _item(name, f"It's {_a(name)} with faded writing on it.", synonyms=[name.split()[-1]],
+                         readable=True, read_text=rng.choice(NOTE_TEXTS))
+        _place(item, rng, room_ids, container_ids, len(container_ids), nest_chance)
+        items[f"item{n}"] = item
+    
+    if messages is None:
+        with open(os.path.join('data', 'messages.json'), 'r') as f:
+            messages = json.load(f)
+    
+    data = {'rooms': rooms, 'items': items, 'messages': messages, 'scoring': scoring}
+    return data, walkthrough(data)
+
+def _grid_map(room_count, rng, loop_chance):
+    """
+    Lay rooms out on a grid as a random tree grown from room 0, plus extra loops.
+    
+    Returns:
+        list: For each room number, {direction: neighboring room number}
+    """
+    cells = {(0, 0): 0}
+    positions = [(0, 0)]
+    exits = [{}]
+    growing = [0]  # rooms that may still have a free neighboring cell
+    while len(positions) < room_count:
+        k = rng.randrange(len(growing))
+        room = growing[k]
+        x, y = positions[room]
+        free = [(direction, (x + dx, y + dy)) for direction, ((dx, dy), _) in DIRECTIONS.items()
+                if (x + dx, y + dy) not in cells]
+        if not free:
+            growing[k] = growing[-1]
+            growing.pop()
+            continue
+        direction, cell = rng.choice(free)
+        new = len(positions)
+        cells[cell] = new
+        positions.append(cell)
+        exits.append({})
+        exits[room][direction] = new
+        exits[new][DIRECTIONS[direction][1]] = room
+        growing.append(new)
+    
+    for room, (x, y) in enumerate(positions):
+        for direction in ('south', 'east'):
+            (dx, dy), back = DIRECTIONS[direction]
+            other = cells.get((x + dx, y + dy))
+            if other is not None and direction not in exits[room] and rng.random() < loop_chance:
+                exits[room][direction] = other
+                exits[other][back] = room
+    
+    # List exits in the usual north, south, east, west order
+    return [{direction: room_exits[direction] for direction in DIRECTIONS if direction in room_exits}
+            for room_exits in exits]
+
+def _reachable(exits, start, blocked):
+    """Room numbers reachable from start without entering a blocked room, in BFS order."""
+    reached = [start]
+    seen = {start}
+    pending = deque([start])
+    while pending:
+        for target in exits[pending.popleft()].values():
+            if target not in seen and target not in blocked:
+                seen.add(target)
+                reached.append(target)
+                pending.append(target)
+    return reached
+
+def _a(text):
+    """Put the indefinite article in front of text."""
+    return f"{'an' if text[0] in 'aeiou' else 'a'} {text}"
+
+def _item(name, description, synonyms=(), takeable=True, readable=False, useable=False, openable=False,
+          key_required=None, read_text=None):
+    """Build an item's data the way items.json lays it out."""
+    data = {
+        'name': name,
+        'description': description,
+        'synonyms': list(synonyms),
+        'takeable': takeable,
+        'readable': readable,
+        'useable': useable,
+        'openable': openable,
+    }
+    if read_text:
+        data['read_text'] = read_text
+    if key_required:
+        data['key_required'] = key_required
+    return data
+
+def _place(item, rng, room_ids, containers, count, nest_chance):
+    """Put an item in a random room, or in one of the first count containers."""
+    if count and rng.random() < nest_chance:
+        item['container'] = containers[rng.randrange(count)]
+    else:
+        item['room'] = rng.choice(room_ids)
+
+class _Names:
+    """Hands out item and room names that are never used twice."""
+    
+    def __init__(self, reserved=()):
+        """
+        Initialize the name list.
+        
+        Args:
+            reserved (iterable): Names that are already taken
+        """
+        self.used = set(reserved)
+        self.counts = {}  # name -> last number added to it
+        self.normalize = Parser().normalize_object_name
+    
+    def unique(self, name):
+        """Return name, with a number added if it is already taken."""
+        candidate = name
+        while candidate.lower() in self.used:
+            count = self.counts[name] = self.counts.get(name, 1) + 1
+            candidate = f"{name} {count}"
+        self.used.add(candidate.lower())
+        return candidate
+    
+    def pick(self, rng, adjectives, nouns):
+        """Return a new 'adjective noun' name the parser leaves unchanged."""
+        name = f"{rng.choice(adjectives)} {rng.choice(nouns)}"
+        # Players' input loses articles such as 'a ', so names must survive that
+        if self.normalize(name) != name:
+            raise ValueError(f"Name {name!r} would not survive the parser (it reads as {self.normalize(name)!r})")
+        return self.unique(name)
+
+def walkthrough(data):
+    """
+    Work out the commands that win a generated world.
+    
+    Only the containers the treasure chest depends on are opened: the ones
+    holding it, its key, or a needed key, recursively.
+    
+    Args:
+        data (dict): The world's data, as returned by generate_world()
+    
+    Returns:
+        list: Commands from the start room to taking the treasure
+    """
+    items = data['items']
+    ids_by_name = {item['name']: item_id for item_id, item in items.items()}
+    
+    def room_of(item_id):
+        while 'container' in items[item_id]:
+            item_id = items[item_id]['container']
+        return items[item_id]['room']
+    
+    def needs(item_id):
+        """Containers that must be open before an item can be taken or opened."""
+        required = []
+        parent = items[item_id].get('container')
+        if parent:
+            required.append(parent)
+        key_name = items[item_id].get('key_required')
+        if key_name:
+            key = ids_by_name[key_name]
+            if 'container' in items[key]:
+                required.append(items[key]['container'])
+        return required
+    
+    needed = set()
+    pending = needs('treasure')
+    while pending:
+        container_id = pending.pop()
+        if container_id not in needed:
+            needed.add(container_id)
+            pending.extend(needs(container_id))
+    
+    commands = []
+    here = START_ROOM
+    
+    def go(room_id):
+        nonlocal here
+        if room_id != here:
+            commands.append(f"travel {room_id}")
+            here = room_id
+    
+    go(items['lamp']['room'])
+    commands += ["take lamp", "use lamp"]
+    
+    # Containers were numbered in opening order, which items.json keeps
+    for container_id in items:
+        if container_id not in needed:
+            continue
+        key_name = items[container_id].get('key_required')
+        if key_name:
+            go(room_of(ids_by_name[key_name]))
+            commands.append(f"take {key_name}")
+        go(room_of(container_id))
+        commands.append(f"open {items[container_id]['name']}")
+    commands.append("take golden treasure")
+    return commands
+
+def write_world(directory, data, commands=None, indent=2):
+    """
+    Write a world's data files, and its walkthrough if given.
+    
+    Args:
+        directory (str): Directory to write into (created if missing)
+        data (dict): The world's data, as returned by generate_world()
+        commands (list): Walkthrough to write as walkthrough.txt
+        indent (int): JSON indentation (None for the most compact files)
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in ('rooms', 'items', 'messages', 'scoring'):
+        with open(os.path.join(directory, f"{name}.json"), 'w') as f:
+            json.dump(data[name], f, indent=indent)
+    if commands is not None:
+        with open(os.path.join(directory, 'walkthrough.txt'), 'w', encoding='utf-8') as f:
+            f.write("# Winning walkthrough, run with: python main.py run-script walkthrough.txt\n")
+            f.write('\n'.join(commands) + '\n')
+
+def run_cli(args):
+    """
+    Command line entry point: python main.py generate-world DIR [options]
+    
+    Args:
+        args (list): Arguments after 'generate-world'
+    
+    Returns:
+        int: Exit status (1 if the world failed to compile or its walkthrough did not win)
+    """
+    parser = argparse.ArgumentParser(
+        prog='python main.py generate-world',
+        description="Generate a large, reproducible, winnable world for testing."
+    )
+    parser.add_argument('directory', help="directory to write the world's data files into")
+    parser.add_argument('--rooms', type=int, default=100, help="number of rooms")
+    parser.add_argument('--items', type=int, default=400, help="number of items")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    parser.add_argument('--dark', type=float, default=0.1, help="share of dark rooms")
+    parser.add_argument('--locks', type=float, default=0.05, help="share of items that are locked chests")
+    parser.add_argument('--boxes', type=float, default=0.05, help="share of items that are unlocked boxes")
+    parser.add_argument('--nest', type=float, default=0.3, help="chance an item starts inside a container")
+    parser.add_argument('--compact', action='store_true', help="write JSON without indentation")
+    parser.add_argument('--no-check', action='store_true', help="skip playing the walkthrough")
+    options = parser.parse_args(args)
+    
+    if os.path.abspath(options.directory) == os.path.abspath('data'):
+        print("Refusing to overwrite the shipped world in data/.")
+        return 1
+    
+    try:
+        data, commands = generate_world(options.rooms, options.items, options.seed, options.dark,
+                                        options.locks, options.boxes, options.nest)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    write_world(options.directory, data, commands, None if options.compact else 2)
+    
+    try:
+        compile_world(options.directory)
+    except WorldDataError as e:
+        print("Generated world has problems:")
+        for problem in e.problems:
+            print(f"  {problem}")
+        return 1
+    
+    print(f"Wrote {len(data['rooms'])} rooms and {len(data['items'])} items to {options.directory} "
+          f"(seed {options.seed}, walkthrough of {len(commands)} commands)")
+    if options.no_check:
+        return 0
+    
+    result = run_script(commands, data_dir=options.directory)
+    if not result.get('won'):
+        print("The walkthrough did not win the game:")
+        for step in result['transcript'][-3:]:
+            print(f"> {step['command']}\n{step['output'].rstrip()}")
+        return 1
+    print(f"Walkthrough checked: won with {result['score']}/{result['max_score']} points in {result['moves']} moves")
+    return 0